@@ -0,0 +1,104 @@
+"""
+Benchmark del motor asíncrono de day summaries
+Compara el esquema anterior (3 hilos, páginas secuenciales con pausa fija)
+contra get_day_summaries sobre el servidor local de mock_human_api
+
+Uso:
+    python benchmarks/bench_async_fetch.py --employees 300 --days 30 --latency 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.api_client import HumanApiClient
+from core.batch_tuner import BatchTuner
+from config.default_config import API_ENDPOINTS, DEFAULT_CONFIG
+from mock_human_api import MockHumanApiServer
+
+
+def legacy_day_summaries(client, start_date, end_date, user_ids, batch_size=15):
+    """Reproduce el algoritmo previo: ThreadPoolExecutor(3) y páginas de a una con sleep(0.1)"""
+
+    def process_batch(batch_ids):
+        items = []
+        page = 1
+        while True:
+            params = {
+                'employeeIds': ','.join(batch_ids), 'startDate': start_date,
+                'endDate': end_date, 'limit': 500, 'page': page
+            }
+            response = client._make_request('GET', API_ENDPOINTS['day_summaries'], params=params)
+            if not response or not response.get('items'):
+                break
+            items.extend(response['items'])
+            if response.get('totalPages', 0) <= page:
+                break
+            page += 1
+            time.sleep(0.1)
+        return items
+
+    all_items = []
+    batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        for future in as_completed([executor.submit(process_batch, b) for b in batches]):
+            all_items.extend(future.result())
+    return all_items
+
+
+def run_benchmark(employees, days, latency_ms, start_date='2025-01-01'):
+    from datetime import datetime, timedelta
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+    def make_client(base_url):
+        client = HumanApiClient(api_key='bench', base_url=base_url)
+        # Sin caches ni historial de lotes: se mide solo el motor de descarga
+        client.response_cache = client.day_store = None
+        client.batch_tuner = BatchTuner(
+            None, initial_users=15, initial_days=days, max_days=days,
+            max_url_length=DEFAULT_CONFIG['max_url_length'], max_workers=client.max_concurrency,
+            target_seconds=DEFAULT_CONFIG['batch_target_query_ms'] / 1000, learn=False,
+        )
+        return client
+
+    user_ids = [f"E{i:05d}" for i in range(employees)]
+    results = {}
+    with MockHumanApiServer(employees=employees, latency_ms=latency_ms) as server:
+        # Un cliente nuevo por escenario: el limitador adaptativo arranca igual en ambos
+        for name, fetch in (
+            ('legacy (3 hilos)', lambda client: legacy_day_summaries(client, start_date, end_date, user_ids)),
+            (f"asyncio ({DEFAULT_CONFIG['max_workers']} en vuelo)",
+             lambda client: client.get_day_summaries(start_date, end_date, user_ids)),
+        ):
+            client = make_client(server.base_url)
+            server.request_count = 0
+            started = time.perf_counter()
+            items = fetch(client)
+            elapsed = time.perf_counter() - started
+            results[name] = (elapsed, len(items), server.request_count)
+            client.close()
+
+    print(f"\n📊 {employees} empleados × {days} días, latencia {latency_ms} ms")
+    baseline = None
+    for name, (elapsed, count, requests_made) in results.items():
+        baseline = baseline or elapsed
+        print(f"  {name:<24} {elapsed:7.2f} s  {count:>7} items  "
+              f"{requests_made:>5} req  {count / elapsed:9.0f} items/s  x{baseline / elapsed:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=300)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--latency', type=int, default=50, help="Latencia simulada por petición (ms)")
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days, args.latency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark del autoajuste de lotes de day summaries
+Compara lotes fijos (15 empleados × chunks de 30 días) contra BatchTuner:
+una primera ejecución sin historial y una segunda con lo aprendido.
+El cache de respuestas y el almacén de días se desactivan para medir solo la descarga.
+
+Uso:
+    python benchmarks/bench_batch_tuning.py --employees 2000 --days 60 --latency 30
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.api_client import HumanApiClient
+from core.batch_tuner import BatchTuner
+from config.default_config import DEFAULT_CONFIG
+from mock_human_api import MockHumanApiServer
+
+
+def make_client(base_url, tuner):
+    client = HumanApiClient(api_key='bench', base_url=base_url)
+    if client.response_cache:
+        client.response_cache.close()
+    if client.day_store:
+        client.day_store.close()
+    client.response_cache = None
+    client.day_store = None
+    client.batch_tuner = tuner
+    return client
+
+
+def make_tuner(path, learn=True):
+    return BatchTuner(
+        path,
+        initial_users=DEFAULT_CONFIG['batch_size_users'],
+        initial_days=DEFAULT_CONFIG['batch_size_dates'],
+        max_days=DEFAULT_CONFIG['batch_max_days'],
+        max_url_length=DEFAULT_CONFIG['max_url_length'],
+        max_workers=DEFAULT_CONFIG['max_workers'],
+        target_seconds=DEFAULT_CONFIG['batch_target_query_ms'] / 1000,
+        learn=learn,
+    )
+
+
+def run_benchmark(employees, days, latency_ms, start_date='2025-01-01'):
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(employees)]
+    state_path = os.path.join(tempfile.mkdtemp(prefix='bench-tuning-'), 'batch_tuning.json')
+
+    results = {}
+    with MockHumanApiServer(employees=employees, latency_ms=latency_ms) as server:
+        # Cada tuner se crea recién al empezar su ejecución, para que lea lo guardado por la anterior
+        for name, path, learn in (
+            ('fijo 15 × 30 días', None, False),
+            ('autoajuste, 1ra ejecución', state_path, True),
+            ('autoajuste, con historial', state_path, True),
+        ):
+            client = make_client(server.base_url, make_tuner(path, learn))
+            server.request_count = 0
+            started = time.perf_counter()
+            result = client.get_time_tracking_parallel_with_users(start_date, end_date, users)
+            elapsed = time.perf_counter() - started
+            results[name] = (elapsed, result['total_entries'], server.request_count)
+            client.close()
+
+    print(f"\n📊 {employees} empleados × {days} días, latencia {latency_ms} ms")
+    baseline = None
+    for name, (elapsed, count, requests_made) in results.items():
+        baseline = baseline or elapsed
+        print(f"  {name:<28} {elapsed:7.2f} s  {count:>8} items  {requests_made:>5} req  x{baseline / elapsed:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--latency', type=int, default=30, help="Latencia simulada por petición (ms)")
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days, args.latency)
+
+
+if __name__ == '__main__':
+    main()
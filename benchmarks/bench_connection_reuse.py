@@ -0,0 +1,105 @@
+"""
+Benchmark de reutilización de conexiones
+Compara, con N hilos haciendo peticiones en paralelo contra el servidor local:
+  - sin keep-alive (una conexión nueva por petición)
+  - una requests.Session compartida con el pool por defecto (10 conexiones)
+  - HttpTransport: una sesión por worker, pool dimensionado y pre-conexión
+
+Uso:
+    python benchmarks/bench_connection_reuse.py --workers 12 --requests 600 --latency 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.transport import HttpTransport
+from mock_human_api import MockHumanApiServer
+
+
+def run_requests(get, url, workers, total):
+    params = [{'page': (i % 20) + 1, 'limit': 50} for i in range(total)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda p: get(url, params=p, timeout=10).content, params))
+
+
+def run_benchmark(workers, total, latency_ms):
+    # El pool por defecto avisa "Connection pool is full" por cada conexión descartada
+    pool_warnings = []
+    logging.getLogger('urllib3.connectionpool').addHandler(
+        type('Counter', (logging.Handler,), {'emit': lambda self, record: pool_warnings.append(record)})()
+    )
+
+    with MockHumanApiServer(employees=1000, latency_ms=latency_ms) as server:
+        url = f"{server.base_url}/users"
+        results = {}
+
+        def no_keep_alive(url, **kwargs):
+            return requests.get(url, headers={'Connection': 'close'}, **kwargs)
+
+        shared = requests.Session()
+        transport = HttpTransport({})
+        warm_pool = ThreadPoolExecutor(max_workers=workers)
+
+        scenarios = (
+            ('sin keep-alive', no_keep_alive),
+            ('sesión compartida', shared.get),
+            ('sesión por worker', transport.get),
+        )
+        for name, get in scenarios:
+            server.request_count = server.connection_count = 0
+            pool_warnings.clear()
+            started = time.perf_counter()
+            run_requests(get, url, workers, total)
+            elapsed = time.perf_counter() - started
+            results[name] = (elapsed, server.connection_count, len(pool_warnings))
+
+        # Pre-conexión: se paga mientras el usuario elige fechas, no durante el reporte
+        warm = HttpTransport({})
+        warm.preconnect(server.base_url, warm_pool, workers)
+        time.sleep(0.5)
+        server.request_count = server.connection_count = 0
+        started = time.perf_counter()
+        list(warm_pool.map(
+            lambda p: warm.get(url, params=p, timeout=10).content,
+            [{'page': (i % 20) + 1, 'limit': 50} for i in range(total)]
+        ))
+        results['sesión por worker + pre-conexión'] = (
+            time.perf_counter() - started, server.connection_count, 0
+        )
+
+        stats = transport.stats()
+        shared.close()
+        transport.close()
+        warm.close()
+        warm_pool.shutdown()
+
+    print(f"\n📊 {total} peticiones, {workers} hilos, latencia {latency_ms} ms")
+    baseline = None
+    for name, (elapsed, connections, warnings) in results.items():
+        baseline = baseline or elapsed
+        print(f"  {name:<34} {elapsed:6.2f} s  {connections:>5} conexiones  "
+              f"{warnings:>4} avisos de pool  x{baseline / elapsed:.2f}")
+    print(f"  gzip: {stats['bytes_on_wire']:,} bytes en la red / {stats['bytes_decoded']:,} "
+          f"decodificados ({stats['compression_savings']:.0%} de ahorro)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=12)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--latency', type=int, default=20, help="Latencia simulada por petición (ms)")
+    args = parser.parse_args()
+    run_benchmark(args.workers, args.requests, args.latency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark de la descarga de day summaries con la API degradada
+Corre el mismo reporte contra el servidor simulado sano, con 429 y 5xx
+inyectados y con un rate limit del lado del servidor, y muestra tiempo,
+peticiones, reintentos y espera en el limitador (métricas del cliente).
+Los errores se generan con semilla fija: cada corrida es reproducible.
+
+Uso:
+    python benchmarks/bench_fault_injection.py --employees 1000 --days 30 --latency 30
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.api_client import HumanApiClient
+from mock_human_api import MockHumanApiServer
+
+
+SCENARIOS = (
+    ('sana', {}),
+    ('5% 429 (Retry-After 1 s)', {'throttle_rate': 0.05, 'retry_after': 1}),
+    ('5% 5xx', {'error_rate': 0.05}),
+    ('rate limit 5 req/s', {'max_requests_per_second': 5}),
+    ('1 empleado-día roto (500)', {'broken_days': [('E00007', '2025-01-15')]}),
+)
+
+
+def make_client(base_url):
+    client = HumanApiClient(api_key='bench', base_url=base_url)
+    for store in (client.response_cache, client.day_store, client.checkpoints):
+        if store:
+            store.close()
+    client.response_cache = client.day_store = client.checkpoints = None
+    client.batch_tuner.learn = False
+    return client
+
+
+def run_benchmark(employees, days, latency_ms, start_date='2025-01-01'):
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(employees)]
+
+    results = {}
+    for name, faults in SCENARIOS:
+        with MockHumanApiServer(employees=employees, latency_ms=latency_ms, seed=7, **faults) as server:
+            client = make_client(server.base_url)
+            started = time.perf_counter()
+            result = client.get_time_tracking_parallel_with_users(start_date, end_date, users)
+            elapsed = time.perf_counter() - started
+            totals = client.metrics.snapshot()['totals']
+            results[name] = (elapsed, result.get('total_entries', 0), server.stats(), totals)
+            client.close()
+
+    print(f"\n📊 {employees} empleados × {days} días, latencia {latency_ms} ms")
+    for name, (elapsed, count, server_stats, totals) in results.items():
+        failures = sum(n for status, n in server_stats['statuses'].items() if status >= 400)
+        print(f"  {name:<26} {elapsed:7.2f} s  {count:>8} items  {server_stats['requests']:>5} req  "
+              f"{failures:>4} fallas  {totals['retries']:>4} reint.  {totals['throttle_seconds']:7.1f} s espera")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--latency', type=int, default=30, help="Latencia simulada por petición (ms)")
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days, args.latency)
+
+
+if __name__ == '__main__':
+    main()
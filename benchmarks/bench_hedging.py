@@ -0,0 +1,80 @@
+"""
+Benchmark del hedging de páginas de la grilla
+Corre la misma descarga de day summaries contra el servidor simulado con una
+cola de latencia (unas pocas respuestas mucho más lentas), sin y con hedging,
+y muestra tiempo total, peticiones y cuántos duplicados salieron y ganaron.
+
+Uso:
+    python benchmarks/bench_hedging.py --employees 300 --days 30 --slow-rate 0.02 --slow-ms 4000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.default_config import DEFAULT_CONFIG
+from core.api_client import HumanApiClient
+from mock_human_api import MockHumanApiServer
+
+
+def make_client(base_url, hedge, rate):
+    DEFAULT_CONFIG['hedge_enabled'] = hedge
+    # Con la tasa del limitador como cuello de botella el hedging no tiene lugar para duplicar
+    DEFAULT_CONFIG['rate_limit_per_second'] = DEFAULT_CONFIG['rate_limit_burst'] = rate
+    client = HumanApiClient(api_key='bench', base_url=base_url)
+    for store in (client.response_cache, client.day_store, client.checkpoints):
+        if store:
+            store.close()
+    client.response_cache = client.day_store = client.checkpoints = None
+    client.batch_tuner.learn = False
+    return client
+
+
+def run_benchmark(employees, days, latency_ms, slow_rate, slow_ms, page_size, rate, runs,
+                  start_date='2025-01-01'):
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(employees)]
+
+    rows = []
+    for hedge in (False, True):
+        for run in range(runs):
+            with MockHumanApiServer(employees=employees, latency_ms=latency_ms, max_page_size=page_size,
+                                    slow_rate=slow_rate, slow_ms=slow_ms, seed=run) as server:
+                client = make_client(server.base_url, hedge, rate)
+                started = time.perf_counter()
+                result = client.get_time_tracking_parallel_with_users(start_date, end_date, users)
+                elapsed = time.perf_counter() - started
+                totals = client.metrics.snapshot()['totals']
+                rows.append((hedge, run + 1, elapsed, result.get('total_entries', 0), totals))
+                client.close()
+
+    print(f"\n📊 {employees} empleados × {days} días, latencia {latency_ms} ms, "
+          f"{slow_rate:.0%} de respuestas +{slow_ms} ms")
+    for hedge, run, elapsed, count, totals in rows:
+        name = f"{'con' if hedge else 'sin'} hedging #{run}"
+        print(f"  {name:<18} {elapsed:6.2f} s  {count:8d} items  {totals['requests']:5d} req  "
+              f"{totals['hedged']:3d} duplicadas  {totals['hedge_wins']:3d} ganaron")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=300)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--latency', type=int, default=30, help="Latencia base del servidor (ms)")
+    parser.add_argument('--slow-rate', type=float, default=0.02)
+    parser.add_argument('--slow-ms', type=int, default=4000)
+    parser.add_argument('--page-size', type=int, default=100, help="Tope de página del servidor")
+    parser.add_argument('--rate', type=int, default=50, help="Tasa inicial del limitador (peticiones/s)")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days, args.latency, args.slow_rate, args.slow_ms,
+                  args.page_size, args.rate, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark de memoria de la proyección de payloads al ingresar
+Decodifica páginas de day summaries como llegan de la API y mide con
+tracemalloc cuánta memoria ocupan los originales y cuánta después de
+proyectarlos e internar los strings repetidos.
+
+Uso:
+    python benchmarks/bench_ingestion_memory.py --employees 2000 --days 90
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.ingestion import PayloadProjector
+from mock_human_api import MockHumanApiServer
+
+
+def decoded_pages(server, employees, days, limit=500):
+    """Páginas de day summaries decodificadas de JSON, como las entrega el cliente"""
+    query = {
+        'employeeIds': ','.join(f"E{i:05d}" for i in range(employees)),
+        'startDate': '2025-01-01',
+        'endDate': (datetime(2025, 1, 1) + timedelta(days=days - 1)).strftime('%Y-%m-%d'),
+    }
+    first = server.day_summaries(dict(query, page=1), limit)
+    for page in range(1, first['totalPages'] + 1):
+        body = json.dumps(server.day_summaries(dict(query, page=page), limit))
+        yield json.loads(body)['items']
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def run_benchmark(employees, days):
+    server = MockHumanApiServer(employees=employees, latency_ms=0)
+    try:
+        def raw():
+            items = []
+            for page in decoded_pages(server, employees, days):
+                items.extend(page)
+            return items
+
+        def projected():
+            projector = PayloadProjector()
+            items = []
+            for page in decoded_pages(server, employees, days):
+                items.extend(projector.day_summaries(page))
+            return items
+
+        results = {}
+        for name, build in (('originales', raw), ('proyectados + internados', projected)):
+            items, current, peak, elapsed = measure(build)
+            results[name] = (len(items), current, peak, elapsed)
+            del items
+    finally:
+        server._server.server_close()
+
+    print(f"\n📊 {employees} empleados × {days} días")
+    baseline = None
+    for name, (count, current, peak, elapsed) in results.items():
+        baseline = baseline or current
+        print(f"  {name:<26} {count:>9} items  {current / 1048576:8.1f} MB  "
+              f"({current / count:6.0f} B/item, pico {peak / 1048576:8.1f} MB)  {elapsed:6.2f} s  "
+              f"x{baseline / current:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=90)
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days)
+
+
+if __name__ == '__main__':
+    main()
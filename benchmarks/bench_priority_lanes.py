@@ -0,0 +1,101 @@
+"""
+Benchmark de los carriles de prioridad
+Mientras corre la descarga de un reporte grande (carril bulk), una consulta
+chica (la de la prueba de conexión) sale cada tanto por el carril bulk o por
+el interactivo, y se compara cuánto tarda en volver.
+
+Uso:
+    python benchmarks/bench_priority_lanes.py --employees 2000 --days 30 --seconds 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.default_config import API_ENDPOINTS
+from core.api_client import HumanApiClient
+from core.cancellation import CancellationToken, OperationCancelled
+from core.lanes import BULK, INTERACTIVE, request_lane
+from mock_human_api import MockHumanApiServer
+
+
+def make_client(base_url):
+    client = HumanApiClient(api_key='bench', base_url=base_url)
+    for store in (client.response_cache, client.day_store, client.checkpoints):
+        if store:
+            store.close()
+    client.response_cache = client.day_store = client.checkpoints = None
+    client.batch_tuner.learn = False
+    return client
+
+
+def probe(client, lane, interval, stop):
+    """Latencias de la consulta chica, una cada `interval` segundos, hasta `stop`"""
+    latencies = []
+    while not stop.wait(interval):
+        started = time.perf_counter()
+        with request_lane(lane):
+            client._make_request('GET', API_ENDPOINTS['users'], params={'page': 1, 'limit': 1}, use_cache=False)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_report(client, start_date, end_date, users, token):
+    """Descarga del reporte grande hasta que se cancela el token"""
+    try:
+        client.get_time_tracking_parallel_with_users(start_date, end_date, users, cancel_token=token)
+    except OperationCancelled:
+        pass
+
+
+def run_benchmark(employees, days, latency_ms, page_size, seconds, interval, start_date='2025-01-01'):
+    end_date = (datetime.strptime(start_date, '%Y-%m-%d') + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(employees)]
+
+    rows = []
+    for lane in (BULK, INTERACTIVE):
+        with MockHumanApiServer(employees=employees, latency_ms=latency_ms, max_page_size=page_size) as server:
+            client = make_client(server.base_url)
+            token = CancellationToken()
+            report = threading.Thread(target=run_report, args=(client, start_date, end_date, users, token),
+                                      daemon=True)
+            report.start()
+            stop = threading.Event()
+            threading.Timer(seconds, stop.set).start()
+            latencies = probe(client, lane, interval, stop)
+            token.cancel()
+            report.join()
+            rows.append((lane, latencies, dict(client.rate_limiter.granted)))
+            client.close()
+
+    print(f"\n📊 Consulta chica durante un reporte de {employees} empleados × {days} días "
+          f"(latencia {latency_ms} ms, {seconds} s)")
+    for lane, latencies, granted in rows:
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"  carril {lane:<12} {len(latencies):3d} consultas  "
+              f"mediana {statistics.median(latencies) * 1000:7.0f} ms  p95 {p95 * 1000:7.0f} ms  "
+              f"máx {latencies[-1] * 1000:7.0f} ms  turnos {granted}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--latency', type=int, default=100, help="Latencia base del servidor (ms)")
+    parser.add_argument('--page-size', type=int, default=100, help="Tope de página del servidor")
+    parser.add_argument('--seconds', type=float, default=10, help="Duración de la medición")
+    parser.add_argument('--interval', type=float, default=0.5, help="Segundos entre consultas chicas")
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.days, args.latency, args.page_size, args.seconds, args.interval)
+
+
+if __name__ == '__main__':
+    main()
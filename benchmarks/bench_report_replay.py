@@ -0,0 +1,75 @@
+"""
+Benchmark del reporte completo reproducido desde un cassette
+Graba una vez el tráfico de un reporte (contra el servidor simulado, o usa un
+cassette ya grabado, por ejemplo de producción) y lo reproduce varias veces sin
+red: la descarga deja de variar y quedan a la vista el cálculo de horas y el Excel.
+
+Uso:
+    python benchmarks/bench_report_replay.py --employees 500 --days 31 --runs 3
+    python benchmarks/bench_report_replay.py --cassette ~/.cache/tt-puppis/cassettes/api.jsonl.gz \\
+        --start 2025-01-01 --end 2025-01-31
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.default_config import DEFAULT_CONFIG
+from core.data_processor import DataProcessor
+from mock_human_api import MockHumanApiServer
+
+
+def run_report(cassette_mode, cassette_path, start_date, end_date, base_url=None):
+    processor = DataProcessor(api_key='bench', base_url=base_url,
+                              cassette_mode=cassette_mode, cassette_path=cassette_path)
+    try:
+        result = processor.process_attendance_report(start_date, end_date)
+        stats = processor.api_client.transport.stats()
+    finally:
+        processor.api_client.close()
+    if not result['success']:
+        raise RuntimeError(result.get('error'))
+    return result, stats
+
+
+def run_benchmark(cassette, start_date, end_date, employees, runs):
+    DEFAULT_CONFIG['output_directory'] = tempfile.mkdtemp(prefix='bench-replay-')
+    rows = []
+    if not cassette:
+        cassette = os.path.join(tempfile.mkdtemp(prefix='bench-cassette-'), 'report.jsonl.gz')
+        with MockHumanApiServer(employees=employees, latency_ms=30) as server:
+            result, _ = run_report('record', cassette, start_date, end_date, server.base_url)
+        rows.append(('grabación (red simulada)', result['api_stats']['stage_seconds'], None))
+
+    for run in range(runs):
+        result, stats = run_report('replay', cassette, start_date, end_date)
+        rows.append((f"reproducción {run + 1}", result['api_stats']['stage_seconds'], stats['misses']))
+
+    size_mb = os.path.getsize(os.path.expanduser(cassette)) / 1048576
+    print(f"\n📊 Reporte {start_date} a {end_date}, cassette {size_mb:.2f} MB")
+    for name, stages, misses in rows:
+        missing = f"  {misses} sin grabar" if misses else ""
+        print(f"  {name:<26} descarga {stages['fetch']:6.2f} s  cálculo {stages['compute']:6.2f} s  "
+              f"excel {stages['excel']:6.2f} s{missing}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cassette', help="Cassette ya grabado (si no, se graba uno contra el servidor simulado)")
+    parser.add_argument('--start', default='2025-01-01')
+    parser.add_argument('--end', help="Por defecto, --start + --days")
+    parser.add_argument('--employees', type=int, default=500)
+    parser.add_argument('--days', type=int, default=31)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    end = args.end or (datetime.strptime(args.start, '%Y-%m-%d') + timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    run_benchmark(args.cassette, args.start, end, args.employees, args.runs)
+
+
+if __name__ == '__main__':
+    main()
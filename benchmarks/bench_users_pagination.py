@@ -0,0 +1,90 @@
+"""
+Benchmark de la carga del directorio de usuarios
+Compara la paginación secuencial anterior (limit 50, una página por vez)
+contra get_users con sondeo de limit y páginas en paralelo, y cuántas
+peticiones cuestan varias cargas simultáneas (single-flight)
+
+Uso:
+    python benchmarks/bench_users_pagination.py --employees 2000 --latency 80 --max-page-size 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.api_client import HumanApiClient
+from config.default_config import API_ENDPOINTS
+from mock_human_api import MockHumanApiServer
+
+
+def legacy_get_users(client, limit=50):
+    """Reproduce el algoritmo previo: páginas de 50 usuarios, una detrás de otra"""
+    all_users = []
+    page = 1
+    while True:
+        response = client._make_request('GET', API_ENDPOINTS['users'], params={'page': page, 'limit': limit})
+        if not response or not response.get('users'):
+            break
+        all_users.extend(response['users'])
+        if page * limit >= response.get('count', 0):
+            break
+        page += 1
+    return all_users
+
+
+def run_benchmark(employees, latency_ms, max_page_size):
+    with MockHumanApiServer(employees=employees, latency_ms=latency_ms,
+                            max_page_size=max_page_size) as server:
+        legacy_client = HumanApiClient(api_key='bench', base_url=server.base_url)
+        client = HumanApiClient(api_key='bench', base_url=server.base_url)
+        # Sin cache de respuestas: cada ejecución sale a la red
+        legacy_client.response_cache = client.response_cache = None
+
+        results = {}
+        for name, fetch in (
+            ('legacy (secuencial)', lambda: legacy_get_users(legacy_client)),
+            ('fan-out + sondeo', client.get_users),
+            ('fan-out (limit ya sondeado)', client.get_users),
+        ):
+            server.request_count = 0
+            started = time.perf_counter()
+            users = fetch()
+            elapsed = time.perf_counter() - started
+            results[name] = (elapsed, len(users), server.request_count)
+
+        # Varias pantallas/hilos cargando el directorio a la vez
+        callers = 8
+        server.request_count = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            loads = list(executor.map(lambda _: client.get_users(), range(callers)))
+        results[f'{callers} cargas simultáneas'] = (
+            time.perf_counter() - started, len(loads[0]), server.request_count
+        )
+
+        legacy_client.close()
+        client.close()
+
+    print(f"\n📊 {employees} usuarios, latencia {latency_ms} ms, página máxima {max_page_size or 'sin tope'}")
+    baseline = None
+    for name, (elapsed, count, requests_made) in results.items():
+        baseline = baseline or elapsed
+        print(f"  {name:<28} {elapsed:7.2f} s  {count:>6} usuarios  {requests_made:>4} req  x{baseline / elapsed:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--latency', type=int, default=80, help="Latencia simulada por petición (ms)")
+    parser.add_argument('--max-page-size', type=int, default=200, help="Tope silencioso de 'limit' del servidor")
+    args = parser.parse_args()
+    run_benchmark(args.employees, args.latency, args.max_page_size)
+
+
+if __name__ == '__main__':
+    main()
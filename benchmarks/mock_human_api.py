@@ -0,0 +1,389 @@
+"""
+Servidor local que imita la API de Human.co
+Sirve /users, /time-tracking/day-summaries y /time-tracking/entries con datos
+sintéticos, con latencia, topes de página y errores 429/5xx configurables,
+para benchmarks y pruebas de carga sin tocar producción
+
+Uso como servidor independiente:
+    python benchmarks/mock_human_api.py --employees 20000 --latency-ms 80 --throttle-rate 0.05
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+API_PREFIX = '/public/api/v1'
+
+
+class MockHumanApiServer:
+    """
+    Servidor HTTP en un hilo propio.
+
+    - latency_ms / latency_jitter_ms: demora de cada respuesta (± jitter uniforme).
+    - slow_rate / slow_ms: fracción de respuestas que además tardan slow_ms (cola de
+      latencia: unas pocas páginas lentas).
+    - max_page_size: tope del 'limit'; por defecto se recorta en silencio (como la API
+      real) y con reject_oversized_limit se responde 422.
+    - throttle_rate / error_rate: fracción de peticiones que responden 429 (con
+      Retry-After) o 5xx; con seed los errores son reproducibles.
+    - max_requests_per_second: token bucket del lado del servidor; lo que lo excede
+      recibe 429 con Retry-After, como un rate limit real.
+    - broken_days: pares (empleado, fecha) con datos rotos: toda consulta de day
+      summaries o fichadas que los incluya responde 500.
+    - broken_pages: páginas de day summaries y fichadas que responden 500 (se puede
+      vaciar después para simular que el servidor se recuperó).
+    - totals=False: las páginas de day summaries y fichadas no traen 'count' ni
+      'totalPages' (el cliente pagina de a una mientras vengan llenas).
+    """
+
+    def __init__(self, employees: int = 200, latency_ms: int = 50, max_page_size: int = None,
+                 host: str = '127.0.0.1', port: int = 0, latency_jitter_ms: int = 0,
+                 reject_oversized_limit: bool = False, throttle_rate: float = 0.0,
+                 error_rate: float = 0.0, retry_after: float = 1.0,
+                 max_requests_per_second: float = None, seed: int = None, broken_days=(),
+                 slow_rate: float = 0.0, slow_ms: int = 0, broken_pages=(), totals: bool = True):
+        self.employees = employees
+        self.latency = latency_ms / 1000
+        self.latency_jitter = latency_jitter_ms / 1000
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000
+        self.max_page_size = max_page_size
+        self.reject_oversized_limit = reject_oversized_limit
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.max_requests_per_second = max_requests_per_second
+        self.broken_days = {(employee_id, date_str) for employee_id, date_str in broken_days}
+        self.broken_pages = set(broken_pages)
+        self.totals = totals
+
+        self.request_count = 0
+        self.connection_count = 0
+        self.requests_by_path = {}
+        self.statuses = {}
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._tokens = float(max_requests_per_second or 0)
+        self._last_refill = time.monotonic()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.request_count,
+                'connections': self.connection_count,
+                'requests_by_path': dict(self.requests_by_path),
+                'statuses': dict(self.statuses),
+            }
+
+    # -------------------- Datos sintéticos --------------------
+
+    def _user(self, index: int) -> dict:
+        return {
+            'employeeInternalId': f"E{index:05d}",
+            'firstName': f"Nombre{index}",
+            'lastName': f"Apellido{index}",
+            'department': f"Depto {index % 12}",
+            'isActive': True,
+            'fields': [
+                {'id': 1, 'name': 'Legajo', 'value': str(1000 + index), 'type': 'TEXT'},
+                {'id': 2, 'name': 'Puesto', 'value': f"Puesto {index % 20}", 'type': 'TEXT'},
+            ],
+            'segmentations': [
+                {'id': 1, 'group': 'Sucursales', 'item': f"Sucursal {index % 30}"},
+                {'id': 2, 'group': 'Jornada Laboral', 'item': 'Completa'},
+            ],
+        }
+
+    def _day_summary(self, employee_id: str, date_str: str) -> dict:
+        return {
+            'id': f"{employee_id}-{date_str}",
+            'employeeId': employee_id,
+            'referenceDate': date_str,
+            'isWorkday': True,
+            'hours': {'worked': 8.0, 'expected': 8.0, 'pending': 0.0},
+            'entries': [
+                {'id': f"{employee_id}-{date_str}-1", 'type': 'START', 'time': f"{date_str}T12:00:00Z",
+                 'source': 'MOBILE', 'comment': None},
+                {'id': f"{employee_id}-{date_str}-2", 'type': 'END', 'time': f"{date_str}T20:00:00Z",
+                 'source': 'MOBILE', 'comment': None},
+            ],
+            'timeSlots': [{'startTime': '09:00', 'endTime': '17:00', 'breakMinutes': 0}],
+            'categorizedHours': [
+                {'category': {'id': 1, 'name': 'REGULAR', 'description': 'Horas regulares'}, 'hours': 8.0},
+            ],
+            'holidays': [],
+            'incidences': [],
+            'timeOffRequests': [],
+            'createdAt': f"{date_str}T23:59:00Z",
+            'updatedAt': f"{date_str}T23:59:00Z",
+        }
+
+    def _entry(self, employee_id: str, date_str: str, kind: str) -> dict:
+        hour = '12:00:00' if kind == 'START' else '20:00:00'
+        return {
+            'id': f"{employee_id}-{date_str}-{kind}",
+            'employeeId': employee_id,
+            'type': kind,
+            'time': f"{date_str}T{hour}Z",
+            'date': date_str,
+        }
+
+    # -------------------- Endpoints --------------------
+
+    def _limit(self, query: dict, default: int) -> int:
+        """'limit' efectivo; None si excede el tope y reject_oversized_limit está activo"""
+        limit = int(query.get('limit', default))
+        if self.max_page_size and limit > self.max_page_size:
+            return None if self.reject_oversized_limit else self.max_page_size
+        return limit
+
+    def _employee_ids(self, query: dict) -> list:
+        raw = query.get('employeeIds') or query.get('userIds') or ''
+        ids = [e for e in raw.split(',') if e]
+        return ids or [f"E{i:05d}" for i in range(self.employees)]
+
+    def _page(self, query: dict, total: int, limit: int, build) -> dict:
+        page = int(query.get('page', 1))
+        total_pages = max(1, -(-total // limit))
+        items = [build(index) for index in range((page - 1) * limit, min(page * limit, total))]
+        if not self.totals:
+            return {'page': page, 'items': items}
+        return {'count': total, 'totalPages': total_pages, 'page': page, 'items': items}
+
+    def users(self, query: dict, limit: int) -> dict:
+        page = int(query.get('page', 1))
+        start = (page - 1) * limit
+        end = min(start + limit, self.employees)
+        return {
+            'count': self.employees,
+            'users': [self._user(i) for i in range(start, end)],
+        }
+
+    def day_summaries(self, query: dict, limit: int) -> dict:
+        employee_ids = self._employee_ids(query)
+        start_dt = datetime.strptime(query['startDate'], '%Y-%m-%d')
+        days = (datetime.strptime(query['endDate'], '%Y-%m-%d') - start_dt).days + 1
+
+        def build(index):
+            date_str = (start_dt + timedelta(days=index % days)).strftime('%Y-%m-%d')
+            return self._day_summary(employee_ids[index // days], date_str)
+        return self._page(query, len(employee_ids) * days, limit, build)
+
+    def entries(self, query: dict, limit: int) -> dict:
+        # Dos fichadas (entrada y salida) por empleado y día
+        employee_ids = self._employee_ids(query)
+        start_dt = datetime.strptime(query['startDate'], '%Y-%m-%d')
+        days = (datetime.strptime(query['endDate'], '%Y-%m-%d') - start_dt).days + 1
+
+        def build(index):
+            cell, kind = divmod(index, 2)
+            date_str = (start_dt + timedelta(days=cell % days)).strftime('%Y-%m-%d')
+            return self._entry(employee_ids[cell // days], date_str, 'START' if kind == 0 else 'END')
+        return self._page(query, len(employee_ids) * days * 2, limit, build)
+
+    # -------------------- Fallas inyectadas --------------------
+
+    def _includes_broken_day(self, query: dict) -> bool:
+        if not self.broken_days or 'startDate' not in query:
+            return False
+        employee_ids = set(self._employee_ids(query))
+        return any(employee_id in employee_ids and query['startDate'] <= date_str <= query['endDate']
+                   for employee_id, date_str in self.broken_days)
+
+    def _injected_failure(self):
+        """(status, Retry-After) a devolver en lugar de la respuesta, o None"""
+        with self._lock:
+            if self.max_requests_per_second:
+                now = time.monotonic()
+                self._tokens = min(float(self.max_requests_per_second),
+                                   self._tokens + (now - self._last_refill) * self.max_requests_per_second)
+                self._last_refill = now
+                if self._tokens < 1:
+                    return 429, max(1, round((1 - self._tokens) / self.max_requests_per_second))
+                self._tokens -= 1
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                return 429, self.retry_after
+            if roll < self.throttle_rate + self.error_rate:
+                return self._random.choice((500, 502, 503)), None
+        return None
+
+    def _make_handler(self):
+        server = self
+        routes = {
+            '/users': (server.users, 50),
+            '/time-tracking/day-summaries': (server.day_summaries, 500),
+            '/time-tracking/entries': (server.entries, 100),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 para que los clientes puedan reutilizar conexiones (keep-alive)
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+
+            def do_HEAD(self):
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+
+                with server._lock:
+                    server.request_count += 1
+                    server.requests_by_path[path] = server.requests_by_path.get(path, 0) + 1
+                latency = server.latency
+                if server.latency_jitter:
+                    latency = max(0.0, latency + random.uniform(-server.latency_jitter, server.latency_jitter))
+                if server.slow_rate:
+                    with server._lock:
+                        if server._random.random() < server.slow_rate:
+                            latency += server.slow
+                if latency:
+                    time.sleep(latency)
+
+                if path not in routes:
+                    self._send_status(404)
+                    return
+                failure = server._injected_failure()
+                if failure:
+                    self._send_status(*failure)
+                    return
+                broken_page = int(query.get('page', 1)) in server.broken_pages
+                if path != '/users' and (broken_page or server._includes_broken_day(query)):
+                    self._send_status(500)
+                    return
+                handler, default_limit = routes[path]
+                limit = server._limit(query, default_limit)
+                if limit is None:
+                    self._send_status(422)
+                    return
+                try:
+                    payload = handler(query, limit)
+                except (KeyError, ValueError):
+                    self._send_status(400)
+                    return
+
+                body = json.dumps(payload).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._count(304)
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self._count(200)
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=5)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _count(self, status: int):
+                with server._lock:
+                    server.statuses[status] = server.statuses.get(status, 0) + 1
+
+            def _send_status(self, status: int, retry_after: float = None):
+                self._count(status)
+                body = json.dumps({'statusCode': status}).encode('utf-8')
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header('Retry-After', str(int(retry_after)))
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que imita la API de Human.co")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=int, default=50)
+    parser.add_argument('--latency-jitter-ms', type=int, default=0)
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Fracción de respuestas lentas")
+    parser.add_argument('--slow-ms', type=int, default=0, help="Demora extra de las respuestas lentas")
+    parser.add_argument('--max-page-size', type=int, default=None,
+                        help="Tope del parámetro limit (por defecto se recorta en silencio)")
+    parser.add_argument('--reject-oversized-limit', action='store_true',
+                        help="Responder 422 a un limit mayor que --max-page-size")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Fracción de respuestas 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fracción de respuestas 5xx")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After de los 429 inyectados")
+    parser.add_argument('--max-rps', type=float, default=None, help="Rate limit del servidor (peticiones/s)")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla para errores reproducibles")
+    parser.add_argument('--broken-day', action='append', default=[], metavar='EMPLEADO:FECHA',
+                        help="Día con datos rotos (500 en toda consulta que lo incluya); repetible")
+    args = parser.parse_args()
+
+    server = MockHumanApiServer(
+        employees=args.employees, latency_ms=args.latency_ms, max_page_size=args.max_page_size,
+        host=args.host, port=args.port, latency_jitter_ms=args.latency_jitter_ms,
+        reject_oversized_limit=args.reject_oversized_limit, throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate, retry_after=args.retry_after,
+        max_requests_per_second=args.max_rps, seed=args.seed,
+        broken_days=[tuple(day.split(':', 1)) for day in args.broken_day],
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+    )
+    print(f"🧪 API simulada con {args.employees} empleados en {server.base_url}")
+    print("   Usar como base_url de HumanApiClient (Ctrl+C para terminar)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(f"📊 {json.dumps(server.stats(), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,6 +45,22 @@ def build_executable():
         "--hidden-import", "core.data_processor",
         "--hidden-import", "core.excel_generator",
         "--hidden-import", "core.hours_calculator",
+        "--hidden-import", "core.rate_limiter",
+        "--hidden-import", "core.resilience",
+        "--hidden-import", "core.response_cache",
+        "--hidden-import", "core.day_store",
+        "--hidden-import", "core.transport",
+        "--hidden-import", "core.batch_tuner",
+        "--hidden-import", "core.single_flight",
+        "--hidden-import", "core.checkpoint",
+        "--hidden-import", "core.cancellation",
+        "--hidden-import", "core.tracing",
+        "--hidden-import", "core.metrics",
+        "--hidden-import", "core.cassette",
+        "--hidden-import", "core.ingestion",
+        "--hidden-import", "core.user_directory",
+        "--hidden-import", "core.pipeline",
+        "--hidden-import", "core.lanes",
         "--hidden-import", "config",
         "--hidden-import", "config.default_config",
         "--clean",  # Limpiar cache antes de compilar
@@ -32,13 +32,91 @@ DEFAULT_CONFIG = {
     'max_retries': 3,
     'retry_delay': 1000,
     'request_timeout': 30000,
+    'connect_timeout': 5000,
+    'connections_per_worker': 2,         # Pool por sesión (hay una sesión por hilo worker)
+    'preconnect_min_interval': 30000,    # Pre-conexión como mucho cada 30 s
+    'retry_max_delay': 20000,            # Tope del backoff exponencial con jitter
+    'circuit_failure_threshold': 5,      # Fallas transitorias seguidas que abren el circuito
+    'circuit_reset_timeout': 15000,      # Tiempo abierto antes del sondeo half-open
+    'circuit_max_reset_timeout': 120000,
 
     # Paralelismo
-    'max_workers': 6,
-    'batch_size_users': 10,
-    'batch_size_dates': 7,
+    'max_workers': 12,  # Techo de peticiones en vuelo (el control AIMD decide cuántas usar)
+    'batch_size_users': 15,   # Empleados por consulta mientras no hay historial (luego los elige el autoajuste)
+    'batch_size_dates': 30,   # Días por chunk mientras no hay historial
+    'batch_autotune_enabled': True,   # Aprende y persiste el tamaño de las consultas de day summaries
+    'batch_max_days': 31,             # Rango máximo de fechas por consulta
+    'batch_target_query_ms': 10000,   # Duración objetivo de una consulta completa (todas sus páginas)
+    'max_url_length': 8000,           # Tope de la URL (la lista de employeeIds va en la query string)
     'delay_between_retries': 1000,
-    'delay_between_batches': 500,
+    'page_fanout': 4,  # Páginas simultáneas por consulta paginada
+    'page_limit_candidates': [1000, 500, 200, 100, 50],  # Tamaños de página a sondear
+    'stream_queue_size': 32,  # Páginas decodificadas en espera de ser consumidas
+    'pipeline_compute_enabled': True,  # Calcular cada empleado apenas llegan todas sus celdas, durante la descarga
+    'pipeline_queue_size': 64,         # Empleados completos en espera de ser calculados
+    'bisect_max_attempts': 32,  # Sub-celdas a probar para aislar lo que hace fallar una celda (0 = no dividir)
+    # Hedging de páginas de la grilla: si una tarda más que el p95 del endpoint, se pide un duplicado
+    'hedge_enabled': True,
+    'hedge_percentile': 0.95,
+    'hedge_min_samples': 20,     # Respuestas del endpoint necesarias antes de estimar el percentil
+    'hedge_initial_delay_ms': 1000,  # Umbral mientras no hay muestras suficientes (inicio del reporte)
+    'hedge_min_delay_ms': 50,    # Espera mínima antes de duplicar
+    'hedge_max_ratio': 0.05,     # Duplicados como fracción de las peticiones (cuida la cuota de la API)
+    'hedge_burst': 2,            # Duplicados permitidos al empezar, antes de acumular peticiones
+    'hedge_max_in_flight': 2,    # Duplicados simultáneos (hilos extra del pool)
+    # Carriles de prioridad: lo interactivo pasa delante de la descarga de un reporte grande
+    'lane_bulk_every': 4,            # Turnos interactivos seguidos antes de dejar pasar uno bulk que espera
+    'interactive_max_workers': 4,    # Hilos del pool del carril interactivo
+    'interactive_max_employees': 5,  # Reportes de hasta tantos empleados van por el carril interactivo
+    'ingestion_projection_enabled': True,  # Guardar en memoria solo los campos usados de cada payload
+
+    # Control adaptativo de tasa (token bucket + AIMD)
+    'rate_limit_per_second': 10,      # Tasa inicial
+    'rate_limit_max_per_second': 50,  # Techo de la tasa
+    'rate_limit_burst': 10,           # Tokens acumulables
+    'aimd_initial_concurrency': 3,
+    'aimd_min_concurrency': 1,
+    'aimd_increase': 1,               # Suma ≈ +1 por ventana con respuestas rápidas
+    'aimd_decrease_factor': 0.5,      # Multiplica ante 429/5xx/picos de latencia
+    'aimd_latency_spike_factor': 3.0, # Latencia > factor × promedio se trata como congestión
+
+    # Cache persistente de respuestas de la API (SQLite + zlib)
+    'cache_directory': '~/.cache/tt-puppis',
+    'response_cache_enabled': True,
+    'response_cache_max_mb': 256,               # Desalojo LRU por encima de este tamaño
+    'response_cache_default_ttl': 300,          # Segundos
+    'response_cache_ttl': {
+        '/users': 900,
+        '/time-tracking/day-summaries': 300,
+        '/time-tracking/entries': 300,
+    },
+    'response_cache_closed_range_days': 45,     # Rangos que terminaron hace más de N días...
+    'response_cache_closed_range_ttl': 604800,  # ...se consideran cerrados (7 días de validez)
+
+    # Almacén local de day summaries por (empleado, fecha)
+    'day_store_enabled': True,
+    'day_store_mutable_days': 35,  # Días recientes que se vuelven a pedir (correcciones de fichadas)
+
+    # Directorio de usuarios guardado en disco: la app arranca con los filtros de la última
+    # descarga y lo revalida en segundo plano (nunca bloquea por estar vencido)
+    'users_directory_enabled': True,
+    'users_directory_max_age_ms': 900000,  # 15 min, igual al TTL de /users: el refresco revalida contra la API
+
+    # Checkpoints por ejecución: un reporte que falla a mitad de camino se reanuda al repetirlo
+    'checkpoints_enabled': True,
+    'checkpoint_max_age_hours': 24,  # Pasado este tiempo se empieza de cero (los datos pudieron cambiar)
+    'report_deadline_ms': 0,         # Tiempo límite del reporte completo, Excel incluido (0 = sin límite): la
+                                     # descarga se corta a tiempo para generarlo con los empleados completos
+    'report_deadline_reserve_ms': 2000,   # Del tiempo límite, lo fijo reservado para abrir y guardar el Excel (máx. 25%)
+    'report_post_fetch_ms_per_day': 0.5,  # Cálculo + Excel por empleado-día hasta medirlo (se ajusta en cada reporte)
+
+    # Trazas (spans) de cada reporte, exportadas para chrome://tracing o ui.perfetto.dev
+    'trace_enabled': False,
+    'trace_directory': '~/.cache/tt-puppis/traces',
+
+    # Cassette de tráfico con la API: None, 'record' (graba) o 'replay' (reproduce sin red)
+    'cassette_mode': None,
+    'cassette_path': '~/.cache/tt-puppis/cassettes/api.jsonl.gz',
 
     # Archivos
     'output_directory': '~/Downloads',
@@ -3,36 +3,238 @@ Cliente de API para Human.co
 Maneja todas las comunicaciones con la API externa
 """
 
+import asyncio
+import functools
+import hashlib
+import threading
 import requests
 import time
 import json
+import math
+import os
+import queue
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple, Callable, Iterator, AsyncIterator, Union
+from concurrent.futures import ThreadPoolExecutor
 from config.default_config import DEFAULT_CONFIG, get_api_headers, API_ENDPOINTS
+from core.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from core.resilience import CircuitBreaker, CircuitOpenError, HedgeBudget, decorrelated_jitter, is_retryable
+from core.response_cache import ResponseCache
+from core.day_store import DaySummaryStore
+from core.transport import HttpTransport
+from core.batch_tuner import BatchTuner
+from core.single_flight import SingleFlight
+from core.checkpoint import CheckpointStore
+from core.cancellation import CancellationToken, OperationCancelled
+from core.lanes import BULK, INTERACTIVE, bind_lane, current_lane, request_lane
+from core.tracing import NOOP_SPAN, tracer
+from core.metrics import RequestMetrics
+from core.cassette import RecordingTransport, ReplayTransport
+from core.ingestion import PayloadProjector
+from core.pipeline import EmployeePartitioner
 
 
 class HumanApiClient:
     """Cliente para interactuar con la API de Human.co"""
     
-    def __init__(self, api_key: str = None, base_url: str = None):
+    # Endpoints que se descargan por grilla (lote de empleados × chunk de fechas):
+    # parámetro con los empleados, clave(s) de la lista de items y nombre para los logs
+    GRID_ENDPOINTS = {
+        API_ENDPOINTS['day_summaries']: ('employeeIds', 'items', 'day summaries'),
+        API_ENDPOINTS['time_tracking_entries']: ('userIds', ('items', 'data'), 'fichadas'),
+    }
+    
+    # Número de página del checkpoint a partir del cual se guarda lo recuperado al dividir una celda
+    RECOVERED_PAGE_BASE = 1000000
+    
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 cassette_mode: str = None, cassette_path: str = None):
+        """
+        Args:
+            cassette_mode: 'record' graba todo el tráfico en cassette_path; 'replay' lo
+                           sirve desde ahí sin red (por defecto, DEFAULT_CONFIG['cassette_mode']).
+                           Con cassette los caches locales se desactivan y los lotes son
+                           fijos, para que grabación y reproducción hagan las mismas consultas.
+        """
         self.api_key = api_key or DEFAULT_CONFIG['api_key']
         self.base_url = base_url or DEFAULT_CONFIG['base_url']
-        self.session = requests.Session()
-        self.session.headers.update(get_api_headers(self.api_key))
+        self.cassette_mode = cassette_mode or DEFAULT_CONFIG.get('cassette_mode')
+        cassette_path = cassette_path or DEFAULT_CONFIG.get('cassette_path')
+        if self.cassette_mode not in (None, 'record', 'replay'):
+            raise ValueError(f"Modo de cassette no soportado: {self.cassette_mode}")
+        if self.cassette_mode == 'replay':
+            self.transport = ReplayTransport(cassette_path)
+        else:
+            # Una sesión HTTP por hilo (requests.Session no es thread-safe)
+            self.transport = HttpTransport(
+                get_api_headers(self.api_key),
+                connections_per_worker=DEFAULT_CONFIG['connections_per_worker'],
+            )
+            if self.cassette_mode == 'record':
+                self.transport = RecordingTransport(self.transport, cassette_path)
+        local_stores = self.cassette_mode is None
+        self.preconnect_interval = DEFAULT_CONFIG['preconnect_min_interval'] / 1000
+        self._last_preconnect = 0.0
         
         # Configuración de timeouts y reintentos
         self.max_retries = DEFAULT_CONFIG['max_retries']
         self.retry_delay = DEFAULT_CONFIG['retry_delay'] / 1000  # Convertir a segundos
-        self.timeout = DEFAULT_CONFIG['request_timeout'] / 1000  # Convertir a segundos
+        self.retry_max_delay = DEFAULT_CONFIG['retry_max_delay'] / 1000  # Convertir a segundos
+        # (conexión, lectura): una API caída falla en segundos, no en request_timeout
+        self.timeout = (DEFAULT_CONFIG['connect_timeout'] / 1000, DEFAULT_CONFIG['request_timeout'] / 1000)
+        
+        # Peticiones idénticas en vuelo comparten una sola llamada de red
+        self._single_flight = SingleFlight()
+        
+        # Contadores e histogramas de latencia por endpoint (ver RequestMetrics)
+        self.metrics = RequestMetrics()
+        
+        # Day summaries y usuarios reducidos a los campos usados, con strings internados
+        self.projector = PayloadProjector() if DEFAULT_CONFIG['ingestion_projection_enabled'] else None
+        
+        # Un circuit breaker por endpoint
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        
+        # Caches locales separados por cuenta: la misma URL base sirve a varias empresas
+        tenant = hashlib.sha256(f"{self.base_url}|{self.api_key}".encode('utf-8')).hexdigest()[:16]
+        self.cache_directory = os.path.join(DEFAULT_CONFIG['cache_directory'], tenant)
+        
+        # Cache persistente de respuestas GET (opcional)
+        self.response_cache = None
+        if DEFAULT_CONFIG['response_cache_enabled'] and local_stores:
+            self.response_cache = ResponseCache(
+                os.path.join(self.cache_directory, 'responses.sqlite3'),
+                max_bytes=DEFAULT_CONFIG['response_cache_max_mb'] * 1024 * 1024,
+                ttl_by_endpoint=DEFAULT_CONFIG['response_cache_ttl'],
+                default_ttl=DEFAULT_CONFIG['response_cache_default_ttl'],
+                closed_range_ttl=DEFAULT_CONFIG['response_cache_closed_range_ttl'],
+                closed_range_days=DEFAULT_CONFIG['response_cache_closed_range_days'],
+            )
+        
+        # Almacén de day summaries por (empleado, fecha) para descargar solo lo faltante
+        self.day_store = None
+        if DEFAULT_CONFIG['day_store_enabled'] and local_stores:
+            self.day_store = DaySummaryStore(
+                os.path.join(self.cache_directory, 'day_summaries.sqlite3'),
+                mutable_days=DEFAULT_CONFIG['day_store_mutable_days'],
+            )
+        
+        # Checkpoints por ejecución para reanudar reportes que fallaron a mitad de camino
+        self.checkpoints = None
+        if DEFAULT_CONFIG['checkpoints_enabled'] and local_stores:
+            self.checkpoints = CheckpointStore(
+                os.path.join(self.cache_directory, 'checkpoints.sqlite3'),
+                max_age_hours=DEFAULT_CONFIG['checkpoint_max_age_hours'],
+            )
+        
+        # Motor asíncrono: máximo de peticiones en vuelo y pool de hilos para requests
+        self.max_concurrency = DEFAULT_CONFIG['max_workers']
+        
+        # Paginación: páginas simultáneas por consulta y límites de página a sondear
+        self.page_fanout = DEFAULT_CONFIG['page_fanout']
+        self.page_limit_candidates = sorted(DEFAULT_CONFIG['page_limit_candidates'], reverse=True)
+        self._page_limits = {}  # endpoint -> mayor limit aceptado por el servidor
+        self.stream_queue_size = DEFAULT_CONFIG['stream_queue_size']
+        # Celdas fallidas: cuántas sub-celdas se prueban al dividirlas para aislar el problema
+        self.bisect_max_attempts = DEFAULT_CONFIG['bisect_max_attempts']
+        # Hedging: una página de la grilla más lenta que el p95 del endpoint se pide de nuevo
+        self.hedge_enabled = DEFAULT_CONFIG['hedge_enabled'] and self.cassette_mode != 'replay'
+        self.hedge_percentile = DEFAULT_CONFIG['hedge_percentile']
+        self.hedge_min_samples = DEFAULT_CONFIG['hedge_min_samples']
+        self.hedge_min_delay = DEFAULT_CONFIG['hedge_min_delay_ms'] / 1000
+        self.hedge_initial_delay = DEFAULT_CONFIG['hedge_initial_delay_ms'] / 1000
+        self.hedge_budget = HedgeBudget(
+            ratio=DEFAULT_CONFIG['hedge_max_ratio'],
+            burst=DEFAULT_CONFIG['hedge_burst'],
+            max_in_flight=DEFAULT_CONFIG['hedge_max_in_flight'],
+        )
+        
+        # Empleados por consulta y días por chunk de day summaries, aprendidos entre ejecuciones
+        autotune = DEFAULT_CONFIG['batch_autotune_enabled'] and local_stores
+        self.batch_tuner = BatchTuner(
+            os.path.join(self.cache_directory, 'batch_tuning.json') if autotune else None,
+            initial_users=DEFAULT_CONFIG['batch_size_users'],
+            initial_days=DEFAULT_CONFIG['batch_size_dates'],
+            max_days=DEFAULT_CONFIG['batch_max_days'],
+            max_url_length=DEFAULT_CONFIG['max_url_length'],
+            max_workers=self.max_concurrency,
+            target_seconds=DEFAULT_CONFIG['batch_target_query_ms'] / 1000,
+            learn=autotune,
+        )
+        # Las fichadas tienen otra densidad (pocas por día): se ajustan aparte
+        self.entries_batch_tuner = BatchTuner(
+            os.path.join(self.cache_directory, 'batch_tuning_entries.json') if autotune else None,
+            initial_users=DEFAULT_CONFIG['batch_size_users'],
+            initial_days=DEFAULT_CONFIG['batch_size_dates'],
+            max_days=DEFAULT_CONFIG['batch_max_days'],
+            max_url_length=DEFAULT_CONFIG['max_url_length'],
+            max_workers=self.max_concurrency,
+            target_seconds=DEFAULT_CONFIG['batch_target_query_ms'] / 1000,
+            learn=autotune,
+        )
+        
+        # Control adaptativo: token bucket + AIMD sobre concurrencia y tasa
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=DEFAULT_CONFIG['rate_limit_per_second'],
+            max_rate=DEFAULT_CONFIG['rate_limit_max_per_second'],
+            burst=DEFAULT_CONFIG['rate_limit_burst'],
+            concurrency=min(DEFAULT_CONFIG['aimd_initial_concurrency'], self.max_concurrency),
+            min_concurrency=DEFAULT_CONFIG['aimd_min_concurrency'],
+            max_concurrency=self.max_concurrency,
+            increase=DEFAULT_CONFIG['aimd_increase'],
+            decrease_factor=DEFAULT_CONFIG['aimd_decrease_factor'],
+            latency_spike_factor=DEFAULT_CONFIG['aimd_latency_spike_factor'],
+            bulk_every=DEFAULT_CONFIG['lane_bulk_every'],
+        )
+        if self.cassette_mode == 'replay':
+            # Sin red no hay cuota que cuidar: el limitador no frena la reproducción
+            self.rate_limiter.rate = self.rate_limiter.max_rate = 1e6
+            self.rate_limiter.concurrency = self.max_concurrency
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._executor_lock = threading.Lock()
+    
+    def close(self):
+        """Libera los pools de hilos y la sesión HTTP"""
+        with self._executor_lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors = {}
+        self.transport.close()
+        if self.response_cache:
+            self.response_cache.close()
+        if self.day_store:
+            self.day_store.close()
+        if self.checkpoints:
+            self.checkpoints.close()
+    
+    @property
+    def session(self):
+        """Sesión HTTP del hilo actual"""
+        return self.transport.session
+    
+    def preconnect(self):
+        """
+        Abre en segundo plano las conexiones keep-alive de los workers (DNS + TCP + TLS)
+        para que la primera ráfaga del reporte no pague el handshake.
+        No bloquea; se ignora si ya se hizo hace menos de preconnect_min_interval.
+        """
+        now = time.monotonic()
+        if now - self._last_preconnect < self.preconnect_interval:
+            return
+        self._last_preconnect = now
+        workers = min(self.max_concurrency, math.ceil(self.rate_limiter.concurrency))
+        self.transport.preconnect(self.base_url, self._get_executor(), workers)
     
     def test_connection(self) -> Tuple[bool, str]:
         """
-        Prueba la conexión con la API
+        Prueba la conexión con la API (carril interactivo)
         Returns: (success: bool, message: str)
         """
         try:
-            response = self._make_request('GET', API_ENDPOINTS['users'], params={'page': 1, 'limit': 1})
+            with request_lane(INTERACTIVE):
+                response = self._make_request('GET', API_ENDPOINTS['users'], params={'page': 1, 'limit': 1},
+                                              use_cache=False)
             if response:
                 return True, "Conexión exitosa con la API"
             else:
@@ -40,49 +242,36 @@ class HumanApiClient:
         except Exception as e:
             return False, f"Error de conexión: {str(e)}"
     
-    def get_users(self, filters: Dict = None) -> List[Dict]:
+    def get_users(self, filters: Dict = None, use_cache: bool = True) -> List[Dict]:
         """
-        Obtiene la lista de usuarios desde la API usando paginación
+        Obtiene la lista de usuarios desde la API usando paginación.
+        Va por el carril interactivo: la interfaz espera el directorio.
         Args:
             filters: Filtros opcionales para usuarios
+            use_cache: False para pedir todas las páginas al servidor, sin el cache de respuestas
         Returns:
             Lista de usuarios
         """
+        # Si otro hilo ya está cargando el directorio, esperar su resultado
+        key = ('get_users', ResponseCache.make_key(API_ENDPOINTS['users'], filters), use_cache)
+        with request_lane(INTERACTIVE):
+            return self._single_flight.do(key, lambda: self._run_sync(self.get_users_async(filters, use_cache)))
+    
+    async def get_users_async(self, filters: Dict = None, use_cache: bool = True) -> List[Dict]:
+        """
+        Versión asíncrona de get_users: la primera página informa el total
+        y el resto de las páginas se piden en paralelo
+        """
         try:
-            params = {
-                'page': 1,
-                'limit': 50, 
-            }
-            if filters:
-                params.update(filters)
+            params = dict(filters) if filters else {}
             
-            all_users = []
-            page = 1
-            has_more_pages = True
-            
-            while has_more_pages:
-                params['page'] = page
-                response = self._make_request('GET', API_ENDPOINTS['users'], params=params)
-                
-                # La API de usuarios devuelve {count: X, users: [...]} según el proyecto anterior
-                if response and 'users' in response and len(response['users']) > 0:
-                    #print('response users',response['users'])
-                    all_users.extend(response['users'])
-                    
-                    # Calcular si hay más páginas basándose en count total
-                    total_users = response.get('count', 0)
-                    users_obtained = page * params['limit']
-                    has_more_pages = users_obtained < total_users
-                    page += 1
-                else:
-                    has_more_pages = False
+            # La API de usuarios devuelve {count: X, users: [...]}
+            all_users = await self._fetch_all_pages_async(API_ENDPOINTS['users'], params, 'users',
+                                                          use_cache=use_cache)
+            if self.projector:
+                all_users = self.projector.users(all_users)
             
             print(f"✅ Obtenidos {len(all_users)} usuarios de la API")
-            # for user in all_users:
-            #     for seg in user.get("segmentations", []):
-            #         if seg.get("group") == "CONVENIO":
-            #             print(f"Usuario {user['employeeInternalId']} -> {seg['item']}")
-
             return all_users
                 
         except Exception as e:
@@ -92,7 +281,8 @@ class HumanApiClient:
     def get_time_tracking_entries(self, start_date: str, end_date: str, 
                                 user_ids: List[str] = None) -> List[Dict]:
         """
-        Obtiene las entradas de seguimiento de tiempo
+        Obtiene las entradas de seguimiento de tiempo (fichadas crudas) de todo el rango
+        (envoltorio síncrono de get_time_tracking_entries_async)
         Args:
             start_date: Fecha de inicio (YYYY-MM-DD)
             end_date: Fecha de fin (YYYY-MM-DD)
@@ -100,37 +290,49 @@ class HumanApiClient:
         Returns:
             Lista de entradas de tiempo
         """
-
-        print("ejecutandose get_time_tracking")
-        try:
-            params = {
-                'startDate': start_date,
-                'endDate': end_date,
-                'limit': 100
-                
-            }
-            
-            if user_ids:
-                params['userIds'] = ','.join(user_ids)
-            
-            print("params", params)
-            response = self._make_request('GET', API_ENDPOINTS['time_tracking_entries'], params=params)
-            if response and 'data' in response:
-                entries = response['data']
-                print(f"✅ Obtenidas {len(entries)} entradas de tiempo")
-                return entries
-            else:
-                print("❌ No se pudieron obtener entradas de tiempo")
-                return []
-                
-        except Exception as e:
-            print(f"❌ Error obteniendo entradas de tiempo: {str(e)}")
-            return []
+        return self._run_sync(self.get_time_tracking_entries_async(start_date, end_date, user_ids))
+    
+    async def get_time_tracking_entries_async(self, start_date: str, end_date: str,
+                                              user_ids: List[str] = None,
+                                              on_batch: Callable = None,
+                                              on_progress: Callable = None,
+                                              cancel_token: CancellationToken = None) -> List[Dict]:
+        """
+        Versión asíncrona de get_time_tracking_entries: misma grilla, paginación
+        y concurrencia que los day summaries (ver get_day_summaries_async), mucho
+        más liviana cuando solo interesan las fichadas
+        """
+        endpoint = API_ENDPOINTS['time_tracking_entries']
+        user_ids = await self._resolve_user_ids_async(user_ids)
+        grid = self._build_grid([
+            {'user_ids': user_ids, 'start_date': start_date, 'end_date': end_date}
+        ], endpoint)
+        return await self._collect_grid_async(grid, on_batch, on_progress, cancel_token=cancel_token,
+                                              endpoint=endpoint)
+    
+    def iter_time_tracking_entries(self, start_date: str, end_date: str, user_ids: List[str] = None,
+                                   chunks: bool = False) -> Iterator:
+        """Generador de entradas de tiempo, página a página (ver iter_day_summaries)"""
+        return self._iterate_sync(self.aiter_time_tracking_entries(start_date, end_date, user_ids, chunks))
+    
+    async def aiter_time_tracking_entries(self, start_date: str, end_date: str, user_ids: List[str] = None,
+                                          chunks: bool = False, on_batch: Callable = None,
+                                          on_progress: Callable = None,
+                                          cancel_token: CancellationToken = None) -> AsyncIterator:
+        """Versión asíncrona de iter_time_tracking_entries (ver aiter_day_summaries)"""
+        user_ids = await self._resolve_user_ids_async(user_ids)
+        grid = self._build_grid([
+            {'user_ids': user_ids, 'start_date': start_date, 'end_date': end_date}
+        ], API_ENDPOINTS['time_tracking_entries'])
+        async for element in self._aiter_grid_async(grid, chunks, on_batch, on_progress,
+                                                    cancel_token=cancel_token):
+            yield element
     
     def get_day_summaries(self, start_date: str, end_date: str, 
                          user_ids: List[str] = None) -> List[Dict]:
         """
         Obtiene los resúmenes diarios usando lotes optimizados y procesamiento paralelo
+        (envoltorio síncrono de get_day_summaries_async)
         Args:
             start_date: Fecha de inicio (YYYY-MM-DD)
             end_date: Fecha de fin (YYYY-MM-DD)
@@ -138,93 +340,709 @@ class HumanApiClient:
         Returns:
             Lista de resúmenes diarios
         """
+        return self._run_sync(self.get_day_summaries_async(start_date, end_date, user_ids))
+    
+    async def get_day_summaries_async(self, start_date: str, end_date: str, 
+                                      user_ids: List[str] = None,
+                                      on_batch: Callable = None,
+                                      on_progress: Callable = None,
+                                      cancel_token: CancellationToken = None) -> List[Dict]:
+        """
+        Versión asíncrona de get_day_summaries: descarga la grilla completa del
+        rango (ver aiter_day_summaries) y junta todas las páginas en una lista
+        Args:
+            on_batch: Callback opcional on_batch(batch, items), solo para lotes completos
+                      (o las partes recuperadas de uno que falló)
+            on_progress: Callback opcional on_progress(celdas_terminadas, total_celdas, batch)
+            cancel_token: Si se cancela, la descarga se corta con OperationCancelled
+        """
+        user_ids = await self._resolve_user_ids_async(user_ids)
+        grid = self._build_day_summary_grid([
+            {'user_ids': user_ids, 'start_date': start_date, 'end_date': end_date}
+        ])
+        return await self._collect_grid_async(grid, on_batch, on_progress, cancel_token=cancel_token)
+    
+    async def _collect_grid_async(self, grid: List[Dict], on_batch: Callable = None,
+                                  on_progress: Callable = None, run_id: str = None,
+                                  cancel_token: CancellationToken = None,
+                                  endpoint: str = None,
+                                  partitioner: EmployeePartitioner = None,
+                                  failures: List[Dict] = None,
+                                  until_deadline: bool = False) -> List[Dict]:
+        """
+        Descarga toda la grilla (por defecto, de day summaries) y junta las páginas en una lista.
+        Con partitioner las páginas no se juntan: se reparten por empleado a medida que
+        llegan (ver EmployeePartitioner) y se devuelve una lista vacía.
+        Con until_deadline y partitioner, vencer el tiempo límite de cancel_token no es un
+        error: la descarga se corta y solo quedan entregados los empleados completos.
+        """
+        endpoint = endpoint or API_ENDPOINTS['day_summaries']
+        project = None
+        if self.projector and endpoint == API_ENDPOINTS['day_summaries']:
+            project = self.projector.day_summaries
+        label = self.GRID_ENDPOINTS[endpoint][2]
         try:
-            # Lotes más grandes para mejor rendimiento
-            BATCH_SIZE = 15
             all_items = []
+            on_cell_done = None
+            if partitioner:
+                await self._offload(partitioner.start)
+                on_cell_done = partitioner.cell_done
+            grid_pages = self._aiter_grid_async(grid, True, on_batch, on_progress,
+                                                run_id, cancel_token, on_cell_done, failures)
+            try:
+                async for page_items in grid_pages:
+                    page_items = project(page_items) if project else page_items
+                    if partitioner:
+                        # En el hilo de _offload, como cell_done: el partitioner no se toca desde dos hilos
+                        await self._offload(partitioner.add_page, page_items)
+                    else:
+                        all_items.extend(page_items)
+            finally:
+                # Cancelada mientras esperaba a _offload: el generador se cierra acá y no al apagar el loop
+                await grid_pages.aclose()
+            if partitioner:
+                await self._offload(partitioner.finish)
             
-            if not user_ids:
-                # Si no hay user_ids específicos, obtener todos los usuarios
-                users = self.get_users()
-                user_ids = [u.get('employeeInternalId') for u in users if u.get('employeeInternalId')]
-            
-            print(f"📋 Procesando {len(user_ids)} empleados en lotes de {BATCH_SIZE}...")
-            
-            # Crear lotes
-            batches = []
-            for i in range(0, len(user_ids), BATCH_SIZE):
-                batch = user_ids[i:i + BATCH_SIZE]
-                batches.append({
-                    'batch_number': (i // BATCH_SIZE) + 1,
-                    'user_ids': batch,
-                    'start_date': start_date,
-                    'end_date': end_date
-                })
-            
-            # Procesar lotes en paralelo
-            with ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_batch = {
-                    executor.submit(self._process_batch_summaries, batch): batch 
-                    for batch in batches
-                }
-                
-                for future in as_completed(future_to_batch):
-                    batch = future_to_batch[future]
-                    try:
-                        batch_items = future.result()
-                        all_items.extend(batch_items)
-                        print(f"✅ Lote {batch['batch_number']}: {len(batch_items)} day summaries")
-                    except Exception as e:
-                        print(f"❌ Error en lote {batch['batch_number']}: {str(e)}")
-            
-            print(f"✅ Obtenidos {len(all_items)} resúmenes diarios")
+            print(f"✅ Obtenidos {partitioner.items if partitioner else len(all_items)} {label}")
             return all_items
                 
+        except (OperationCancelled, asyncio.CancelledError) as e:
+            if isinstance(e, asyncio.CancelledError):
+                # El token cancela la tarea, que puede estar esperando a _offload y no en la cola
+                if not (cancel_token and cancel_token.is_cancelled):
+                    raise
+                e = cancel_token.error()
+            if until_deadline and partitioner and e.reason == 'deadline':
+                print(f"⏱️ Tiempo límite de descarga: {partitioner.items} {label} de empleados completos")
+                return all_items
+            raise e
         except Exception as e:
-            print(f"❌ Error obteniendo resúmenes diarios: {str(e)}")
+            print(f"❌ Error obteniendo {label}: {str(e)}")
             return []
     
+    def iter_day_summaries(self, start_date: str, end_date: str, user_ids: List[str] = None,
+                           chunks: bool = False) -> Iterator:
+        """
+        Generador de day summaries: entrega cada página apenas se decodifica,
+        sin esperar al resto del rango. La descarga corre en un hilo aparte y se
+        frena cuando el consumidor se atrasa (cola acotada), por lo que la memoria
+        no crece con el tamaño del reporte.
+        Args:
+            start_date: Fecha de inicio (YYYY-MM-DD)
+            end_date: Fecha de fin (YYYY-MM-DD)
+            user_ids: Lista opcional de IDs de usuarios
+            chunks: Si True entrega listas (una por página) en vez de items sueltos
+        """
+        return self._iterate_sync(self.aiter_day_summaries(start_date, end_date, user_ids, chunks))
+    
+    async def aiter_day_summaries(self, start_date: str, end_date: str, user_ids: List[str] = None,
+                                  chunks: bool = False, on_batch: Callable = None,
+                                  on_progress: Callable = None,
+                                  cancel_token: CancellationToken = None) -> AsyncIterator:
+        """
+        Versión asíncrona de iter_day_summaries: el rango se reparte en la grilla
+        (chunk de fechas × lote de empleados) y todas las celdas se descargan
+        concurrentemente; las páginas se entregan en orden de llegada.
+        Los errores de una celda se registran y no cortan la iteración.
+        Args:
+            on_batch: Callback opcional on_batch(batch, items), solo para lotes completos
+                      (o las partes recuperadas de uno que falló)
+            on_progress: Callback opcional on_progress(celdas_terminadas, total_celdas, batch)
+            cancel_token: Si se cancela, la iteración se corta con OperationCancelled
+        """
+        user_ids = await self._resolve_user_ids_async(user_ids)
+        grid = self._build_day_summary_grid([
+            {'user_ids': user_ids, 'start_date': start_date, 'end_date': end_date}
+        ])
+        async for element in self._aiter_grid_async(grid, chunks, on_batch, on_progress,
+                                                    cancel_token=cancel_token):
+            yield element
+    
+    async def _resolve_user_ids_async(self, user_ids: List[str] = None) -> List[str]:
+        """Si no hay user_ids específicos, obtiene los de todos los usuarios"""
+        if user_ids:
+            return user_ids
+        users = await self.get_users_async()
+        return [u.get('employeeInternalId') for u in users if u.get('employeeInternalId')]
+    
+    def _build_day_summary_grid(self, units: List[Dict]) -> List[Dict]:
+        """Grilla de day summaries (ver _build_grid)"""
+        return self._build_grid(units, API_ENDPOINTS['day_summaries'])
+    
+    def _build_grid(self, units: List[Dict], endpoint: str) -> List[Dict]:
+        """
+        Arma por adelantado todas las celdas (chunk de fechas × lote de empleados).
+        El tamaño de chunks y lotes lo decide el BatchTuner del endpoint según lo observado.
+        Args:
+            units: Lista de {'user_ids', 'start_date', 'end_date'}
+            endpoint: Uno de GRID_ENDPOINTS
+        Returns:
+            Lista de celdas {'batch_number', 'chunk_number', 'endpoint', 'user_ids',
+            'start_date', 'end_date', 'days'}
+        """
+        ids_param = self.GRID_ENDPOINTS[endpoint][0]
+        tuner = self._tuner_for(endpoint)
+        page_limit = self._planning_page_limit(endpoint)
+        grid = []
+        chunk_number = 0
+        for unit in units:
+            chunk_days = self._chunk_days(unit['user_ids'], unit['start_date'], unit['end_date'], endpoint)
+            for chunk in self._split_date_range(unit['start_date'], unit['end_date'], chunk_days):
+                chunk_number += 1
+                # URL sin la lista de empleados, con page/limit del peor caso
+                url_overhead = len(f"{self.base_url}{endpoint}?{ids_param}=&startDate={chunk['start_date']}"
+                                   f"&endDate={chunk['end_date']}&page=99999&limit={page_limit}")
+                for batch in tuner.make_batches(
+                    unit['user_ids'], chunk['days'], page_limit, self.page_fanout, url_overhead
+                ):
+                    grid.append({
+                        'batch_number': len(grid) + 1,
+                        'chunk_number': chunk_number,
+                        'endpoint': endpoint,
+                        'user_ids': batch,
+                        'start_date': chunk['start_date'],
+                        'end_date': chunk['end_date'],
+                        'days': chunk['days'],
+                    })
+        
+        employees = len({e for unit in units for e in unit['user_ids']})
+        print(f"📋 Procesando {employees} empleados: {chunk_number} chunks de fechas, {len(grid)} celdas")
+        return grid
+    
+    async def _aiter_grid_async(self, grid: List[Dict], chunks: bool = False,
+                                on_batch: Callable = None, on_progress: Callable = None,
+                                run_id: str = None, cancel_token: CancellationToken = None,
+                                on_cell_done: Callable = None, failures: List[Dict] = None) -> AsyncIterator:
+        """
+        Descarga todas las celdas de la grilla con un único semáforo de max_workers
+        peticiones en vuelo, sin barreras entre chunks de fechas: el pool de hilos
+        no se vacía hasta que no quedan páginas pendientes en toda la grilla.
+        Con run_id cada página se guarda en el checkpoint de la ejecución; las celdas
+        ya completas se leen de disco y las incompletas siguen desde la última página.
+        Al cancelarse cancel_token se cancela la tarea que consume la grilla: las
+        peticiones en cola se descartan y la iteración termina con OperationCancelled.
+        Si cancel_token tiene tiempo límite, las celdas se piden por empleado (todos los
+        chunks de fechas de un lote antes del siguiente, ver _employee_major): al vencer
+        quedan empleados completos en vez de unos días de cada uno.
+        Una celda que falla por algo que puede depender de su contenido (un empleado,
+        una página enorme, un timeout de lectura) se divide en mitades, primero por
+        empleados y después por días, hasta aislar las unidades que fallan solas
+        (ver _bisect_cell_async); las que no se pudieron recuperar se agregan a failures.
+        on_cell_done(batch, fallidas) se llama del lado del consumidor después de entregar
+        todas las páginas de la celda, con la lista de unidades que fallaron.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Cola acotada: si el consumidor se atrasa, las celdas dejan de pedir páginas
+        pages = asyncio.Queue(maxsize=self.stream_queue_size)
+        done = object()
+        cell_done = object()
+        finished = 0
+        checkpoint = self.checkpoints if run_id else None
+        done_cells = await self._offload(checkpoint.done_cells, run_id) if checkpoint else set()
+        
+        async def restore_batch(batch):
+            stored = (await self._offload(checkpoint.load_pages, run_id, batch['batch_number']))[0]
+            for page in sorted(stored):
+                await pages.put(stored[page])
+        
+        async def run_batch(batch, span):
+            nonlocal finished
+            cell = batch['batch_number']
+            endpoint = self._cell_endpoint(batch)
+            batch_items = [] if on_batch else None
+            items_by_employee = {}
+            # Claves de lo ya entregado: si la celda falla, lo recuperado al dividirla no se repite
+            delivered = set() if self.bisect_max_attempts else None
+            resume = on_page = None
+            if checkpoint and cell not in done_cells:
+                resume = await self._offload(checkpoint.load_pages, run_id, cell)
+                if resume[0] and 1 not in resume[0]:
+                    # Quedó a medio dividir: se vuelve a pedir la celda entera
+                    await self._offload(checkpoint.clear_pages, run_id, cell)
+                    resume = None
+                
+                async def on_page(page, page_items, total_pages, limit, provisional=False):
+                    await self._offload(checkpoint.save_page, run_id, cell, page, page_items,
+                                        total_pages, limit, provisional)
+            try:
+                if cell in done_cells:
+                    span.set(restored=True)
+                    await restore_batch(batch)
+                    finished += 1
+                    if on_progress:
+                        on_progress(finished, len(grid), batch)
+                    return []
+                async for page_items in self._aiter_batch_async(batch, semaphore, resume, on_page,
+                                                                cancel_token):
+                    for item in page_items:
+                        employee_id = item.get('employeeId')
+                        items_by_employee[employee_id] = items_by_employee.get(employee_id, 0) + 1
+                    if delivered is not None:
+                        delivered.update(self._item_key(item) for item in page_items)
+                    if on_batch:
+                        batch_items.extend(page_items)
+                    await pages.put(page_items)
+                self._tuner_for(endpoint).observe(
+                    batch['user_ids'], batch['days'], items_by_employee,
+                    self.rate_limiter.snapshot()['latency'], self._planning_page_limit(endpoint)
+                )
+                if on_batch:
+                    await self._offload(on_batch, batch, batch_items)
+                if checkpoint:
+                    await self._offload(checkpoint.mark_cell_done, run_id, cell)
+                span.set(items=sum(items_by_employee.values()))
+                print(f"✅ Lote {batch['batch_number']}: {sum(items_by_employee.values())} "
+                      f"{self.GRID_ENDPOINTS[endpoint][2]}")
+                failed = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.bisect_max_attempts and self._should_bisect(e):
+                    failed = await self._bisect_cell_async(batch, e, delivered, semaphore, pages,
+                                                           on_batch, run_id, cancel_token)
+                else:
+                    print(f"❌ Error en lote {batch['batch_number']}: {str(e)}")
+                    failed = [self._failed_unit(batch, e)]
+                if failures is not None:
+                    failures.extend(failed)
+                span.set(failed_units=len(failed))
+            finished += 1
+            if on_progress:
+                on_progress(finished, len(grid), batch)
+            return failed
+        
+        async def traced_batch(batch):
+            with tracer.span('cell', 'grid', async_span=True, batch=batch['batch_number'],
+                             chunk=batch['chunk_number'], employees=len(batch['user_ids']),
+                             days=batch['days']) as span:
+                failed = await run_batch(batch, span)
+            if on_cell_done:
+                # Por la misma cola que las páginas: el consumidor ya recibió toda la celda
+                await pages.put((cell_done, batch, failed))
+        
+        order = grid
+        if cancel_token and cancel_token.deadline is not None:
+            order = self._employee_major(grid)
+        
+        async def run_all():
+            with tracer.span('grid', 'grid', async_span=True, cells=len(grid)):
+                # Las celdas toman el semáforo en el orden en que arrancan
+                await asyncio.gather(*(traced_batch(batch) for batch in order))
+            await pages.put(done)
+        
+        unregister = None
+        if cancel_token:
+            loop = asyncio.get_running_loop()
+            consumer = asyncio.current_task()
+            unregister = cancel_token.on_cancel(lambda: loop.call_soon_threadsafe(consumer.cancel))
+        
+        producer = asyncio.ensure_future(run_all())
+        try:
+            while True:
+                page_items = await pages.get()
+                if page_items is done:
+                    break
+                if type(page_items) is tuple and page_items[0] is cell_done:
+                    await self._offload(on_cell_done, page_items[1], page_items[2])
+                    continue
+                if chunks:
+                    yield page_items
+                else:
+                    for item in page_items:
+                        yield item
+            await producer
+        except asyncio.CancelledError:
+            if cancel_token and cancel_token.is_cancelled:
+                raise cancel_token.error() from None
+            raise
+        finally:
+            if unregister:
+                unregister()
+            producer.cancel()
+            for endpoint in {self._cell_endpoint(batch) for batch in grid}:
+                self._tuner_for(endpoint).save()
+    
+    async def _bisect_cell_async(self, batch: Dict, error: Exception, delivered: set,
+                                 semaphore: asyncio.Semaphore, pages: asyncio.Queue,
+                                 on_batch: Callable = None, run_id: str = None,
+                                 cancel_token: CancellationToken = None) -> List[Dict]:
+        """
+        Recupera una celda que falló pidiéndola en mitades (ver _split_cell) hasta
+        aislar las unidades que fallan solas, con a lo sumo bisect_max_attempts
+        sub-celdas. Cada sub-celda completa se entrega (sin lo que ya se había
+        entregado de la celda), se pasa a on_batch y se guarda en el checkpoint.
+        La celda queda completa en el checkpoint si lo único que falló son unidades
+        de un empleado y un día; si no, el próximo intento la vuelve a pedir entera.
+        Returns:
+            Unidades que fallaron (ver _failed_unit)
+        """
+        cell = batch['batch_number']
+        checkpoint = self.checkpoints if run_id else None
+        print(f"🔀 Lote {cell} falló ({str(error)}): dividiendo para aislar el problema")
+        if checkpoint:
+            # Lo recuperado reemplaza las páginas de la celda
+            checkpoint.clear_pages(run_id, cell)
+        
+        units = self._split_cell(batch)
+        attempts = self.bisect_max_attempts
+        # Una celda de un empleado y un día no se divide: ya es la unidad que falla
+        recovered, failed = 0, [] if units else [self._failed_unit(batch, error)]
+        while units:
+            unit = units.pop(0)
+            if attempts <= 0:
+                failed.append(self._failed_unit(unit, error))
+                continue
+            attempts -= 1
+            items = []
+            try:
+                with tracer.span('bisect', 'grid', async_span=True, batch=cell,
+                                 employees=len(unit['user_ids']), days=unit['days']) as span:
+                    async for page_items in self._aiter_batch_async(unit, semaphore, cancel_token=cancel_token,
+                                                                  bisect=True):
+                        items.extend(page_items)
+                    span.set(items=len(items))
+            except (asyncio.CancelledError, OperationCancelled):
+                raise
+            except Exception as e:
+                halves = self._split_cell(unit) if self._should_bisect(e) else []
+                if halves:
+                    units[:0] = halves
+                else:
+                    failed.append(self._failed_unit(unit, e))
+                continue
+            
+            if on_batch:
+                await self._offload(on_batch, unit, items)
+            if checkpoint:
+                await self._offload(checkpoint.save_page, run_id, cell, self.RECOVERED_PAGE_BASE + recovered,
+                                    items, 0, 0)
+            recovered += 1
+            fresh = [item for item in items if self._item_key(item) not in delivered]
+            if fresh:
+                await pages.put(fresh)
+        
+        isolated = all(len(unit['employee_ids']) == 1 and unit['start_date'] == unit['end_date']
+                       for unit in failed)
+        if checkpoint and isolated:
+            await self._offload(checkpoint.mark_cell_done, run_id, cell)
+        for unit in failed:
+            print(f"❌ Lote {cell}: sin datos de {', '.join(unit['employee_ids'])} "
+                  f"({unit['start_date']} a {unit['end_date']}): {unit['error']}")
+        print(f"🔀 Lote {cell}: {recovered} sub-celdas recuperadas, {len(failed)} fallidas, "
+              f"{self.bisect_max_attempts - attempts} peticiones extra")
+        return failed
+    
+    @staticmethod
+    def _employee_major(grid: List[Dict]) -> List[Dict]:
+        """
+        Celdas ordenadas para completar empleados cuanto antes: primero las de los
+        empleados que aparecen antes en la grilla (por el último de la celda) y,
+        dentro de un mismo lote, por chunk de fechas
+        """
+        position = {}
+        for batch in grid:
+            for employee_id in batch['user_ids']:
+                position.setdefault(employee_id, len(position))
+        return sorted(grid, key=lambda batch: (max((position[e] for e in batch['user_ids']), default=0),
+                                               batch['chunk_number']))
+    
+    @staticmethod
+    def _split_cell(unit: Dict) -> List[Dict]:
+        """Mitades de una celda: primero por empleados, después por días ([] si ya es un empleado y un día)"""
+        user_ids = unit['user_ids']
+        if len(user_ids) > 1:
+            half = (len(user_ids) + 1) // 2
+            return [dict(unit, user_ids=user_ids[:half]), dict(unit, user_ids=user_ids[half:])]
+        if unit['days'] > 1:
+            first_days = (unit['days'] + 1) // 2
+            middle = datetime.strptime(unit['start_date'], '%Y-%m-%d') + timedelta(days=first_days - 1)
+            return [
+                dict(unit, end_date=middle.strftime('%Y-%m-%d'), days=first_days),
+                dict(unit, start_date=(middle + timedelta(days=1)).strftime('%Y-%m-%d'),
+                     days=unit['days'] - first_days),
+            ]
+        return []
+    
+    @staticmethod
+    def _should_bisect(error: Exception) -> bool:
+        """
+        Indica si vale la pena dividir la celda: errores que pueden depender de su
+        contenido (un empleado con datos rotos, una página enorme, un timeout de
+        lectura). No lo valen la cancelación, el circuito abierto, los errores de
+        conexión ni 401/403/404/429, que fallarían igual con celdas más chicas.
+        """
+        if isinstance(error, (OperationCancelled, CircuitOpenError)):
+            return False
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = error.response.status_code if error.response is not None else None
+            return status not in (401, 403, 404, 429)
+        return not isinstance(error, requests.exceptions.ConnectionError)
+    
+    @staticmethod
+    def _failed_unit(unit: Dict, error: Exception) -> Dict:
+        """Descripción de una unidad de la grilla que no se pudo descargar"""
+        return {
+            'endpoint': HumanApiClient._cell_endpoint(unit),
+            'employee_ids': list(unit['user_ids']),
+            'start_date': unit['start_date'],
+            'end_date': unit['end_date'],
+            'error': str(error),
+        }
+    
+    @staticmethod
+    def _item_key(item: Dict):
+        """Identidad de un item de la grilla (day summary o fichada), para no entregarlo dos veces"""
+        return item.get('id') or (item.get('employeeId'), item.get('referenceDate') or item.get('date'),
+                                  item.get('time'), item.get('type'))
+    
     def _process_batch_summaries(self, batch: Dict) -> List[Dict]:
         """
         Procesa un lote de usuarios para obtener day summaries
         """
+        return self._run_sync(self._process_batch_summaries_async(batch))
+    
+    async def _process_batch_summaries_async(self, batch: Dict, 
+                                             semaphore: asyncio.Semaphore = None) -> List[Dict]:
+        """
+        Obtiene todas las páginas de day summaries de un lote sin bloquear el loop
+        """
         batch_items = []
-        
+        async for page_items in self._aiter_batch_async(batch, semaphore):
+            batch_items.extend(page_items)
+        return batch_items
+    
+    def _aiter_batch_async(self, batch: Dict, semaphore: asyncio.Semaphore = None,
+                           resume: Tuple = None, on_page: Callable = None,
+                           cancel_token: CancellationToken = None,
+                           bisect: bool = False) -> AsyncIterator[List[Dict]]:
+        """Páginas de una celda de la grilla, a medida que llegan (ver _aiter_pages_async)"""
+        endpoint = self._cell_endpoint(batch)
+        ids_param, items_key, _ = self.GRID_ENDPOINTS[endpoint]
         params = {
-            'employeeIds': ','.join(batch['user_ids']),
+            ids_param: ','.join(batch['user_ids']),
             'startDate': batch['start_date'],
             'endDate': batch['end_date'],
-            'limit': 500,
-            'page': 1
         }
+        return self._aiter_pages_async(endpoint, params, items_key, semaphore,
+                                       resume, on_page, cancel_token, bisect)
+    
+    @staticmethod
+    def _cell_endpoint(batch: Dict) -> str:
+        """Endpoint de una celda (las grillas de checkpoints anteriores no lo guardan: day summaries)"""
+        return batch.get('endpoint') or API_ENDPOINTS['day_summaries']
+    
+    @staticmethod
+    def _page_items(response: Optional[Dict], items_key: Union[str, Tuple[str, ...]]) -> List[Dict]:
+        """Lista de items de una página; con varias claves posibles, la primera presente"""
+        response = response or {}
+        for key in (items_key if isinstance(items_key, tuple) else (items_key,)):
+            if key in response:
+                return response[key] or []
+        return []
+    
+    async def _fetch_all_pages_async(self, endpoint: str, params: Dict,
+                                     items_key: Union[str, Tuple[str, ...]],
+                                     semaphore: asyncio.Semaphore = None,
+                                     use_cache: bool = True) -> List[Dict]:
+        """
+        Descarga todas las páginas de un endpoint paginado (ver _aiter_pages_async)
+        Returns:
+            Elementos de todas las páginas, en orden de llegada
+        """
+        items = []
+        async for page_items in self._aiter_pages_async(endpoint, params, items_key, semaphore,
+                                                        use_cache=use_cache):
+            items.extend(page_items)
+        return items
+    
+    async def _aiter_pages_async(self, endpoint: str, params: Dict, items_key: Union[str, Tuple[str, ...]],
+                                 semaphore: asyncio.Semaphore = None, resume: Tuple = None,
+                                 on_page: Callable = None, cancel_token: CancellationToken = None,
+                                 bisect: bool = False, use_cache: bool = True) -> AsyncIterator[List[Dict]]:
+        """
+        Recorre un endpoint paginado entregando los elementos de cada página.
+        La primera página (pedida con el mayor limit aceptado) informa el total
+        ('totalPages' o 'count'); las restantes se piden en paralelo, con hasta
+        page_fanout páginas en vuelo para esta consulta y a lo sumo otras tantas
+        esperando a ser consumidas.
+        Args:
+            endpoint: Endpoint paginado
+            params: Parámetros de la consulta (sin page/limit)
+            items_key: Clave de la respuesta con la lista de elementos (o tupla de claves
+                       alternativas: se usa la primera presente)
+            semaphore: Semáforo global de peticiones en vuelo
+            resume: (páginas ya descargadas {página: items}, total de páginas, limit, total
+                    provisorio) de un checkpoint; se entregan sin salir a la red y se piden solo
+                    las que faltan (con total provisorio, de a una desde la última guardada)
+            on_page: Corutina on_page(página, items, total de páginas, limit, provisorio) por cada
+                     página descargada
+            cancel_token: Se pasa a cada petición (corta reintentos y esperas del limitador)
+            bisect: Aislando una celda que falló: los 5xx no se reintentan (ver _send_request)
+            use_cache: False para no servir ninguna página desde el cache de respuestas
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        stored, total_pages, limit, provisional = resume or ({}, None, None, False)
         
-        # Obtener todas las páginas para este lote
-        page = 1
-        has_more_pages = True
+        if 1 in stored:
+            for page in sorted(stored):
+                yield stored[page]
+            if provisional:
+                # Se paginaba sin totales: seguir de a una desde la última página guardada
+                last = max(stored)
+                async for page_items in self._aiter_pages_sequential_async(
+                    semaphore, endpoint, params, items_key, stored[last], limit, on_page, cancel_token, bisect,
+                    use_cache, first_page=last, resumed=True
+                ):
+                    yield page_items
+                return
+        else:
+            stored = {}
+            with tracer.span('page', 'page', async_span=True, endpoint=endpoint, page=1) as span:
+                first_page, limit = await self._fetch_first_page_async(semaphore, endpoint, params, items_key,
+                                                                       cancel_token, bisect, use_cache)
+                items = self._page_items(first_page, items_key)
+                span.set(items=len(items), limit=limit)
+            total_pages = (first_page or {}).get('totalPages')
+            if total_pages is None and 'count' not in (first_page or {}):
+                # Sin totales en la respuesta: seguir página a página mientras vengan llenas
+                async for page_items in self._aiter_pages_sequential_async(
+                    semaphore, endpoint, params, items_key, items, limit, on_page, cancel_token, bisect,
+                    use_cache
+                ):
+                    yield page_items
+                return
+            if total_pages is None:
+                total_pages = math.ceil((first_page or {}).get('count', 0) / limit)
+            self.metrics.record_query_pages(endpoint, max(total_pages, 1))
+            if on_page:
+                await on_page(1, items, max(total_pages, 1), limit)
+            if not items:
+                return
+            yield items
         
-        while has_more_pages:
-            params['page'] = page
-            
-            response = self._make_request('GET', API_ENDPOINTS['day_summaries'], params=params)
-            
-            if response and 'items' in response and len(response['items']) > 0:
-                batch_items.extend(response['items'])
-                
-                # Verificar si hay más páginas
-                has_more_pages = response.get('totalPages', 0) > page
-                page += 1
-            else:
-                has_more_pages = False
+        missing = [page for page in range(2, total_pages + 1) if page not in stored]
+        if not missing:
+            return
+        
+        remaining = iter(missing)
+        results = asyncio.Queue(maxsize=self.page_fanout)
+        
+        async def worker():
+            # Los workers comparten el iterador de páginas: cada uno toma la siguiente libre
+            for page in remaining:
+                try:
+                    with tracer.span('page', 'page', async_span=True, endpoint=endpoint, page=page) as span:
+                        response = await self._request_async(
+                            semaphore, 'GET', endpoint, params=dict(params, page=page, limit=limit),
+                            cancel_token=cancel_token, bisect=bisect, use_cache=use_cache
+                        )
+                        page_items = self._page_items(response, items_key)
+                        span.set(items=len(page_items))
+                    if on_page:
+                        await on_page(page, page_items, total_pages, limit)
+                    await results.put(page_items)
+                except Exception as e:
+                    await results.put(e)
+                    return
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.page_fanout, len(missing)))]
+        try:
+            for _ in range(len(missing)):
+                page_items = await results.get()
+                if isinstance(page_items, Exception):
+                    raise page_items
+                yield page_items
+        finally:
+            for task in workers:
+                task.cancel()
+    
+    async def _aiter_pages_sequential_async(self, semaphore: asyncio.Semaphore, endpoint: str, params: Dict,
+                                            items_key: Union[str, Tuple[str, ...]], first_items: List[Dict],
+                                            limit: int, on_page: Callable = None,
+                                            cancel_token: CancellationToken = None,
+                                            bisect: bool = False,
+                                            use_cache: bool = True,
+                                            first_page: int = 1,
+                                            resumed: bool = False) -> AsyncIterator[List[Dict]]:
+        """
+        Paginación para respuestas sin 'totalPages' ni 'count': a partir de la
+        primera página ya descargada, pide la siguiente mientras la anterior
+        venga llena. Para on_page el total es provisorio (una página más que la
+        actual mientras sigan llenas).
+        Con resumed, first_page es la última página de un checkpoint y first_items
+        sus items, que ya se entregaron y guardaron.
+        """
+        page, items = first_page, first_items
+        delivered = resumed
+        while True:
+            full = len(items) >= limit
+            if not delivered:
+                if on_page:
+                    await on_page(page, items, page + 1 if full else page, limit, True)
+                if items:
+                    yield items
+            delivered = False
+            if not full:
+                break
+            page += 1
+            with tracer.span('page', 'page', async_span=True, endpoint=endpoint, page=page) as span:
+                response = await self._request_async(
+                    semaphore, 'GET', endpoint, params=dict(params, page=page, limit=limit),
+                    cancel_token=cancel_token, bisect=bisect, use_cache=use_cache
+                )
+                items = self._page_items(response, items_key)
+                span.set(items=len(items))
+        self.metrics.record_query_pages(endpoint, page)
+    
+    async def _fetch_first_page_async(self, semaphore: asyncio.Semaphore, endpoint: str,
+                                      params: Dict, items_key: Union[str, Tuple[str, ...]],
+                                      cancel_token: CancellationToken = None,
+                                      bisect: bool = False,
+                                      use_cache: bool = True) -> Tuple[Optional[Dict], int]:
+        """
+        Pide la primera página con el mayor limit que acepta el servidor.
+        La primera vez sondea page_limit_candidates de mayor a menor: un 400/422
+        descarta el candidato, y si el servidor recorta la página en silencio se
+        toma como límite la cantidad realmente devuelta. El resultado queda
+        guardado por endpoint.
+        Returns:
+            (respuesta de la página 1, limit a usar en las páginas siguientes)
+        """
+        if endpoint in self._page_limits:
+            candidates = [self._page_limits[endpoint]]
+        else:
+            candidates = self.page_limit_candidates
+        
+        for i, limit in enumerate(candidates):
+            try:
+                response = await self._request_async(
+                    semaphore, 'GET', endpoint, params=dict(params, page=1, limit=limit),
+                    cancel_token=cancel_token, bisect=bisect, use_cache=use_cache
+                )
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status in (400, 422) and i < len(candidates) - 1:
+                    continue
+                raise
             
-            # Pausa mínima entre páginas
-            if has_more_pages:
-                time.sleep(0.1)
+            # Recorte silencioso: página incompleta pero quedan elementos ('count') o páginas ('totalPages')
+            returned = len(self._page_items(response, items_key))
+            total = (response or {}).get('count', 0)
+            total_pages = (response or {}).get('totalPages') or 0
+            if 0 < returned < limit and (returned < total or total_pages > 1):
+                limit = returned
+            self._page_limits[endpoint] = limit
+            return response, limit
         
-        return batch_items
+        return None, candidates[-1]
     
     def get_time_tracking_parallel_with_users(self, start_date: str, end_date: str, 
                                              users: List[Dict], 
-                                             progress_callback=None) -> Dict:
+                                             progress_callback=None,
+                                             run_id: str = None,
+                                             cancel_token: CancellationToken = None,
+                                             on_employee: Callable = None,
+                                             until_deadline: bool = False) -> Dict:
         """
         Obtiene datos de seguimiento de tiempo usando usuarios del cache (optimizado)
         Args:
@@ -232,6 +1050,20 @@ class HumanApiClient:
             end_date: Fecha de fin  
             users: Lista de usuarios ya obtenidos del cache
             progress_callback: Callback de progreso
+            run_id: ID de la ejecución para los checkpoints (por defecto, derivado del
+                    rango y los empleados: repetir el mismo reporte reanuda el anterior)
+            cancel_token: Si se cancela se lanza OperationCancelled; lo ya descargado
+                          queda en el checkpoint para reanudar
+            on_employee: Modo en cadena: on_employee(employee_id, day_summaries) se llama una
+                         vez por empleado apenas están completas todas sus celdas, mientras
+                         sigue la descarga; 'entries' del resultado queda vacío
+            until_deadline: Al vencer el tiempo límite de cancel_token, devolver lo de los
+                            empleados completos (las celdas se piden por empleado) en vez
+                            de lanzar OperationCancelled
+        Returns:
+            Resultado con 'failed_cells': unidades (empleados × fechas) que no se pudieron
+            descargar ni aisladas; sus datos faltan en 'entries'. Si se cortó por el tiempo
+            límite, 'partial' y 'pending_employees' (IDs sin datos, en el orden de users)
         """
         try:
             print(f"🚀 Iniciando procesamiento paralelo: {start_date} a {end_date}")
@@ -246,32 +1078,68 @@ class HumanApiClient:
             
             print(f"👥 Procesando {len(users)} usuarios")
             
-            # 2. Dividir rango de fechas en chunks
-            if progress_callback:
-                progress_callback(20, "📅 Dividiendo rango de fechas...")
-            
-            date_chunks = self._split_date_range(start_date, end_date, 30)  # Chunks de 30 días
-            print(f"📅 Creados {len(date_chunks)} chunks de fechas")
-            
-            # 3. Procesar chunks en paralelo
-            all_entries = []
-            total_chunks = len(date_chunks)
+            employee_ids = [u.get('employeeInternalId') for u in users]
+            failed_cells = []
             
-            for i, chunk in enumerate(date_chunks):
-                if progress_callback:
-                    progress = 20 + (60 * (i + 1) / total_chunks)
-                    progress_callback(int(progress), f"📊 Procesando chunk {i+1}/{total_chunks}...")
+            completed = collected = None
+            if until_deadline:
+                # Para saber qué empleados quedaron completos se entregan de a uno
+                completed, collected = set(), []
+                deliver = on_employee or (lambda employee_id, items: collected.extend(items))
                 
-                chunk_entries = self.get_day_summaries(
-                    chunk['start_date'], 
-                    chunk['end_date'], 
-                    [u.get('employeeInternalId') for u in users]
+                def on_employee(employee_id, items):
+                    completed.add(employee_id)
+                    deliver(employee_id, items)
+            if self.checkpoints:
+                run_id = run_id or self.report_run_id(start_date, end_date, employee_ids)
+            else:
+                run_id = None
+            
+            if self.day_store:
+                # 2-3. Descargar solo las celdas (empleado, fecha) faltantes o mutables
+                all_entries, grid, total_entries = self._fetch_missing_day_summaries(
+                    start_date, end_date, employee_ids, progress_callback, run_id, cancel_token,
+                    on_employee, failed_cells, until_deadline
                 )
-                all_entries.extend(chunk_entries)
+            else:
+                # 2-3. Una sola grilla (chunk de fechas × lote de empleados) para todo el rango
+                if progress_callback:
+                    progress_callback(20, "📅 Armando grilla de consultas...")
                 
-                # Pausa entre chunks para no sobrecargar la API
-                if i < total_chunks - 1:
-                    time.sleep(DEFAULT_CONFIG['delay_between_batches'] / 1000)
+                grid = self._checkpointed_grid(run_id, lambda: self._build_day_summary_grid([
+                    {'user_ids': employee_ids, 'start_date': start_date, 'end_date': end_date}
+                ]))
+                partitioner = EmployeePartitioner(grid, employee_ids, on_employee) if on_employee else None
+                all_entries = self._run_sync(self._collect_grid_async(
+                    grid, on_progress=self._grid_progress(progress_callback), run_id=run_id,
+                    cancel_token=cancel_token, partitioner=partitioner, failures=failed_cells,
+                    until_deadline=until_deadline
+                ))
+                total_entries = partitioner.items if partitioner else len(all_entries)
+            if collected:
+                all_entries = collected
+            
+            pending_employees = []
+            if until_deadline and cancel_token and cancel_token.is_cancelled:
+                pending_employees = [e for e in employee_ids if e and e not in completed]
+            if pending_employees:
+                print(f"⏱️ Reporte parcial: {len(employee_ids) - len(pending_employees)} empleados "
+                      f"completos, {len(pending_employees)} pendientes")
+                if run_id:
+                    # Lo descargado queda en el checkpoint: repetir el reporte pide solo lo pendiente
+                    print(f"💾 Checkpoint {run_id} guardado para completar los pendientes")
+            elif run_id:
+                pending = len(grid) - len(self.checkpoints.done_cells(run_id))
+                if pending:
+                    # Lo descargado queda en el checkpoint: el próximo intento pide solo lo que falta
+                    error_msg = f"{pending} de {len(grid)} consultas fallaron"
+                    print(f"💾 {error_msg}; checkpoint {run_id} guardado para reanudar")
+                    return {'success': False, 'error': error_msg, 'run_id': run_id, 'resumable': True}
+                self.checkpoints.finish(run_id)
+            
+            if failed_cells:
+                failed_employees = {e for unit in failed_cells for e in unit['employee_ids']}
+                print(f"⚠️ {len(failed_cells)} unidades sin datos ({len(failed_employees)} empleados)")
             
             if progress_callback:
                 progress_callback(90, "🔧 Consolidando resultados...")
@@ -282,7 +1150,11 @@ class HumanApiClient:
                 'users': {u.get('employeeInternalId'): u for u in users},
                 'entries': all_entries,
                 'total_users': len(users),
-                'total_entries': len(all_entries),
+                'total_entries': total_entries,
+                'failed_cells': failed_cells,
+                'partial': bool(pending_employees),
+                'pending_employees': pending_employees,
+                'run_id': run_id,
                 'date_range': {
                     'start_date': start_date,
                     'end_date': end_date
@@ -292,45 +1164,471 @@ class HumanApiClient:
             if progress_callback:
                 progress_callback(100, "✅ Procesamiento completado!")
             
-            print(f"✅ Procesamiento paralelo completado: {len(all_entries)} entradas")
+            print(f"✅ Procesamiento paralelo completado: {total_entries} entradas")
             return result
             
+        except OperationCancelled:
+            raise
         except Exception as e:
             error_msg = f"Error en procesamiento paralelo: {str(e)}"
             print(f"❌ {error_msg}")
             return {'success': False, 'error': error_msg}
     
+    def _fetch_missing_day_summaries(self, start_date: str, end_date: str,
+                                     employee_ids: List[str], progress_callback=None,
+                                     run_id: str = None,
+                                     cancel_token: CancellationToken = None,
+                                     on_employee: Callable = None,
+                                     failures: List[Dict] = None,
+                                     until_deadline: bool = False) -> Tuple[List[Dict], List[Dict], int]:
+        """
+        Completa el almacén local con las celdas faltantes o todavía mutables del rango
+        y devuelve todos los day summaries del rango desde disco.
+        Con on_employee cada empleado se lee de disco y se entrega apenas terminan
+        sus celdas (los que no tienen nada que descargar, antes de empezar), y la
+        lista devuelta queda vacía.
+        Returns:
+            (day summaries del rango, grilla descargada, cantidad de day summaries)
+        """
+        if progress_callback:
+            progress_callback(20, "🗄️ Calculando días faltantes...")
+        
+        def plan_grid():
+            plan = self.day_store.plan_fetches(employee_ids, start_date, end_date)
+            total_cells = len(employee_ids) * len(self.day_store.date_range(start_date, end_date))
+            missing_cells = sum(unit['cells'] for unit in plan)
+            print(f"🗄️ Celdas a descargar: {missing_cells}/{total_cells} (el resto desde disco)")
+            return self._build_day_summary_grid(plan)
+        
+        def store_batch(batch, items):
+            self.day_store.save_batch(batch['user_ids'], batch['start_date'], batch['end_date'], items)
+        
+        transform = self.projector.day_summary if self.projector else None
+        grid = self._checkpointed_grid(run_id, plan_grid)
+        partitioner = None
+        if on_employee:
+            partitioner = EmployeePartitioner(
+                grid, employee_ids, on_employee,
+                load=lambda employee_id: self.day_store.load([employee_id], start_date, end_date, transform)
+            )
+        self._run_sync(self._collect_grid_async(
+            grid, on_batch=store_batch, on_progress=self._grid_progress(progress_callback), run_id=run_id,
+            cancel_token=cancel_token, partitioner=partitioner, failures=failures,
+            until_deadline=until_deadline
+        ))
+        
+        if partitioner:
+            return [], grid, partitioner.items
+        all_entries = self.day_store.load(employee_ids, start_date, end_date, transform)
+        return all_entries, grid, len(all_entries)
+    
+    @staticmethod
+    def report_run_id(start_date: str, end_date: str, employee_ids: List[str]) -> str:
+        """ID estable de un reporte: mismo rango y mismos empleados, mismo checkpoint"""
+        key = f"{start_date}|{end_date}|{','.join(sorted(str(e) for e in employee_ids))}"
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    
+    def _checkpointed_grid(self, run_id: Optional[str], build: Callable[[], List[Dict]]) -> List[Dict]:
+        """
+        Grilla de la ejecución: la guardada en el checkpoint si se está reanudando,
+        o una nueva (que se guarda antes de empezar a descargar)
+        """
+        if not run_id:
+            return build()
+        grid = self.checkpoints.load_grid(run_id)
+        if grid is not None:
+            cells, pages = self.checkpoints.progress(run_id)
+            print(f"♻️ Reanudando ejecución {run_id}: {cells}/{len(grid)} celdas y {pages} páginas ya descargadas")
+            return grid
+        grid = build()
+        self.checkpoints.start(run_id, grid)
+        return grid
+    
+    def _grid_progress(self, progress_callback=None) -> Optional[Callable]:
+        """Traduce el avance por celda de la grilla al rango 20-80% del progreso general"""
+        if not progress_callback:
+            return None
+        
+        def on_progress(finished, total, batch):
+            progress = 20 + (60 * finished / total)
+            progress_callback(int(progress), f"📊 Celda {finished}/{total} "
+                                             f"(chunk {batch['chunk_number']}, lote {batch['batch_number']})")
+        return on_progress
+    
     def _make_request(self, method: str, endpoint: str, params: Dict = None, 
-                     data: Dict = None) -> Optional[Dict]:
+                     data: Dict = None, use_cache: bool = True,
+                     cancel_token: CancellationToken = None, bisect: bool = False,
+                     hedge: bool = False, on_attempt: Callable = None) -> Optional[Dict]:
         """
-        Realiza una petición HTTP con reintentos automáticos
+        Realiza una petición HTTP (ver _send_request).
+        Los GET idénticos (endpoint + parámetros) que ya están en vuelo no salen de
+        nuevo a la red: esperan y comparten la respuesta decodificada de la primera
+        (su span queda sin status: la petición la hizo otro hilo). Un duplicado de
+        hedging (hedge) sale siempre: sumarse a la petición lenta no serviría.
+        """
+        page = params.get('page') if params else None
+        with tracer.span(f"{method.upper()} {endpoint}", 'http', page=page) as span:
+            if hedge:
+                span.set(hedge=True)
+            if method.upper() != 'GET' or hedge:
+                return self._send_request(method, endpoint, params, data, use_cache, cancel_token, span, bisect, on_attempt)
+            key = (ResponseCache.make_key(endpoint, params), use_cache)
+            return self._single_flight.do(
+                key, lambda: self._send_request(method, endpoint, params, data, use_cache, cancel_token, span, bisect, on_attempt),
+                cancel_token
+            )
+    
+    def _send_request(self, method: str, endpoint: str, params: Dict = None, 
+                      data: Dict = None, use_cache: bool = True,
+                      cancel_token: CancellationToken = None, span=NOOP_SPAN,
+                      bisect: bool = False, on_attempt: Callable = None) -> Optional[Dict]:
+        """
+        Realiza una petición HTTP con reintentos automáticos.
+        - Los GET se sirven del cache de respuestas mientras estén vigentes; una entrada
+          vencida se revalida con If-None-Match / If-Modified-Since (304 = sin descarga).
+        - Cada intento pasa por el limitador adaptativo, que además recibe la latencia,
+          el status y el Retry-After de la respuesta.
+        - Solo se reintentan errores transitorios (timeouts, conexión, 408/429/5xx),
+          con backoff exponencial y jitter decorrelacionado; los 4xx fallan enseguida.
+        - Si el circuito del endpoint está abierto se lanza CircuitOpenError sin salir a la red.
+        - Con cancel_token, las esperas (limitador, backoff) terminan apenas se cancela y no
+          se hacen más intentos; una petición ya enviada termina sola (acotada por el timeout).
+        - `span` recibe status, bytes, reintentos y si se sirvió del cache.
+        - Con bisect (aislando una celda que falló) un 5xx falla enseguida y no cuenta
+          para el circuito: es esperable que la parte rota siga fallando.
+        - on_attempt(instante) se llama cuando un intento sale a la red (pasado el
+          limitador) y on_attempt(None) cuando falla (antes del backoff).
+        - El turno en el limitador depende del carril del contexto (ver core.lanes).
         """
         url = f"{self.base_url}{endpoint}"
-        print(url)
+        
+        cache_key = cached = None
+        headers = {}
+        if use_cache and self.response_cache and method.upper() == 'GET':
+            cache_key = self.response_cache.make_key(endpoint, params)
+            cached = self.response_cache.get(cache_key)
+            if cached and cached.is_fresh:
+                span.set(cache='hit')
+                self.metrics.record_cache_hit(endpoint)
+                return cached.payload
+            if cached:
+                headers = cached.conditional_headers()
+        
+        breaker = self._get_breaker(endpoint)
+        delay = self.retry_delay
         
         for attempt in range(self.max_retries):
+            probe = breaker.before_request()
+            status = None
+            retry_after = None
+            try:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                lane = current_lane()
+                with tracer.span('rate_limit_wait', 'http', lane=lane):
+                    waited = self.rate_limiter.acquire(cancel_token, lane)
+            except BaseException:
+                # Cancelada antes de salir: el sondeo half-open queda para otra petición
+                if probe:
+                    breaker.release_probe()
+                raise
+            self.metrics.record_throttle(endpoint, waited)
+            try:
+                # El circuito pudo abrirse mientras se esperaba turno en el limitador
+                breaker.raise_if_open()
+            except Exception:
+                self.rate_limiter.cancel()
+                raise
+            started = time.monotonic()
+            if on_attempt:
+                on_attempt(started)
+            response = None
             try:
                 if method.upper() == 'GET':
-                    response = self.session.get(url, params=params, timeout=self.timeout)
+                    response = self.transport.get(url, params=params, headers=headers, timeout=self.timeout)
                 elif method.upper() == 'POST':
-                    response = self.session.post(url, params=params, json=data, timeout=self.timeout)
+                    response = self.transport.post(url, params=params, json=data, timeout=self.timeout)
                 else:
                     raise ValueError(f"Método HTTP no soportado: {method}")
                 
+                status = response.status_code
+                span.set(status=status, retries=attempt)
+                if status == 429 or status == 503:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                
+                if status == 304 and cached:
+                    # No cambió desde la versión cacheada: renovar su validez
+                    breaker.record_success()
+                    self.response_cache.touch(cache_key, self.response_cache.ttl_for(endpoint, params))
+                    span.set(cache='revalidated')
+                    return cached.payload
+                
                 response.raise_for_status()
-                return response.json()
+                result = response.json()
+                span.set(bytes=len(response.content))
+                breaker.record_success()
+                if cache_key:
+                    self.response_cache.put(
+                        cache_key, endpoint, result,
+                        ttl=self.response_cache.ttl_for(endpoint, params),
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified'),
+                    )
+                return result
                 
             except requests.exceptions.RequestException as e:
+                if on_attempt:
+                    on_attempt(None)
+                isolating = bisect and status is not None and status >= 500
+                retryable = is_retryable(e) and not isolating
+                if retryable:
+                    breaker.record_failure()
+                elif status is not None and not isolating:
+                    breaker.record_success()  # El servidor respondió: el endpoint está vivo
+                else:
+                    breaker.release_probe()
+                
                 print(f"⚠️ Intento {attempt + 1}/{self.max_retries} falló: {str(e)}")
                 
+                if not retryable:
+                    print(f"❌ Error no reintentable para {endpoint}")
+                    raise e
+                if breaker.state != CircuitBreaker.CLOSED:
+                    # El endpoint está caído: no esperar un backoff que terminaría rechazado
+                    raise e
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    # Con Retry-After el limitador ya pausa todas las peticiones hasta ese momento
+                    if not retry_after:
+                        delay = decorrelated_jitter(delay, self.retry_delay, self.retry_max_delay)
+                        self.metrics.record_backoff(endpoint, delay)
+                        with tracer.span('backoff', 'http', seconds=round(delay, 3)):
+                            if cancel_token:
+                                if cancel_token.wait(delay):
+                                    raise cancel_token.error()
+                            else:
+                                time.sleep(delay)
                 else:
                     print(f"❌ Todos los intentos fallaron para {endpoint}")
                     raise e
+            finally:
+                latency = time.monotonic() - started
+                self.rate_limiter.release(latency, status, retry_after)
+                on_wire, decoded = HttpTransport.body_sizes(response) if response is not None else (0, 0)
+                self.metrics.record_attempt(endpoint, latency, status, on_wire, decoded, retry=attempt > 0)
         
         return None
     
+    def _get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Devuelve (creándolo si hace falta) el circuit breaker del endpoint"""
+        with self._breakers_lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(
+                    endpoint,
+                    failure_threshold=DEFAULT_CONFIG['circuit_failure_threshold'],
+                    reset_timeout=DEFAULT_CONFIG['circuit_reset_timeout'] / 1000,
+                    max_reset_timeout=DEFAULT_CONFIG['circuit_max_reset_timeout'] / 1000,
+                )
+            return self._breakers[endpoint]
+    
+    async def _request_async(self, semaphore: asyncio.Semaphore, method: str, endpoint: str,
+                             params: Dict = None, data: Dict = None,
+                             cancel_token: CancellationToken = None, bisect: bool = False,
+                             use_cache: bool = True) -> Optional[Dict]:
+        """
+        Ejecuta _make_request en el pool de hilos del carril actual respetando el
+        semáforo de concurrencia.
+        Las páginas de la grilla van con hedging (ver _hedged_request_async).
+        """
+        async with semaphore:
+            if self.hedge_enabled and method.upper() == 'GET' and endpoint in self.GRID_ENDPOINTS and not bisect:
+                return await self._hedged_request_async(endpoint, params, cancel_token, use_cache)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(current_lane()),
+                functools.partial(bind_lane(self._make_request), method, endpoint, params, data,
+                                  use_cache=use_cache, cancel_token=cancel_token, bisect=bisect)
+            )
+    
+    async def _hedged_request_async(self, endpoint: str, params: Dict = None,
+                                    cancel_token: CancellationToken = None,
+                                    use_cache: bool = True) -> Optional[Dict]:
+        """
+        GET con hedging: si la respuesta tarda más que el percentil hedge_percentile
+        de la latencia del endpoint en esta ejecución (hedge_initial_delay mientras no
+        hay hedge_min_samples respuestas) desde que el intento salió a la red (no
+        cuentan la espera en el limitador ni el backoff entre reintentos), sale un duplicado y se usa la primera que
+        responda bien; la otra se cancela (deja de esperar al limitador y de
+        reintentar; si ya salió, su respuesta se descarta). Los duplicados solo salen
+        si el limitador tiene lugar libre y hedge_budget lo permite.
+        """
+        loop = asyncio.get_running_loop()
+        lane = current_lane()
+        executor = self._get_executor(lane)
+        parent = cancel_token or CancellationToken()
+        tokens = [parent.child()]
+        sent_at = [None]  # Salida a la red del intento en curso de la primaria (la escribe su hilo)
+        attempts = [loop.run_in_executor(executor, functools.partial(
+            bind_lane(self._make_request), 'GET', endpoint, params, use_cache=use_cache,
+            cancel_token=tokens[0], on_attempt=lambda started: sent_at.__setitem__(0, started)
+        ))]
+        try:
+            self.hedge_budget.record_request()
+            delay = self.metrics.latency_percentile(endpoint, self.hedge_percentile, self.hedge_min_samples)
+            delay = max(self.hedge_initial_delay if delay is None else delay, self.hedge_min_delay)
+            while True:
+                # Sin intento en la red (limitador, backoff) o sin lugar para el duplicado (el
+                # tope crece con las peticiones) se vuelve a mirar cada hedge_min_delay
+                started = sent_at[0]
+                wait = started + delay - time.monotonic() if started is not None else self.hedge_min_delay
+                if wait <= 0:
+                    if self.rate_limiter.has_capacity(lane) and self.hedge_budget.try_acquire():
+                        break
+                    wait = self.hedge_min_delay
+                done, _ = await asyncio.wait(attempts, timeout=wait)
+                if done:
+                    return await attempts[0]
+            
+            tokens.append(parent.child())
+            future = executor.submit(bind_lane(self._make_request), 'GET', endpoint, params,
+                                     use_cache=use_cache, cancel_token=tokens[1], hedge=True)
+            # El lugar se libera cuando termina el hilo, no cuando se descarta el resultado
+            future.add_done_callback(lambda _: self.hedge_budget.release())
+            hedge = asyncio.wrap_future(future)
+            attempts.append(hedge)
+            
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in sorted(done, key=attempts.index):
+                    if attempt.exception() is None:
+                        self.metrics.record_hedge(endpoint, won=attempt is hedge)
+                        return attempt.result()
+                    error = error or attempt.exception()
+            self.metrics.record_hedge(endpoint, won=False)
+            raise error
+        finally:
+            # Cancelar lo que sigue en vuelo; en las terminadas solo las desengancha de parent
+            for token, attempt in zip(tokens, attempts):
+                token.cancel()
+                attempt.cancel()
+    
+    def _get_executor(self, lane: str = BULK) -> ThreadPoolExecutor:
+        """
+        Devuelve el pool de hilos del motor asíncrono para un carril (se crea una sola vez).
+        El carril interactivo tiene su propio pool: sus peticiones no hacen cola
+        detrás de las de un reporte grande antes de llegar al limitador.
+        """
+        with self._executor_lock:
+            if lane not in self._executors:
+                # Hilos extra para los duplicados: no esperan detrás de las peticiones lentas
+                hedge_threads = self.hedge_budget.max_in_flight if self.hedge_enabled else 0
+                if lane == INTERACTIVE:
+                    workers, prefix = DEFAULT_CONFIG['interactive_max_workers'], 'human-api-interactive'
+                else:
+                    workers, prefix = self.max_concurrency, 'human-api'
+                self._executors[lane] = ThreadPoolExecutor(
+                    max_workers=workers + hedge_threads, thread_name_prefix=prefix
+                )
+            return self._executors[lane]
+    
+    async def _offload(self, fn: Callable, *args):
+        """
+        Ejecuta fn(*args) fuera del loop y espera el resultado: escrituras de SQLite
+        (checkpoints, almacén de días), callbacks on_batch y entregas al cómputo, que
+        pueden bloquear con la cola llena. Un solo hilo, así se ejecutan en el orden en
+        que se piden; mientras tanto el loop sigue atendiendo las páginas en vuelo.
+        """
+        with self._executor_lock:
+            if 'offload' not in self._executors:
+                self._executors['offload'] = ThreadPoolExecutor(max_workers=1,
+                                                                thread_name_prefix='human-api-offload')
+            executor = self._executors['offload']
+        future = asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Lo pedido termina igual: al volver la corutina cancelada no queda nada a medias
+            await asyncio.wait([future])
+            raise
+    
+    def _iterate_sync(self, agen: AsyncIterator) -> Iterator:
+        """
+        Consume un generador asíncrono desde código síncrono.
+        El generador corre en su propio loop en un hilo auxiliar y pasa los
+        elementos por una cola acotada; si el consumidor corta la iteración,
+        la descarga se cancela.
+        """
+        items = queue.Queue(maxsize=self.stream_queue_size)
+        stop = threading.Event()
+        done = object()
+        
+        def put(element):
+            while not stop.is_set():
+                try:
+                    items.put(element, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        async def pump():
+            try:
+                async for element in agen:
+                    if not put(element):
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                await agen.aclose()
+                put(done)
+        
+        runner = threading.Thread(target=bind_lane(asyncio.run), args=(pump(),), daemon=True,
+                                  name='human-api-stream')
+        runner.start()
+        try:
+            while True:
+                element = items.get()
+                if element is done:
+                    break
+                if isinstance(element, Exception):
+                    raise element
+                yield element
+        finally:
+            stop.set()
+    
+    def _run_sync(self, coro):
+        """
+        Ejecuta una corrutina desde código síncrono.
+        Si el hilo actual ya tiene un loop corriendo, la ejecuta en un hilo auxiliar.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(bind_lane(asyncio.run), coro).result()
+    
+    def _tuner_for(self, endpoint: str) -> BatchTuner:
+        """BatchTuner de un endpoint de grilla"""
+        if endpoint == API_ENDPOINTS['time_tracking_entries']:
+            return self.entries_batch_tuner
+        return self.batch_tuner
+    
+    def _planning_page_limit(self, endpoint: str) -> int:
+        """Limit de página con el que planificar: el sondeado, el aprendido o el más chico"""
+        return (self._page_limits.get(endpoint) or self._tuner_for(endpoint).page_limit
+                or self.page_limit_candidates[-1])
+    
+    def _chunk_days(self, employee_ids: List[str], start_date: str, end_date: str,
+                    endpoint: str = None) -> int:
+        """Días por chunk para estos empleados (por defecto, de day summaries; ver BatchTuner)"""
+        endpoint = endpoint or API_ENDPOINTS['day_summaries']
+        return self._tuner_for(endpoint).days_per_chunk(
+            employee_ids, len(DaySummaryStore.date_range(start_date, end_date)),
+            self._planning_page_limit(endpoint), self.page_fanout
+        )
+    
     def _split_date_range(self, start_date: str, end_date: str, max_days: int = 30) -> List[Dict]:
         """
         Divide un rango de fechas en chunks más pequeños
@@ -0,0 +1,192 @@
+"""
+Autoajuste del tamaño de las consultas de day summaries
+Elige empleados por petición y días por chunk a partir de lo observado
+(items por empleado y día, páginas y latencia) y lo persiste entre ejecuciones
+"""
+
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+
+class BatchTuner:
+    """
+    Arma las consultas (empleados × rango de fechas) para que cada una ocupe
+    cerca de 1 + page_fanout páginas llenas: la primera página más una ronda
+    de páginas en paralelo. Así un tenant grande hace pocas peticiones
+    llenas y un empleado con muchas fichadas no genera una cola de paginación.
+
+    - Peso de un empleado: EWMA de items por día observados; sin historial se
+      usa la densidad global.
+    - Días por chunk: el rango completo hasta `max_days`, recortado si el
+      empleado más pesado solo no entra en una consulta.
+    - Empleados por consulta: se empaquetan hasta el objetivo de items, sin
+      superar `max_url_length`; si el rango es chico se reparten en más
+      consultas de una página para no dejar sin trabajo a los `max_workers` hilos.
+    - Si las páginas tardan, el objetivo baja para que una consulta no supere
+      `target_seconds`.
+    """
+
+    SMOOTHING = 0.3  # Peso de la observación nueva en las EWMA
+
+    def __init__(self, path: Optional[str], initial_users: int, initial_days: int,
+                 max_days: int, max_url_length: int, max_workers: int,
+                 target_seconds: float, learn: bool = True):
+        self.path = os.path.expanduser(path) if path else None
+        self.initial_users = initial_users
+        self.initial_days = initial_days
+        self.max_days = max_days
+        self.max_url_length = max_url_length
+        self.max_workers = max_workers
+        self.target_seconds = target_seconds
+        self.learn = learn
+
+        self._lock = threading.Lock()
+        self.density = None         # Items por empleado y día (global)
+        self.page_latency = None    # Segundos por página
+        self.page_limit = None      # Último limit de página aceptado por el servidor
+        self._weights = {}          # employee_id -> items por día
+        self._load()
+
+    # -------------------- Planificación --------------------
+
+    def target_items(self, page_limit: int, page_fanout: int) -> int:
+        """Items por consulta: primera página + una ronda en paralelo, menos si las páginas tardan"""
+        pages = 1 + page_fanout
+        if self.page_latency:
+            rounds = max(1, int(self.target_seconds / self.page_latency))
+            pages = min(pages, 1 + page_fanout * (rounds - 1))
+        return page_limit * pages
+
+    def days_per_chunk(self, employee_ids: List[str], total_days: int,
+                       page_limit: int, page_fanout: int) -> int:
+        """Días por chunk de fechas para este conjunto de empleados"""
+        if self.density is None:
+            return max(1, min(self.initial_days, total_days))
+        heaviest = max((self.weight(e) for e in employee_ids), default=self.density)
+        days = self.max_days
+        if heaviest > 0:
+            days = min(days, int(self.target_items(page_limit, page_fanout) / heaviest))
+        return max(1, min(days, total_days))
+
+    def make_batches(self, employee_ids: List[str], days: int, page_limit: int,
+                     page_fanout: int, url_overhead: int) -> List[List[str]]:
+        """
+        Reparte los empleados en consultas.
+        Args:
+            url_overhead: Largo de la URL sin la lista de employeeIds
+        """
+        if not employee_ids:
+            return []
+        if self.density is None:
+            max_per_batch = self.initial_users
+            budget = None
+        else:
+            # Al menos una consulta por hilo mientras el total de páginas no alcance para
+            # ocuparlos, redondeando cada consulta a páginas completas
+            expected_pages = sum(self.weight(e) for e in employee_ids) * days / page_limit
+            min_batches = max(1, min(self.max_workers, math.ceil(expected_pages)))
+            max_per_batch = len(employee_ids)
+            budget = min(self.target_items(page_limit, page_fanout),
+                         page_limit * max(1, math.ceil(expected_pages / min_batches)))
+
+        url_budget = self.max_url_length - url_overhead
+        separator = len(quote(','))
+
+        batches = []
+        current, items, url_length = [], 0.0, 0
+        for employee_id in employee_ids:
+            expected = self.weight(employee_id) * days if budget else 0
+            id_length = len(quote(str(employee_id))) + (separator if current else 0)
+            if current and (
+                len(current) >= max_per_batch
+                or url_length + id_length > url_budget
+                or (budget and items + expected > budget)
+            ):
+                batches.append(current)
+                current, items, url_length = [], 0.0, 0
+                id_length = len(quote(str(employee_id)))
+            current.append(employee_id)
+            items += expected
+            url_length += id_length
+        if current:
+            batches.append(current)
+        return batches
+
+    def weight(self, employee_id: str) -> float:
+        """Items por día esperados para el empleado"""
+        return self._weights.get(employee_id, self.density if self.density is not None else 1.0)
+
+    # -------------------- Aprendizaje --------------------
+
+    def observe(self, employee_ids: List[str], days: int, items_by_employee: Dict[str, int],
+                page_latency: Optional[float], page_limit: int):
+        """
+        Registra el resultado de una consulta completa
+        Args:
+            items_by_employee: Items recibidos por employeeId (la suma de todas las páginas)
+            page_latency: Latencia típica de una petición (sin contar la espera de turno)
+        """
+        if not self.learn or not employee_ids or days <= 0:
+            return
+        alpha = self.SMOOTHING
+        with self._lock:
+            self.page_limit = page_limit
+            total = sum(items_by_employee.values())
+            density = total / (len(employee_ids) * days)
+            self.density = density if self.density is None else (1 - alpha) * self.density + alpha * density
+            for employee_id in employee_ids:
+                per_day = items_by_employee.get(employee_id, 0) / days
+                previous = self._weights.get(employee_id)
+                self._weights[employee_id] = per_day if previous is None else (1 - alpha) * previous + alpha * per_day
+            if page_latency:
+                self.page_latency = page_latency if self.page_latency is None else (
+                    (1 - alpha) * self.page_latency + alpha * page_latency
+                )
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'density': round(self.density, 3) if self.density is not None else None,
+                'page_latency': round(self.page_latency, 3) if self.page_latency is not None else None,
+                'page_limit': self.page_limit,
+                'employees_known': len(self._weights),
+            }
+
+    # -------------------- Persistencia --------------------
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.density = state.get('density')
+            self.page_latency = state.get('page_latency')
+            self.page_limit = state.get('page_limit')
+            self._weights = dict(state.get('weights') or {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudo leer el ajuste de lotes guardado: {str(e)}")
+
+    def save(self):
+        """Guarda lo aprendido (escritura atómica)"""
+        if not self.path or not self.learn or self.density is None:
+            return
+        with self._lock:
+            state = {
+                'density': self.density,
+                'page_latency': self.page_latency,
+                'page_limit': self.page_limit,
+                'weights': self._weights,
+            }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el ajuste de lotes: {str(e)}")
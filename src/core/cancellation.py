@@ -0,0 +1,114 @@
+"""
+Cancelación cooperativa y tiempos límite
+Un CancellationToken viaja por todo el pipeline (descarga, cálculo y Excel);
+cada etapa lo consulta en sus puntos de espera y corta apenas se cancela
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class OperationCancelled(Exception):
+    """La operación se canceló (por el usuario o por vencer su tiempo límite)"""
+
+    def __init__(self, reason: str = 'cancelled'):
+        self.reason = reason
+        if reason == 'deadline':
+            message = "Se alcanzó el tiempo límite"
+        else:
+            message = "Operación cancelada por el usuario"
+        super().__init__(message)
+
+
+class CancellationToken:
+    """
+    Señal de cancelación compartida entre hilos.
+
+    - cancel() la activa una sola vez y ejecuta los callbacks registrados con
+      on_cancel (por ejemplo, cancelar la tarea asyncio de la descarga o
+      despertar al limitador de peticiones).
+    - Con `timeout` (segundos) se cancela sola al vencer el plazo, con motivo 'deadline'.
+    - wait() reemplaza a time.sleep en esperas largas: vuelve apenas se cancela.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable] = {}
+        self._next_id = 0
+        self.reason = None
+
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._timer = None
+        if timeout:
+            self._timer = threading.Timer(timeout, self.cancel, args=('deadline',))
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Segundos hasta el tiempo límite (None si no tiene)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def child(self, timeout: Optional[float] = None) -> 'CancellationToken':
+        """
+        Token que se cancela junto con este (con el mismo motivo) o, antes, al
+        vencer su propio plazo, sin cancelar a este (por ejemplo, cortar solo la
+        descarga y seguir con el cálculo)
+        """
+        child = CancellationToken(timeout)
+        unregister = self.on_cancel(lambda: child.cancel(self.reason or 'cancelled'))
+        child.on_cancel(unregister)
+        return child
+
+    def cancel(self, reason: str = 'cancelled'):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = list(self._callbacks.values()), {}
+        if self._timer:
+            self._timer.cancel()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Error en callback de cancelación: {str(e)}")
+
+    def error(self) -> OperationCancelled:
+        return OperationCancelled(self.reason or 'cancelled')
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise self.error()
+
+    def wait(self, timeout: float) -> bool:
+        """Espera hasta `timeout` segundos; devuelve True si se canceló mientras tanto"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable) -> Callable:
+        """
+        Registra un callback para el momento de la cancelación (si ya está
+        cancelado se ejecuta enseguida).
+        Returns:
+            Función que quita el registro
+        """
+        with self._lock:
+            if not self._event.is_set():
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+
+                def unregister():
+                    with self._lock:
+                        self._callbacks.pop(callback_id, None)
+                return unregister
+        callback()
+        return lambda: None
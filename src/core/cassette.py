@@ -0,0 +1,181 @@
+"""
+Grabación y reproducción del tráfico con la API (cassettes)
+En modo 'record' cada petición y su respuesta se agregan a un archivo JSON lines
+comprimido; en modo 'replay' se sirven desde ese archivo sin salir a la red
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from core.transport import HttpTransport
+
+# Headers de respuesta que se graban (el resto no afecta al cliente)
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Retry-After')
+
+
+def interaction_key(method: str, url: str, params: Optional[Dict]) -> str:
+    """Clave de una petición: método, ruta (sin host) y parámetros ordenados"""
+    path = urlparse(url).path
+    query = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return json.dumps([method.upper(), path, query], separators=(',', ':'))
+
+
+class RecordingTransport:
+    """
+    Transporte que delega en HttpTransport y graba cada intercambio en el cassette.
+    El archivo se abre (y se pisa) recién con la primera respuesta: una corrida que
+    no graba nada conserva el cassette anterior.
+    """
+
+    def __init__(self, inner: HttpTransport, path: str):
+        self.inner = inner
+        self.path = os.path.expanduser(path)
+        self.recorded = 0
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        except OSError as e:
+            raise ValueError(f"No se puede crear la carpeta del cassette {self.path}: {e}") from e
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = False
+
+    @property
+    def session(self) -> requests.Session:
+        return self.inner.session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        response = self.inner.get(url, **kwargs)
+        self._record('GET', url, kwargs.get('params'), response)
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        response = self.inner.post(url, **kwargs)
+        self._record('POST', url, kwargs.get('params'), response)
+        return response
+
+    def _record(self, method: str, url: str, params: Optional[Dict], response: requests.Response):
+        line = json.dumps({
+            'key': interaction_key(method, url, params),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {h: response.headers[h] for h in RECORDED_HEADERS if h in response.headers},
+            'body': response.content.decode('utf-8', errors='replace'),
+        }, separators=(',', ':'))
+        with self._lock:
+            if self._closed:
+                return
+            if self._file is None:
+                self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+            self._file.write(line + '\n')
+            self.recorded += 1
+
+    def preconnect(self, *args, **kwargs):
+        self.inner.preconnect(*args, **kwargs)
+
+    def connections_opened(self) -> int:
+        return self.inner.connections_opened()
+
+    def stats(self) -> Dict:
+        return dict(self.inner.stats(), recorded=self.recorded)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                print(f"📼 Cassette grabado: {self.recorded} respuestas en {self.path}")
+        self.inner.close()
+
+
+class ReplayTransport:
+    """
+    Transporte que responde desde un cassette, sin red.
+    Las respuestas a una misma petición se sirven en el orden grabado (así se
+    reproducen también los 429/5xx y sus reintentos) y la última se repite.
+    Una petición que no está en el cassette recibe un 404, que no se reintenta.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self.requests_count = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._responses: Dict[str, deque] = {}
+        self._load()
+
+    def _load(self):
+        loaded = 0
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    interaction = json.loads(line)
+                    self._responses.setdefault(interaction['key'], deque()).append(interaction)
+                    loaded += 1
+        except (EOFError, ValueError) as e:
+            # Cassette cortado (por ejemplo, la grabación no cerró bien): usar lo leído
+            print(f"⚠️ Cassette incompleto, se usan {loaded} respuestas: {str(e)}")
+        except OSError as e:
+            # Sin cassette no hay nada que reproducir: es un error de configuración
+            raise ValueError(f"No se puede leer el cassette de reproducción {self.path}: {e}") from e
+        print(f"📼 Cassette cargado: {loaded} respuestas de {self.path}")
+
+    @property
+    def session(self):
+        return None
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._replay('GET', url, kwargs.get('params'))
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self._replay('POST', url, kwargs.get('params'))
+
+    def _replay(self, method: str, url: str, params: Optional[Dict]) -> requests.Response:
+        key = interaction_key(method, url, params)
+        with self._lock:
+            self.requests_count += 1
+            queue = self._responses.get(key)
+            if not queue:
+                self.misses += 1
+                interaction = None
+            elif len(queue) > 1:
+                interaction = queue.popleft()
+            else:
+                interaction = queue[0]
+
+        response = requests.Response()
+        response.url = url
+        response.encoding = 'utf-8'
+        if interaction is None:
+            response.status_code = 404
+            response.reason = 'No grabado en el cassette'
+            response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+            response._content = b'{}'
+        else:
+            response.status_code = interaction['status']
+            response.reason = interaction.get('reason')
+            response.headers = CaseInsensitiveDict(interaction['headers'])
+            response._content = interaction['body'].encode('utf-8')
+        return response
+
+    def preconnect(self, *args, **kwargs):
+        pass
+
+    def connections_opened(self) -> int:
+        return 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'requests': self.requests_count, 'misses': self.misses, 'sessions': 0,
+                    'bytes_on_wire': 0, 'bytes_decoded': 0, 'compression_savings': 0.0}
+
+    def close(self):
+        pass
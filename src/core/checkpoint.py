@@ -0,0 +1,163 @@
+"""
+Checkpoints de descargas largas
+Guarda la grilla de una ejecución y cada página descargada, indexadas por un
+run ID, para que un reintento pida solo lo que falta
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class CheckpointStore:
+    """
+    Checkpoints por ejecución (run ID).
+
+    - runs: la grilla de celdas (chunk de fechas × lote de empleados) tal como se
+      armó la primera vez, para reanudar con exactamente las mismas consultas
+      aunque el autoajuste de lotes haya cambiado desde entonces.
+    - pages: cada página descargada de cada celda, con el total de páginas y el
+      limit usados, para retomar una celda a mitad de su paginación. Si la
+      respuesta no traía totales, el total es provisorio (ver load_pages).
+    - cells: celdas completas.
+
+    Al terminar bien, la ejecución se borra; las que quedan sin terminar se
+    descartan después de `max_age_hours` (los días recientes pueden haber cambiado).
+    """
+
+    def __init__(self, path: str, max_age_hours: int):
+        self.path = os.path.expanduser(path)
+        self.max_age_hours = max_age_hours
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                grid TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                run_id TEXT NOT NULL,
+                cell INTEGER NOT NULL,
+                page INTEGER NOT NULL,
+                total_pages INTEGER NOT NULL,
+                page_limit INTEGER NOT NULL,
+                provisional INTEGER NOT NULL DEFAULT 0,
+                body BLOB NOT NULL,
+                PRIMARY KEY (run_id, cell, page)
+            );
+            CREATE TABLE IF NOT EXISTS cells (
+                run_id TEXT NOT NULL,
+                cell INTEGER NOT NULL,
+                PRIMARY KEY (run_id, cell)
+            );
+        """)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(pages)')}
+        if 'provisional' not in columns:
+            # Checkpoints de una versión anterior: sus totales venían todos de la API
+            self._conn.execute('ALTER TABLE pages ADD COLUMN provisional INTEGER NOT NULL DEFAULT 0')
+        self._conn.commit()
+        self._purge_expired()
+
+    # -------------------- Ejecuciones --------------------
+
+    def load_grid(self, run_id: str) -> Optional[List[Dict]]:
+        """Grilla guardada de una ejecución sin terminar (None si no hay checkpoint)"""
+        with self._lock:
+            row = self._conn.execute('SELECT grid FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def start(self, run_id: str, grid: List[Dict]):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO runs (run_id, grid, updated_at) VALUES (?, ?, ?)',
+                (run_id, json.dumps(grid, separators=(',', ':')), time.time())
+            )
+            self._conn.commit()
+
+    def finish(self, run_id: str):
+        """Borra el checkpoint de una ejecución completa"""
+        with self._lock:
+            for table in ('pages', 'cells', 'runs'):
+                self._conn.execute(f'DELETE FROM {table} WHERE run_id = ?', (run_id,))
+            self._conn.commit()
+
+    def progress(self, run_id: str) -> Tuple[int, int]:
+        """(celdas completas, páginas guardadas) de la ejecución"""
+        with self._lock:
+            cells = self._conn.execute('SELECT COUNT(*) FROM cells WHERE run_id = ?', (run_id,)).fetchone()[0]
+            pages = self._conn.execute('SELECT COUNT(*) FROM pages WHERE run_id = ?', (run_id,)).fetchone()[0]
+        return cells, pages
+
+    # -------------------- Celdas y páginas --------------------
+
+    def save_page(self, run_id: str, cell: int, page: int, items: List[Dict],
+                  total_pages: int, page_limit: int, provisional: bool = False):
+        body = zlib.compress(json.dumps(items, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (run_id, cell, page, total_pages, page_limit, provisional, body) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (run_id, cell, page, total_pages, page_limit, int(provisional), body)
+            )
+            self._conn.execute('UPDATE runs SET updated_at = ? WHERE run_id = ?', (time.time(), run_id))
+            self._conn.commit()
+
+    def load_pages(self, run_id: str, cell: int) -> Tuple[Dict[int, List[Dict]], Optional[int],
+                                                          Optional[int], bool]:
+        """
+        Páginas guardadas de una celda
+        Returns:
+            ({página: items}, total de páginas, limit, provisorio) — total y limit son None
+            si no hay páginas. El total es el de la última página; si es provisorio (la
+            respuesta no traía totales y se paginó de a una) puede haber más páginas
+            después de la última guardada.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT page, total_pages, page_limit, provisional, body FROM pages '
+                'WHERE run_id = ? AND cell = ? ORDER BY page DESC',
+                (run_id, cell)
+            ).fetchall()
+        if not rows:
+            return {}, None, None, False
+        pages = {page: json.loads(zlib.decompress(body)) for page, _, _, _, body in rows}
+        return pages, rows[0][1], rows[0][2], bool(rows[0][3])
+
+    def clear_pages(self, run_id: str, cell: int):
+        """Borra las páginas guardadas de una celda"""
+        with self._lock:
+            self._conn.execute('DELETE FROM pages WHERE run_id = ? AND cell = ?', (run_id, cell))
+            self._conn.commit()
+
+    def mark_cell_done(self, run_id: str, cell: int):
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO cells (run_id, cell) VALUES (?, ?)', (run_id, cell))
+            self._conn.commit()
+
+    def done_cells(self, run_id: str) -> Set[int]:
+        with self._lock:
+            rows = self._conn.execute('SELECT cell FROM cells WHERE run_id = ?', (run_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -------------------- Helpers --------------------
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.max_age_hours * 3600
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                'SELECT run_id FROM runs WHERE updated_at < ?', (cutoff,)
+            ).fetchall()]
+        for run_id in expired:
+            self.finish(run_id)
@@ -3,48 +3,72 @@ Procesador de datos principal
 Coordina la obtención de datos de la API y el procesamiento de horas
 """
 
+import os
+import threading
+import time
 from typing import Dict, List, Optional, Callable
 from datetime import datetime
+from config.default_config import DEFAULT_CONFIG
 from core.api_client import HumanApiClient
 from core.hours_calculator import ArgentineHoursCalculator
 from core.excel_generator import ExcelReportGenerator
+from core.cancellation import CancellationToken, OperationCancelled
+from core.lanes import BULK, INTERACTIVE, request_lane
+from core.tracing import tracer
+from core.pipeline import PipelineStage
+from core.user_directory import UserDirectory
 
 
 class DataProcessor:
     """Procesador principal de datos de asistencia"""
     
-    def __init__(self, api_key: str = None, base_url: str = None):
-        self.api_client = HumanApiClient(api_key, base_url)
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 cassette_mode: str = None, cassette_path: str = None):
+        self.api_client = HumanApiClient(api_key, base_url, cassette_mode, cassette_path)
         self.hours_calculator = ArgentineHoursCalculator()
         self.excel_generator = ExcelReportGenerator()
         
-        # Cache para optimizar rendimiento
-        self._users_cache = None
+        # Directorio de usuarios guardado por cuenta (no en modo cassette: no mezclar con lo grabado)
+        directory_path = None
+        if DEFAULT_CONFIG['users_directory_enabled'] and not self.api_client.cassette_mode:
+            directory_path = os.path.join(self.api_client.cache_directory, 'users_directory.json')
+        self.user_directory = UserDirectory(
+            directory_path,
+            # Un refresco del directorio siempre va al servidor, no al cache de respuestas
+            loader=lambda: self.api_client.get_users(use_cache=False),
+            max_age_seconds=DEFAULT_CONFIG['users_directory_max_age_ms'] / 1000,
+        )
         self._departments_cache = None
-        self._cache_timestamp = None
-        self._cache_duration = 300  # 5 minutos
+        # Segundos de cálculo + Excel por empleado-día después de la descarga (se mide en cada reporte)
+        self._post_fetch_seconds_per_day = DEFAULT_CONFIG['report_post_fetch_ms_per_day'] / 1000
+        self.user_directory.on_update(self._update_departments)
+        if self.user_directory.users is not None:
+            self._update_departments(self.user_directory.users)
     
     def test_connection(self) -> tuple[bool, str]:
         """Prueba la conexión con la API"""
         return self.api_client.test_connection()
     
+    def warm_up_connections(self):
+        """Pre-conecta con la API en segundo plano mientras el usuario elige fechas"""
+        self.api_client.preconnect()
+    
     def get_users_list(self, filters: Dict = None, use_cache: bool = True) -> List[Dict]:
         """
-        Obtiene la lista de usuarios disponibles con cache
+        Obtiene la lista de usuarios disponibles desde el directorio guardado.
+        Si está vencido se devuelve igual y se revalida en segundo plano;
+        solo se espera a la API si nunca se descargó o con use_cache=False.
         Args:
             filters: Filtros opcionales para usuarios
             use_cache: Si usar cache o forzar recarga
         Returns:
             Lista de usuarios
         """
-        # Verificar cache
-        if use_cache and self._is_cache_valid():
-            print("✅ Usando usuarios desde cache")
-            users = self._users_cache
+        if use_cache:
+            users = self.user_directory.get()
         else:
             print("🔄 Cargando usuarios desde API...")
-            users = self.api_client.get_users(filters)
-            self._update_cache(users)
+            users = self.user_directory.refresh()
         
         # Aplicar filtros si se especificaron
         if filters:
@@ -52,21 +76,23 @@ class DataProcessor:
         
         return users
     
-    def _is_cache_valid(self) -> bool:
-        """Verifica si el cache es válido"""
-        if not self._users_cache or not self._cache_timestamp:
-            return False
-        
-        now = datetime.now()
-        cache_age = (now - self._cache_timestamp).total_seconds()
-        return cache_age < self._cache_duration
+    def has_users_snapshot(self) -> bool:
+        """Indica si hay un directorio de usuarios guardado (la UI puede arrancar sin esperar a la API)"""
+        return self.user_directory.users is not None
     
-    def _update_cache(self, users: List[Dict]):
-        """Actualiza el cache de usuarios"""
-        self._users_cache = users
-        self._cache_timestamp = datetime.now()
-        
-        # Actualizar cache de departamentos
+    def refresh_users_in_background(self) -> bool:
+        """Revalida el directorio de usuarios sin bloquear, aunque no esté vencido"""
+        return self.user_directory.refresh_in_background(force=True)
+    
+    def on_users_updated(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Registra callback(filtros), llamado desde el hilo del refresco cuando el
+        directorio de usuarios cambia. Devuelve una función que lo desregistra.
+        """
+        return self.user_directory.on_update(lambda users: callback(self._build_filters(users)))
+    
+    def _update_departments(self, users: List[Dict]):
+        """Actualiza el cache de departamentos"""
         departments = set()
         for user in users:
             if user.get('department'):
@@ -95,7 +121,43 @@ class DataProcessor:
     
     def process_attendance_report(self, start_date: str, end_date: str, 
                                 user_ids: List[str] = None,
-                                progress_callback: Callable = None) -> Dict:
+                                progress_callback: Callable = None,
+                                run_id: str = None,
+                                cancel_token: CancellationToken = None,
+                                trace: bool = None,
+                                deadline_seconds: float = None) -> Dict:
+        """
+        Procesa un reporte completo de asistencia (ver _process_attendance_report).
+        Con trace (por defecto, trace_enabled) se registran spans de toda la ejecución
+        y se exportan a un trace.json de Chrome/Perfetto, cuya ruta queda en 'trace_path'.
+        """
+        if trace is None:
+            trace = DEFAULT_CONFIG.get('trace_enabled', False)
+        if not trace:
+            return self._process_attendance_report(start_date, end_date, user_ids, progress_callback,
+                                                   run_id, cancel_token, deadline_seconds)
+        
+        tracer.start()
+        try:
+            with tracer.span('report', 'report', start_date=start_date, end_date=end_date) as span:
+                result = self._process_attendance_report(start_date, end_date, user_ids, progress_callback,
+                                                         run_id, cancel_token, deadline_seconds)
+                span.set(success=result.get('success'), stage=result.get('stage'))
+        finally:
+            events = tracer.stop()
+        
+        filename = f"trace_{start_date}_{end_date}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        result['trace_path'] = tracer.export_chrome(os.path.join(DEFAULT_CONFIG['trace_directory'], filename))
+        if result['trace_path']:
+            print(f"🧭 Traza guardada ({events} eventos): {result['trace_path']}")
+        return result
+    
+    def _process_attendance_report(self, start_date: str, end_date: str, 
+                                   user_ids: List[str] = None,
+                                   progress_callback: Callable = None,
+                                   run_id: str = None,
+                                   cancel_token: CancellationToken = None,
+                                   deadline_seconds: float = None) -> Dict:
         """
         Procesa un reporte completo de asistencia
         Args:
@@ -103,13 +165,30 @@ class DataProcessor:
             end_date: Fecha de fin (YYYY-MM-DD)
             user_ids: Lista opcional de IDs de usuarios
             progress_callback: Función de callback para progreso
+            run_id: Checkpoint a reanudar (por defecto, el del mismo rango y empleados)
+            cancel_token: Token para cancelar el proceso (o cortarlo al vencer su tiempo límite)
+            deadline_seconds: Presupuesto del reporte completo: la descarga se corta cuando lo
+                              que queda alcanza justo para calcular y generar el Excel de los
+                              empleados ya completos, según lo medido en reportes anteriores
+                              ('partial', y los demás en 'pending_employees')
         Returns:
             Diccionario con el resultado del procesamiento
         """
+        fetch_token = cancel_token
+        if deadline_seconds:
+            report_deadline = time.monotonic() + deadline_seconds
+            # Tope de la descarga: siempre queda la reserva fija (abrir y guardar el Excel)
+            reserve = min(DEFAULT_CONFIG['report_deadline_reserve_ms'] / 1000, deadline_seconds * 0.25)
+            fetch_token = (cancel_token or CancellationToken()).child(deadline_seconds - reserve)
         try:
             if progress_callback:
                 progress_callback(0, "Iniciando procesamiento...")
             
+            # Métricas de peticiones y tiempos por etapa de esta ejecución
+            self.api_client.metrics.reset()
+            stage_seconds = {}
+            stage_started = time.perf_counter()
+            
             # 1. Obtener datos de la API usando procesamiento paralelo
             if progress_callback:
                 progress_callback(5, "Conectando con la API...")
@@ -123,25 +202,96 @@ class DataProcessor:
                 # Usar todos los usuarios del cache
                 filtered_users = self.get_users_list()
             
-            api_result = self.api_client.get_time_tracking_parallel_with_users(
-                start_date, end_date, filtered_users,
-                lambda p, m: progress_callback(5 + int(p * 0.6), m) if progress_callback else None
-            )
+            # En cadena: cada empleado se calcula en otro hilo apenas llegan todas sus celdas
+            processed_employees = {}
+            compute_stage = None
+            if DEFAULT_CONFIG['pipeline_compute_enabled']:
+                users_by_id = {u.get('employeeInternalId'): u for u in filtered_users}
+                
+                def compute(item):
+                    employee_id, employee_entries = item
+                    processed_employees[employee_id] = self._compute_employee(
+                        employee_id, users_by_id[employee_id], employee_entries, cancel_token
+                    )
+                compute_stage = PipelineStage(compute, DEFAULT_CONFIG['pipeline_queue_size'], 'employee-compute')
+            
+            days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+            on_employee = (lambda e, items: compute_stage.put((e, items))) if compute_stage else None
+            collected = watch_stop = None
+            late = []
+            if deadline_seconds:
+                # Se cuentan los empleados completos para cortar la descarga a tiempo (ver _cut_fetch_when_due)
+                completed = [0]
+                if on_employee is None:
+                    collected = []
+                deliver = on_employee or (lambda e, items: collected.extend(items))
+                
+                def on_employee(employee_id, items):
+                    if fetch_token.is_cancelled:
+                        # Completo recién después del corte: la reserva no contaba con él
+                        late.append(employee_id)
+                        return
+                    deliver(employee_id, items)
+                    completed[0] += 1
+                watch_stop = threading.Event()
+                threading.Thread(
+                    target=self._cut_fetch_when_due,
+                    args=(fetch_token, report_deadline, reserve, self._post_fetch_seconds_per_day * days,
+                          completed, watch_stop),
+                    name='report-deadline', daemon=True
+                ).start()
+            
+            # El reporte de unos pocos empleados es una consulta interactiva: no espera
+            # detrás de la descarga de un reporte grande
+            small = len(filtered_users) <= DEFAULT_CONFIG['interactive_max_employees']
+            try:
+                with request_lane(INTERACTIVE if small else BULK):
+                    api_result = self.api_client.get_time_tracking_parallel_with_users(
+                        start_date, end_date, filtered_users,
+                        lambda p, m: progress_callback(5 + int(p * 0.6), m) if progress_callback else None,
+                        run_id=run_id,
+                        cancel_token=fetch_token,
+                        on_employee=on_employee,
+                        until_deadline=bool(deadline_seconds)
+                    )
+            except BaseException:
+                if compute_stage:
+                    compute_stage.abort()
+                raise
+            finally:
+                if watch_stop:
+                    watch_stop.set()
+            stage_seconds['fetch'] = time.perf_counter() - stage_started
             
             if not api_result['success']:
+                if compute_stage:
+                    compute_stage.abort()
                 return {
                     'success': False,
                     'error': api_result.get('error', 'Error desconocido en la API'),
-                    'stage': 'api_fetch'
+                    'stage': 'api_fetch',
+                    'run_id': api_result.get('run_id'),
+                    'resumable': api_result.get('resumable', False)
                 }
             
             if progress_callback:
                 progress_callback(70, "Procesando datos de empleados...")
             
             # 2. Procesar datos de cada empleado
-            processed_employees = {}
+            stage_started = time.perf_counter()
+            if compute_stage:
+                # Esperar a los que siguen en cola; 'entries' viene vacío y el bucle de
+                # abajo solo calcula los empleados que no se entregaron (sin ID)
+                compute_stage.close()
+                stage_seconds['compute_busy'] = compute_stage.busy_seconds
+                print(f"📊 Empleados calculados durante la descarga: {compute_stage.processed}")
             users_data = api_result['users']
-            entries_data = api_result['entries']
+            entries_data = api_result['entries'] if collected is None else collected
+            # Reporte parcial (tiempo límite): solo los empleados completos antes del corte
+            pending_ids = set(api_result.get('pending_employees') or []) | set(late)
+            pending_users = [u for e, u in users_data.items() if e in pending_ids]
+            if pending_users:
+                users_data = {e: u for e, u in users_data.items() if e not in pending_ids}
             
             print(f"📊 Usuarios obtenidos: {len(users_data)}")
             print(f"📊 Entradas obtenidas: {len(entries_data)}")
@@ -155,12 +305,19 @@ class DataProcessor:
                         entries_by_employee[employee_id] = []
                     entries_by_employee[employee_id].append(entry)
             
+            # Las páginas llegan en orden de descarga: ordenar los días de cada empleado
+            for employee_entries in entries_by_employee.values():
+                employee_entries.sort(key=lambda e: (e.get('referenceDate') or e.get('date') or '')[:10])
+            
             print(f"📊 Empleados con entradas: {len(entries_by_employee)}")
             
             total_employees = len(users_data)
             processed_count = 0
             
             for employee_id, employee_info in users_data.items():
+                if employee_id in processed_employees:
+                    processed_count += 1
+                    continue
                 if progress_callback:
                     progress = 70 + int((processed_count / total_employees) * 20)
                     employee_name = f"{employee_info.get('firstName', '')} {employee_info.get('lastName', '')}"
@@ -170,40 +327,71 @@ class DataProcessor:
                 employee_entries = entries_by_employee.get(employee_id, [])
                 
                 # Procesar datos del empleado
-                employee_data = self.hours_calculator.process_employee_data(
-                    employee_entries, employee_info, 0, None
+                processed_employees[employee_id] = self._compute_employee(
+                    employee_id, employee_info, employee_entries, cancel_token
                 )
-                
-                processed_employees[employee_id] = employee_data
                 processed_count += 1
             
+            # Mismo orden que la lista de usuarios (el del Excel), aunque se hayan calculado en cadena
+            processed_employees = {employee_id: processed_employees[employee_id] for employee_id in users_data}
+            stage_seconds['compute'] = time.perf_counter() - stage_started
+            
             if progress_callback:
                 progress_callback(90, "Generando reporte Excel...")
             
             # 3. Generar reporte Excel
+            stage_started = time.perf_counter()
             excel_path = self.excel_generator.generate_report(
-                processed_employees, start_date, end_date
+                processed_employees, start_date, end_date, cancel_token=cancel_token,
+                pending_employees=pending_users
             )
+            stage_seconds['excel'] = time.perf_counter() - stage_started
+            if processed_employees:
+                # Lo que costó terminar después de la descarga, para dimensionar el próximo corte
+                post_fetch = (stage_seconds['compute'] + stage_seconds['excel']) / (len(processed_employees) * days)
+                self._post_fetch_seconds_per_day = 0.5 * self._post_fetch_seconds_per_day + 0.5 * post_fetch
             
             if progress_callback:
-                progress_callback(100, "¡Reporte completado!")
+                progress_callback(100, "¡Reporte parcial completado!" if pending_users else "¡Reporte completado!")
             
             # 4. Calcular estadísticas finales
+            request_metrics = self.api_client.metrics.snapshot()
             
             return {
                 'success': True,
                 'excel_path': excel_path,
                 'processed_employees': len(processed_employees),
+                # Unidades (empleados × fechas) que fallaron aun aisladas: el reporte no tiene sus datos
+                'failed_cells': api_result.get('failed_cells', []),
+                # Cortado por el tiempo límite: empleados que quedaron fuera del reporte
+                'partial': bool(pending_users),
+                'pending_employees': [
+                    {'employee_id': u.get('employeeInternalId'),
+                     'name': f"{u.get('firstName', '')} {u.get('lastName', '')}".strip()}
+                    for u in pending_users
+                ],
+                'run_id': api_result.get('run_id'),
                 'date_range': {
                     'start_date': start_date,
                     'end_date': end_date
                 },
                 'api_stats': {
                     'total_users': api_result['total_users'],
-                    'total_entries': api_result['total_entries']
+                    'total_entries': api_result['total_entries'],
+                    'endpoints': request_metrics['endpoints'],
+                    'request_totals': request_metrics['totals'],
+                    'stage_seconds': {stage: round(seconds, 3) for stage, seconds in stage_seconds.items()}
                 }
             }
             
+        except OperationCancelled as e:
+            print(f"⛔ {str(e)}")
+            return {
+                'success': False,
+                'cancelled': True,
+                'error': str(e),
+                'stage': 'cancelled'
+            }
         except Exception as e:
             error_msg = f"Error en procesamiento: {str(e)}"
             print(f"❌ {error_msg}")
@@ -213,6 +401,32 @@ class DataProcessor:
                 'stage': 'processing'
             }
     
+    @staticmethod
+    def _cut_fetch_when_due(fetch_token: CancellationToken, report_deadline: float, reserve: float,
+                            seconds_per_employee: float, completed: List[int], stop: threading.Event):
+        """
+        Corta la descarga (motivo 'deadline') cuando lo que queda hasta report_deadline
+        alcanza justo para la reserva fija más el cálculo y el Excel de los empleados
+        ya completos. Termina sola cuando se activa stop (la descarga terminó antes).
+        """
+        while not stop.wait(0.05):
+            if report_deadline - time.monotonic() <= reserve + seconds_per_employee * completed[0]:
+                print(f"⏱️ Cortando la descarga: el resto del tiempo límite es para "
+                      f"calcular y escribir {completed[0]} empleados")
+                fetch_token.cancel('deadline')
+                return
+    
+    def _compute_employee(self, employee_id: str, employee_info: Dict, employee_entries: List[Dict],
+                          cancel_token: CancellationToken = None) -> Dict:
+        """Calcula las horas de un empleado a partir de sus day summaries ordenados por fecha"""
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        with tracer.span('employee', 'compute', employee_id=employee_id,
+                         entries=len(employee_entries)):
+            return self.hours_calculator.process_employee_data(
+                employee_entries, employee_info, 0, None
+            )
+    
     def get_available_filters(self, progress_callback: Callable = None) -> Dict:
         """
         Obtiene los filtros disponibles basados en los usuarios
@@ -230,28 +444,10 @@ class DataProcessor:
             if progress_callback:
                 progress_callback(60, f"📊 Procesando {len(users)} usuarios...")
             
-            # Extraer departamentos únicos
-            departments = set()
-            locations = set()
-            job_titles = set()
-            
-            for user in users:
-                if user.get('department'):
-                    departments.add(user['department'])
-                if user.get('location'):
-                    locations.add(user['location'])
-                if user.get('jobTitle'):
-                    job_titles.add(user['jobTitle'])
-            
             if progress_callback:
                 progress_callback(80, "🔧 Configurando filtros...")
             
-            return {
-                'departments': sorted(list(departments)),
-                'locations': sorted(list(locations)),
-                'job_titles': sorted(list(job_titles)),
-                'total_users': len(users)
-            }
+            return self._build_filters(users)
             
         except Exception as e:
             print(f"❌ Error obteniendo filtros: {str(e)}")
@@ -262,6 +458,27 @@ class DataProcessor:
                 'total_users': 0
             }
     
+    def _build_filters(self, users: List[Dict]) -> Dict:
+        """Opciones de filtrado (departamentos, ubicaciones, puestos) de una lista de usuarios"""
+        departments = set()
+        locations = set()
+        job_titles = set()
+        
+        for user in users:
+            if user.get('department'):
+                departments.add(user['department'])
+            if user.get('location'):
+                locations.add(user['location'])
+            if user.get('jobTitle'):
+                job_titles.add(user['jobTitle'])
+        
+        return {
+            'departments': sorted(list(departments)),
+            'locations': sorted(list(locations)),
+            'job_titles': sorted(list(job_titles)),
+            'total_users': len(users)
+        }
+    
     def filter_users_by_criteria(self, criteria: Dict) -> List[str]:
         """
         Filtra usuarios según criterios específicos
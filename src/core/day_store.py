@@ -0,0 +1,184 @@
+"""
+Almacén local de day summaries por (empleado, fecha)
+Permite pedir a la API solo las celdas que faltan o que todavía pueden cambiar
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Set
+
+
+class DaySummaryStore:
+    """
+    Guarda cada day summary indexado por employeeId + referenceDate.
+
+    Una celda (empleado, fecha) se considera definitiva si se descargó cuando
+    ya habían pasado más de `mutable_days` desde esa fecha: los días recientes
+    todavía reciben correcciones de fichadas y se vuelven a pedir. Las celdas
+    descargadas sin datos se guardan vacías para no volver a pedirlas.
+    """
+
+    def __init__(self, path: str, mutable_days: int):
+        self.path = os.path.expanduser(path)
+        self.mutable_days = mutable_days
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS day_summaries (
+                employee_id TEXT NOT NULL,
+                reference_date TEXT NOT NULL,
+                payload BLOB,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (employee_id, reference_date)
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_day_summaries_date ON day_summaries(reference_date)')
+        self._conn.commit()
+
+    # -------------------- Planificación --------------------
+
+    def plan_fetches(self, employee_ids: List[str], start_date: str, end_date: str) -> List[Dict]:
+        """
+        Calcula las consultas mínimas para completar el rango.
+        Por empleado se juntan las fechas faltantes o mutables en tramos contiguos,
+        y los empleados con los mismos tramos comparten consulta.
+        Returns:
+            Lista de {'start_date', 'end_date', 'user_ids', 'cells'}
+        """
+        dates = self.date_range(start_date, end_date)
+        final = self._final_cells(set(employee_ids), start_date, end_date)
+
+        groups = {}
+        for employee_id in employee_ids:
+            done = final.get(employee_id, set())
+            spans = tuple(self._spans([d for d in dates if d not in done]))
+            if spans:
+                groups.setdefault(spans, []).append(employee_id)
+
+        plan = []
+        for spans, user_ids in groups.items():
+            for span_start, span_end, days in spans:
+                plan.append({
+                    'start_date': span_start,
+                    'end_date': span_end,
+                    'user_ids': user_ids,
+                    'cells': days * len(user_ids),
+                })
+        return plan
+
+    def _final_cells(self, employee_ids: Set[str], start_date: str, end_date: str) -> Dict[str, Set[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT employee_id, reference_date, fetched_at FROM day_summaries '
+                'WHERE reference_date BETWEEN ? AND ?', (start_date, end_date)
+            ).fetchall()
+
+        final = {}
+        mutable_window = timedelta(days=self.mutable_days + 1)
+        for employee_id, reference_date, fetched_at in rows:
+            if employee_id not in employee_ids:
+                continue
+            settled_at = datetime.strptime(reference_date, '%Y-%m-%d') + mutable_window
+            if datetime.fromtimestamp(fetched_at) >= settled_at:
+                final.setdefault(employee_id, set()).add(reference_date)
+        return final
+
+    # -------------------- Lectura / escritura --------------------
+
+    def save_batch(self, user_ids: List[str], start_date: str, end_date: str, items: List[Dict]):
+        """
+        Registra el resultado completo de una consulta (empleados × rango).
+        Las celdas sin item quedan marcadas como descargadas y vacías.
+        """
+        by_cell = {}
+        for item in items:
+            employee_id = item.get('employeeId')
+            reference_date = (item.get('referenceDate') or item.get('date') or '')[:10]
+            if employee_id and reference_date:
+                by_cell[(employee_id, reference_date)] = item
+
+        now = time.time()
+        rows = []
+        for employee_id in user_ids:
+            for reference_date in self.date_range(start_date, end_date):
+                item = by_cell.get((employee_id, reference_date))
+                payload = zlib.compress(json.dumps(item, separators=(',', ':')).encode('utf-8')) if item else None
+                rows.append((employee_id, reference_date, payload, now))
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO day_summaries (employee_id, reference_date, payload, fetched_at) '
+                'VALUES (?, ?, ?, ?)', rows
+            )
+            self._conn.commit()
+
+    def load(self, employee_ids: Iterable[str], start_date: str, end_date: str,
+             transform: Callable[[Dict], Dict] = None) -> List[Dict]:
+        """
+        Devuelve los day summaries guardados del rango, ordenados por empleado y fecha
+        Args:
+            transform: Se aplica a cada day summary apenas se decodifica (p. ej. la
+                       proyección de campos), para no tener todos los originales a la vez
+        """
+        wanted = set(employee_ids)
+        with self._lock:
+            if len(wanted) == 1:
+                # Un solo empleado (cálculo en cadena): usar la clave primaria
+                rows = self._conn.execute(
+                    'SELECT employee_id, payload FROM day_summaries '
+                    'WHERE employee_id = ? AND reference_date BETWEEN ? AND ? AND payload IS NOT NULL '
+                    'ORDER BY reference_date', (next(iter(wanted)), start_date, end_date)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    'SELECT employee_id, payload FROM day_summaries '
+                    'WHERE reference_date BETWEEN ? AND ? AND payload IS NOT NULL '
+                    'ORDER BY employee_id, reference_date', (start_date, end_date)
+                ).fetchall()
+        items = []
+        for employee_id, payload in rows:
+            if employee_id in wanted:
+                item = json.loads(zlib.decompress(payload))
+                items.append(transform(item) if transform else item)
+        return items
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM day_summaries')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -------------------- Helpers --------------------
+
+    @staticmethod
+    def date_range(start_date: str, end_date: str) -> List[str]:
+        current = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        dates = []
+        while current <= end_dt:
+            dates.append(current.strftime('%Y-%m-%d'))
+            current += timedelta(days=1)
+        return dates
+
+    @staticmethod
+    def _spans(dates: List[str]) -> List[tuple]:
+        """Agrupa fechas ordenadas en tramos contiguos (inicio, fin, días)"""
+        spans = []
+        for date_str in dates:
+            current = datetime.strptime(date_str, '%Y-%m-%d')
+            if spans and datetime.strptime(spans[-1][1], '%Y-%m-%d') + timedelta(days=1) == current:
+                spans[-1] = (spans[-1][0], date_str, spans[-1][2] + 1)
+            else:
+                spans.append((date_str, date_str, 1))
+        return spans
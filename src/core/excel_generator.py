@@ -6,8 +6,10 @@ Solo muestra los datos calculados por hours_calculator
 import os
 import pandas as pd
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 from config.default_config import DEFAULT_CONFIG
+from core.cancellation import CancellationToken
+from core.tracing import tracer
 import re 
 
 def get_field(info, field_name):
@@ -60,11 +62,21 @@ class ExcelReportGenerator:
         return m.group(0) if m else ""
 
     # -------------------- Generación principal --------------------
-    def generate_report(self, processed_data: Dict, start_date: str, end_date: str, output_filename: str = None) -> str:
-        """Genera el reporte Excel usando pandas"""
+    def generate_report(self, processed_data: Dict, start_date: str, end_date: str, output_filename: str = None,
+                        cancel_token: CancellationToken = None,
+                        pending_employees: List[Dict] = None) -> str:
+        """
+        Genera el reporte Excel usando pandas.
+        Se escribe a un archivo temporal que reemplaza al final: si se cancela o falla
+        no queda un reporte a medias con el nombre definitivo.
+        Con pending_employees (reporte parcial por tiempo límite) se agrega una hoja
+        con los empleados que no se llegaron a descargar.
+        """
 
-        summary_data = self._prepare_summary_data(processed_data)
-        daily_data = self._prepare_daily_data(processed_data)
+        with tracer.span('excel_prepare', 'excel', employees=len(processed_data)) as span:
+            summary_data = self._prepare_summary_data(processed_data, cancel_token)
+            daily_data = self._prepare_daily_data(processed_data, cancel_token)
+            span.set(summary_rows=len(summary_data), daily_rows=len(daily_data))
 
         if not output_filename:
             output_filename = self.filename_format.format(
@@ -73,29 +85,57 @@ class ExcelReportGenerator:
 
         os.makedirs(self.output_dir, exist_ok=True)
         filepath = os.path.join(self.output_dir, output_filename)
+        base, extension = os.path.splitext(filepath)
+        temp_path = f"{base}.partial{extension or '.xlsx'}"
 
-        with pd.ExcelWriter(filepath, engine='xlsxwriter') as writer:
-            # Hoja Resumen
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Resumen Consolidado', index=False, startrow=3)
-            self._format_summary_sheet(writer, summary_df, start_date, end_date)
-
-            # Hoja Detalle Diario
-            daily_df = pd.DataFrame(daily_data)
-            daily_df.to_excel(writer, sheet_name='Detalle Diario', index=False, startrow=3)
-            self._format_daily_sheet(writer, daily_df, start_date, end_date)
-
-            # Hoja Configuración
+        try:
+            with pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
+                # Hoja Resumen
+                with tracer.span('excel_sheet', 'excel', sheet='Resumen Consolidado', rows=len(summary_data)):
+                    summary_df = pd.DataFrame(summary_data)
+                    summary_df.to_excel(writer, sheet_name='Resumen Consolidado', index=False, startrow=3)
+                    self._format_summary_sheet(writer, summary_df, start_date, end_date)
+
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+
+                # Hoja Detalle Diario
+                with tracer.span('excel_sheet', 'excel', sheet='Detalle Diario', rows=len(daily_data)):
+                    daily_df = pd.DataFrame(daily_data)
+                    daily_df.to_excel(writer, sheet_name='Detalle Diario', index=False, startrow=3)
+                    self._format_daily_sheet(writer, daily_df, start_date, end_date)
+
+                # Hoja Pendientes (reporte parcial)
+                if pending_employees:
+                    pending_df = pd.DataFrame([{
+                        'ID Empleado': info.get('employeeInternalId', ''),
+                        'Nombre': info.get('firstName', ''),
+                        'Apellido': info.get('lastName', ''),
+                    } for info in pending_employees])
+                    pending_df.to_excel(writer, sheet_name='Pendientes', index=False, startrow=3)
+                    self._format_pending_sheet(writer, pending_df, start_date, end_date)
+
+                # Hoja Configuración
+
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
 
         print(f"✅ Reporte Excel generado: {filepath}")
         return filepath
 
     # -------------------- Preparación de datos --------------------
-    def _prepare_summary_data(self, processed_data: Dict) -> list:
+    def _prepare_summary_data(self, processed_data: Dict, cancel_token: CancellationToken = None) -> list:
         """Prepara datos para la hoja de resumen (horas convertidas según configuración)"""
         summary_rows = []
 
         for emp in processed_data.values():
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
             info = emp['employee_info']
             totals = emp['totals']
 
@@ -122,11 +162,13 @@ class ExcelReportGenerator:
 
         return summary_rows
 
-    def _prepare_daily_data(self, processed_data: Dict) -> list:
+    def _prepare_daily_data(self, processed_data: Dict, cancel_token: CancellationToken = None) -> list:
         """Prepara datos para la hoja de detalle diario"""
         daily_rows = []
 
         for emp in processed_data.values():
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
             info = emp['employee_info']
 
             legajo = get_field(info, "Legajo")
@@ -246,6 +288,24 @@ class ExcelReportGenerator:
             else:
                 worksheet.set_column(col_num, col_num, 18)
 
+    def _format_pending_sheet(self, writer, df, start_date, end_date):
+        workbook = writer.book
+        worksheet = writer.sheets['Pendientes']
+
+        title_format = workbook.add_format({'bold': True, 'font_size': 12})
+        header_format = workbook.add_format({
+            'bold': True, 'font_color': 'white', 'bg_color': '#366092',
+            'border': 1, 'align': 'center', 'valign': 'vcenter'
+        })
+
+        worksheet.write(0, 0, f"EMPLEADOS PENDIENTES ({len(df)}): NO INCLUIDOS POR TIEMPO LÍMITE", title_format)
+        worksheet.write(1, 0, f"Período: {start_date} al {end_date}", title_format)
+        worksheet.write(2, 0, f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}", title_format)
+
+        for col_num, col_name in enumerate(df.columns):
+            worksheet.write(3, col_num, col_name, header_format)
+            worksheet.set_column(col_num, col_num, 18)
+
     def _format_daily_sheet(self, writer, df, start_date, end_date):
         workbook = writer.book
         worksheet = writer.sheets['Detalle Diario']
@@ -0,0 +1,122 @@
+"""
+Proyección de payloads al ingresar
+Reduce cada day summary y cada usuario a los campos que usan el cálculo de
+horas, el Excel y los filtros, e interna los strings repetidos (fechas, tipos,
+categorías, departamentos) y las sub-estructuras repetidas (horarios, horas
+categorizadas, feriados) para que miles de copias compartan un solo objeto
+"""
+
+import sys
+from typing import Any, Dict, List
+
+# Campos de un day summary que lee ArgentineHoursCalculator (más employeeId para agrupar)
+DAY_SUMMARY_FIELDS = (
+    'employeeId', 'referenceDate', 'date', 'isWorkday', 'entries', 'timeSlots',
+    'categorizedHours', 'hours', 'totalHours', 'holidays', 'incidences', 'timeOffRequests',
+)
+
+# Campos de un usuario que usan el Excel, los filtros y la UI
+USER_FIELDS = (
+    'employeeInternalId', 'firstName', 'lastName', 'department', 'location',
+    'jobTitle', 'isActive', 'fields', 'segmentations',
+)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _freeze(value: Any) -> Any:
+    """Clave hasheable equivalente a una estructura de dicts, listas y valores simples"""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return ('[]',) + tuple(_freeze(v) for v in value)
+    return value
+
+
+def _scalars(item: Any) -> Any:
+    """Solo los valores simples de un dict (los anidados no se usan); otros tipos igual que vienen"""
+    if isinstance(item, dict):
+        return {_intern(k): _intern(v) for k, v in item.items() if not isinstance(v, (dict, list))}
+    return _intern(item)
+
+
+class PayloadProjector:
+    """
+    Proyecta day summaries y usuarios recién decodificados.
+    Es idempotente: proyectar algo ya proyectado devuelve lo mismo.
+
+    Las listas pasan a ser tuplas, y las que se repiten entre días (el mismo
+    horario, las mismas horas categorizadas, ninguna incidencia) son el mismo
+    objeto: el resultado es de solo lectura.
+    """
+
+    MAX_SHARED = 100000  # Tope de sub-estructuras distintas a compartir
+
+    def __init__(self):
+        self.projected = 0
+        self._shared: Dict[Any, Any] = {}
+
+    def _share(self, value: Any) -> Any:
+        """Devuelve la copia ya vista de una sub-estructura igual (la primera, si es nueva)"""
+        key = _freeze(value)
+        shared = self._shared.get(key)
+        if shared is not None:
+            return shared
+        if len(self._shared) < self.MAX_SHARED:
+            self._shared[key] = value
+        return value
+
+    def day_summary(self, item: Dict) -> Dict:
+        self.projected += 1
+        out = {}
+        for key in DAY_SUMMARY_FIELDS:
+            if key not in item:
+                continue
+            value = item[key]
+            if key == 'entries':
+                value = tuple({k: _intern(e[k]) for k in ('type', 'time', 'date') if k in e}
+                              for e in value or ())
+            elif key == 'timeSlots':
+                value = self._share(tuple({k: _intern(s[k]) for k in ('startTime', 'endTime') if k in s}
+                                          for s in value or ()))
+            elif key == 'categorizedHours':
+                value = self._share(tuple({
+                    'category': {'name': _intern((c.get('category') or {}).get('name', ''))},
+                    'hours': c.get('hours', 0),
+                } for c in value or ()))
+            elif key == 'hours':
+                if isinstance(value, dict):
+                    value = self._share({'worked': value.get('worked', 0)})
+            elif key == 'holidays':
+                value = self._share(tuple({'name': _intern((h or {}).get('name'))} for h in value or ()))
+            elif key in ('incidences', 'timeOffRequests'):
+                value = self._share(tuple(_scalars(v) for v in value or ()))
+            else:
+                value = _intern(value)
+            out[sys.intern(key)] = value
+        return out
+
+    def day_summaries(self, items: List[Dict]) -> List[Dict]:
+        return [self.day_summary(item) for item in items]
+
+    def user(self, user: Dict) -> Dict:
+        out = {}
+        for key in USER_FIELDS:
+            if key not in user:
+                continue
+            value = user[key]
+            if key == 'fields':
+                value = [{'name': _intern(f.get('name')), 'value': _intern(f.get('value'))}
+                         for f in value or []]
+            elif key == 'segmentations':
+                value = [{'group': _intern(s.get('group')), 'item': _intern(s.get('item'))}
+                         for s in value or []]
+            else:
+                value = _intern(value)
+            out[sys.intern(key)] = value
+        return out
+
+    def users(self, users: List[Dict]) -> List[Dict]:
+        return [self.user(user) for user in users]
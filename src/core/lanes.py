@@ -0,0 +1,43 @@
+"""
+Carriles de prioridad de las peticiones a la API
+Las llamadas interactivas (prueba de conexión, directorio de usuarios, el
+reporte de unos pocos empleados) pasan delante de la descarga de un reporte
+grande. El carril se fija con request_lane() y lo hereda todo lo que se
+ejecute dentro del bloque, incluidas las corutinas del motor asíncrono
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+from typing import Callable
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+LANES = (INTERACTIVE, BULK)
+
+_lane = contextvars.ContextVar('request_lane', default=BULK)
+
+
+def current_lane() -> str:
+    """Carril de las peticiones del contexto actual (por defecto, bulk)"""
+    return _lane.get()
+
+
+@contextmanager
+def request_lane(lane: str):
+    """Las peticiones hechas dentro del bloque van por `lane`"""
+    if lane not in LANES:
+        raise ValueError(f"Carril de peticiones desconocido: {lane}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def bind_lane(fn: Callable) -> Callable:
+    """
+    fn ligada al contexto actual, para ejecutarla en otro hilo: los pools de
+    hilos no heredan el contexto y la petición iría por el carril por defecto
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
@@ -0,0 +1,181 @@
+"""
+Métricas de peticiones por endpoint
+Contadores (peticiones, reintentos, bytes, status), histogramas de latencia y
+tiempo de espera en el limitador, para saber si un reporte lento estuvo
+limitado por la red, por el throttling o por el cálculo
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LatencyHistogram:
+    """
+    Histograma con buckets exponenciales (cada uno 10% más ancho que el anterior):
+    memoria fija sin importar cuántas muestras entren, y percentiles con error < 10%.
+    """
+
+    MIN_SECONDS = 0.001
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = math.ceil(math.log(seconds / self.MIN_SECONDS) / math.log(self.GROWTH))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Límite superior del bucket que contiene el percentil q (0-1)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH ** bucket, self.max)
+        return self.max
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.requests = 0           # Intentos que salieron a la red
+        self.retries = 0
+        self.errors = 0             # Intentos sin respuesta o con status >= 400
+        self.statuses: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.bytes_on_wire = 0
+        self.bytes_decoded = 0
+        self.throttle_seconds = 0.0  # Espera acumulada en el limitador
+        self.backoff_seconds = 0.0   # Espera acumulada entre reintentos
+        self.latency = LatencyHistogram()
+        self.queries = 0             # Consultas paginadas
+        self.pages = 0
+        self.max_pages = 0
+        self.hedged = 0              # Peticiones lentas que se duplicaron
+        self.hedge_wins = 0          # ... y en las que respondió antes el duplicado
+
+    def snapshot(self) -> Dict:
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'statuses': dict(self.statuses),
+            'cache_hits': self.cache_hits,
+            'bytes_on_wire': self.bytes_on_wire,
+            'bytes_decoded': self.bytes_decoded,
+            'latency_p50': rounded(self.latency.percentile(0.50)),
+            'latency_p95': rounded(self.latency.percentile(0.95)),
+            'latency_p99': rounded(self.latency.percentile(0.99)),
+            'latency_max': rounded(self.latency.max) if self.latency.count else None,
+            'network_seconds': round(self.latency.total, 3),
+            'throttle_seconds': round(self.throttle_seconds, 3),
+            'backoff_seconds': round(self.backoff_seconds, 3),
+            'queries': self.queries,
+            'pages_per_query': round(self.pages / self.queries, 2) if self.queries else None,
+            'max_pages_per_query': self.max_pages,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+        }
+
+
+class RequestMetrics:
+    """
+    Métricas por endpoint del cliente de la API (thread-safe).
+    Los tiempos son acumulados entre todos los hilos: con N peticiones en
+    paralelo pueden superar la duración real del reporte.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointMetrics] = {}
+        self._started = time.monotonic()
+
+    def _get(self, endpoint: str) -> _EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics()
+        return metrics
+
+    def record_attempt(self, endpoint: str, latency: float, status: Optional[int],
+                       bytes_on_wire: int = 0, bytes_decoded: int = 0, retry: bool = False):
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.requests += 1
+            metrics.retries += 1 if retry else 0
+            if status is None or status >= 400:
+                metrics.errors += 1
+            key = str(status) if status is not None else 'sin respuesta'
+            metrics.statuses[key] = metrics.statuses.get(key, 0) + 1
+            metrics.bytes_on_wire += bytes_on_wire
+            metrics.bytes_decoded += bytes_decoded
+            metrics.latency.add(latency)
+
+    def record_cache_hit(self, endpoint: str):
+        with self._lock:
+            self._get(endpoint).cache_hits += 1
+
+    def record_throttle(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._get(endpoint).throttle_seconds += seconds
+
+    def record_backoff(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._get(endpoint).backoff_seconds += seconds
+
+    def record_query_pages(self, endpoint: str, pages: int):
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.queries += 1
+            metrics.pages += pages
+            metrics.max_pages = max(metrics.max_pages, pages)
+
+    def record_hedge(self, endpoint: str, won: bool):
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.hedged += 1
+            metrics.hedge_wins += 1 if won else 0
+
+    def latency_percentile(self, endpoint: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Percentil q (0-1) de la latencia del endpoint (None con menos de min_samples muestras)"""
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None or metrics.latency.count < max(1, min_samples):
+                return None
+            return metrics.latency.percentile(q)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._started = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            {'endpoints': {endpoint: métricas}, 'totals': {...}, 'elapsed_seconds': desde el último reset}
+        """
+        with self._lock:
+            endpoints = {endpoint: metrics.snapshot() for endpoint, metrics in self._endpoints.items()}
+            elapsed = time.monotonic() - self._started
+        totals = {
+            key: sum(e[key] for e in endpoints.values())
+            for key in ('requests', 'retries', 'errors', 'cache_hits', 'bytes_on_wire', 'bytes_decoded',
+                        'hedged', 'hedge_wins')
+        }
+        for key in ('network_seconds', 'throttle_seconds', 'backoff_seconds'):
+            totals[key] = round(sum(e[key] for e in endpoints.values()), 3)
+        return {'endpoints': endpoints, 'totals': totals, 'elapsed_seconds': round(elapsed, 3)}
@@ -0,0 +1,140 @@
+"""
+Cálculo en cadena con la descarga
+Reparte por empleado la grilla de day summaries y calcula las horas de cada
+empleado apenas terminan todas sus celdas, mientras el resto se sigue descargando
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+
+class EmployeePartitioner:
+    """
+    Agrupa por employeeId las páginas que llegan de la grilla y entrega cada
+    empleado una sola vez, con sus items ordenados por fecha, cuando se
+    terminaron todas las celdas que lo incluyen.
+
+    - Con `load`, los items no se acumulan: al completarse el empleado se leen
+      con load(employee_id) (por ejemplo, del almacén local de day summaries).
+      Los empleados sin celdas pendientes se entregan en start().
+    - finish() entrega los que quedaron pendientes (celdas que fallaron) con lo
+      que se haya recibido, y los que no tuvieron ningún item.
+    """
+
+    def __init__(self, grid: List[Dict], employee_ids: List[str],
+                 emit: Callable[[str, List[Dict]], None],
+                 load: Optional[Callable[[str], List[Dict]]] = None):
+        self.employee_ids = [e for e in dict.fromkeys(employee_ids) if e]
+        self.emit = emit
+        self.load = load
+        self.items = 0      # Items recibidos (o leídos con load)
+        self.failed = set()  # Empleados con alguna celda fallida
+
+        self._pending = Counter(e for batch in grid for e in batch['user_ids'])
+        self._buffers: Dict[str, List[Dict]] = {}
+        self._emitted = set()
+
+    def start(self):
+        """Entrega los empleados que no tienen nada para descargar"""
+        for employee_id in self.employee_ids:
+            if not self._pending[employee_id]:
+                self._emit(employee_id)
+
+    def add_page(self, page_items: List[Dict]):
+        if self.load:
+            return
+        for item in page_items:
+            employee_id = item.get('employeeId')
+            if employee_id:
+                self._buffers.setdefault(employee_id, []).append(item)
+
+    def cell_done(self, batch: Dict, failed: List[Dict]):
+        """Una celda terminó (failed: unidades que fallaron): entrega los empleados que quedaron completos"""
+        for unit in failed:
+            self.failed.update(unit['employee_ids'])
+        for employee_id in batch['user_ids']:
+            self._pending[employee_id] -= 1
+            if self._pending[employee_id] <= 0:
+                self._emit(employee_id)
+
+    def finish(self):
+        for employee_id in self.employee_ids:
+            self._emit(employee_id)
+
+    def _emit(self, employee_id: str):
+        if employee_id in self._emitted:
+            return
+        self._emitted.add(employee_id)
+        if self.load:
+            items = self.load(employee_id)
+        else:
+            items = self._buffers.pop(employee_id, [])
+            # Las páginas llegan en orden de descarga: ordenar los días del empleado
+            items.sort(key=lambda e: (e.get('referenceDate') or e.get('date') or '')[:10])
+        self.items += len(items)
+        self.emit(employee_id, items)
+
+
+class PipelineStage:
+    """
+    Etapa de una cadena: un hilo que procesa, en orden de llegada, los
+    elementos de una cola acotada. Si la cola está llena, put() espera: la
+    etapa anterior se frena en vez de acumular trabajo en memoria.
+    Un error en el hilo corta la etapa y se relanza en el próximo put() o en close().
+    """
+
+    def __init__(self, handle: Callable[[Any], None], maxsize: int, name: str = 'pipeline-stage'):
+        self.handle = handle
+        self.processed = 0
+        self.busy_seconds = 0.0  # Tiempo dentro de handle
+        self._queue = queue.Queue(maxsize=max(1, maxsize))
+        self._done = object()
+        self._error: Optional[BaseException] = None
+        self._aborted = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any):
+        while True:
+            if self._error is not None:
+                raise self._error
+            if self._aborted.is_set():
+                return
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def close(self):
+        """Espera a que se procese todo lo encolado y relanza el error del hilo, si lo hubo"""
+        self.put(self._done)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self):
+        """Descarta lo pendiente y termina el hilo sin esperar"""
+        self._aborted.set()
+        try:
+            self._queue.put_nowait(self._done)
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._done or self._aborted.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                self.handle(item)
+            except BaseException as e:
+                self._error = e
+                return
+            finally:
+                self.busy_seconds += time.perf_counter() - started
+            self.processed += 1
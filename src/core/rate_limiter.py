@@ -0,0 +1,212 @@
+"""
+Limitador adaptativo de peticiones para la API de Human.co
+Token bucket + control AIMD de concurrencia y tasa, con soporte de Retry-After
+y carriles de prioridad (interactivo antes que bulk)
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from core.lanes import BULK, INTERACTIVE
+
+
+class AdaptiveRateLimiter:
+    """
+    Controla cuántas peticiones salen por segundo y cuántas hay en vuelo.
+
+    - Token bucket: cada petición consume un token; los tokens se reponen a `rate` por segundo
+      hasta `burst`.
+    - AIMD: cada respuesta rápida suma `increase / valor` a la concurrencia y a la tasa
+      (≈ +1 por ventana); un 429, un 5xx, un error de red o un pico de latencia los
+      multiplica por `decrease_factor` (como mucho una vez por ventana).
+    - Retry-After: pausa todas las peticiones hasta el instante indicado por el servidor.
+    - Carriles: cuando se libera un lugar, pasa primero quien espera en el carril
+      interactivo; un bulk que espera pasa igual después de `bulk_every` turnos
+      interactivos seguidos, para no quedarse sin turno.
+    """
+
+    def __init__(self, rate: float, max_rate: float, burst: int,
+                 concurrency: int, min_concurrency: int, max_concurrency: int,
+                 increase: float = 1.0, decrease_factor: float = 0.5,
+                 latency_spike_factor: float = 3.0, bulk_every: int = 4):
+        self.rate = float(rate)
+        self.max_rate = float(max_rate)
+        self.min_rate = 1.0
+        self.burst = burst
+        self.concurrency = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.bulk_every = bulk_every
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+        self._pause_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma = None
+        self._latency_samples = 0
+        self.throttled_seconds = 0.0
+        self._waiting = {INTERACTIVE: 0, BULK: 0}
+        self._interactive_streak = 0  # Turnos interactivos seguidos con bulk esperando
+        self.granted = {INTERACTIVE: 0, BULK: 0}
+
+    def acquire(self, cancel_token=None, lane: str = BULK) -> float:
+        """
+        Bloquea hasta que haya un token, un lugar libre en la ventana de concurrencia,
+        no haya una pausa de Retry-After vigente y sea el turno del carril.
+        Args:
+            cancel_token: CancellationToken opcional; si se cancela, la espera
+                          termina enseguida con OperationCancelled
+            lane: Carril de la petición (ver core.lanes)
+        Returns:
+            Segundos de espera
+        """
+        started = time.monotonic()
+        unregister = cancel_token.on_cancel(self._wake_all) if cancel_token else None
+        try:
+            return self._acquire(started, cancel_token, lane)
+        finally:
+            if unregister:
+                unregister()
+
+    def _acquire(self, started: float, cancel_token, lane: str) -> float:
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while True:
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if now < self._pause_until:
+                        wait = self._pause_until - now
+                    elif self._in_flight >= int(self.concurrency):
+                        wait = None  # hasta que termine alguna petición
+                    elif self._must_yield(lane):
+                        wait = None  # hasta que pase el otro carril
+                    elif self._tokens < 1:
+                        wait = (1 - self._tokens) / self.rate
+                    else:
+                        self._tokens -= 1
+                        self._in_flight += 1
+                        self.granted[lane] += 1
+                        if lane == INTERACTIVE and self._waiting[BULK]:
+                            self._interactive_streak += 1
+                        else:
+                            self._interactive_streak = 0
+                        waited = now - started
+                        self.throttled_seconds += waited
+                        return waited
+
+                    self._cond.wait(wait)
+            finally:
+                # Los que ceden el turno esperan a que este termine de esperar
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+    def _must_yield(self, lane: str) -> bool:
+        """Si la petición tiene que dejar pasar primero a una del otro carril"""
+        starving = self._interactive_streak >= self.bulk_every
+        if lane == BULK:
+            return self._waiting[INTERACTIVE] > 0 and not starving
+        return self._waiting[BULK] > 0 and starving
+
+    def release(self, latency: float, status: Optional[int], retry_after: Optional[float] = None):
+        """
+        Registra el resultado de una petición y ajusta concurrencia y tasa.
+        Args:
+            latency: Duración de la petición en segundos
+            status: Código HTTP (None si falló la conexión)
+            retry_after: Segundos indicados por el servidor en Retry-After
+        """
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+
+            if retry_after:
+                self._pause_until = max(self._pause_until, now + retry_after)
+
+            congested = status is None or status == 429 or status >= 500
+            spike = (
+                self._latency_samples >= 5
+                and latency > self.latency_spike_factor * self._latency_ewma
+            )
+
+            if congested or spike:
+                # Una sola reducción por ventana: las respuestas de la misma ráfaga no cuentan doble
+                if now - self._last_decrease >= max(self._latency_ewma or 0.0, 0.5):
+                    self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self._last_decrease = now
+            elif status < 400:
+                self.concurrency = min(self.max_concurrency, self.concurrency + self.increase / self.concurrency)
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+            if not congested and not spike:
+                self._latency_ewma = latency if self._latency_ewma is None else (
+                    0.8 * self._latency_ewma + 0.2 * latency
+                )
+                self._latency_samples += 1
+
+            self._cond.notify_all()
+
+    def has_capacity(self, lane: str = BULK) -> bool:
+        """True si una petición de `lane` saldría ya, sin esperar turno (ver acquire)"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return (now >= self._pause_until and self._in_flight < int(self.concurrency)
+                    and not self._must_yield(lane) and self._tokens >= 1)
+
+    def cancel(self):
+        """Libera un lugar obtenido con acquire() por una petición que finalmente no salió"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _wake_all(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict:
+        """Estado actual del limitador (para logs y estadísticas)"""
+        with self._cond:
+            return {
+                'concurrency': round(self.concurrency, 2),
+                'rate_per_second': round(self.rate, 2),
+                'in_flight': self._in_flight,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+                'latency': round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                'granted': dict(self.granted),
+            }
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Convierte un header Retry-After (segundos o fecha HTTP) a segundos de espera
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
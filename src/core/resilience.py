@@ -0,0 +1,176 @@
+"""
+Políticas de resiliencia para las peticiones a la API
+Backoff exponencial con jitter decorrelacionado, clasificación de errores,
+circuit breaker por endpoint con sondeo half-open y tope de peticiones
+duplicadas (hedging)
+"""
+
+import random
+import threading
+import time
+import requests
+
+# Códigos HTTP que indican un problema transitorio del servidor
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """El circuito del endpoint está abierto: la petición se rechaza sin salir a la red"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuito abierto para {endpoint} (reintento en {retry_in:.1f} s)")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Clasifica un error de petición.
+    Reintentables: timeouts, errores de conexión y HTTP 408/425/429/5xx.
+    Fatales: el resto de 4xx (parámetros, credenciales, permisos) y URLs inválidas,
+    que fallarían igual en el siguiente intento.
+    """
+    if isinstance(error, requests.exceptions.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status in RETRYABLE_STATUS or status >= 500
+    if isinstance(error, (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                          requests.exceptions.InvalidSchema, requests.exceptions.InvalidHeader)):
+        return False
+    return isinstance(error, requests.exceptions.RequestException)
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """
+    Próxima espera con backoff exponencial y jitter decorrelacionado:
+    sleep = min(cap, uniforme(base, previo × 3)).
+    Desincroniza a los workers que fallaron juntos para que no reintenten en ráfaga.
+    """
+    return min(cap, random.uniform(base, max(base, previous * 3)))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de un endpoint.
+
+    - closed: las peticiones pasan; `failure_threshold` fallas reintentables seguidas lo abren.
+    - open: las peticiones fallan al instante con CircuitOpenError durante `reset_timeout`.
+    - half_open: vencido el plazo, una sola petición de sondeo sale a la red; si responde
+      se cierra, si falla vuelve a abrirse duplicando el plazo (hasta `max_reset_timeout`).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5,
+                 reset_timeout: float = 15.0, max_reset_timeout: float = 120.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._reset_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self) -> bool:
+        """
+        Autoriza una petición o lanza CircuitOpenError.
+        Vencido el plazo de apertura, deja pasar una única petición de sondeo.
+        Returns:
+            True si la petición es el sondeo half-open (si no llega a salir hay
+            que devolverlo con release_probe)
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+
+            retry_in = self._opened_at + self._reset_timeout - time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            raise CircuitOpenError(self.endpoint, max(0.0, retry_in))
+
+    def raise_if_open(self):
+        """Lanza CircuitOpenError si el circuito se abrió (sin consumir el sondeo half-open)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                retry_in = self._opened_at + self._reset_timeout - time.monotonic()
+                raise CircuitOpenError(self.endpoint, max(0.0, retry_in))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"🔌 Circuito cerrado para {self.endpoint}")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._reset_timeout = self.base_reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Registra una falla reintentable (las fatales no indican un servidor caído)"""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN:
+                self._reset_timeout = min(self.max_reset_timeout, self._reset_timeout * 2)
+                self._open()
+            elif self.state == self.CLOSED and self._failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self):
+        """Libera el sondeo half-open si terminó sin un veredicto (p. ej. error fatal)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        print(f"🔌 Circuito abierto para {self.endpoint} durante {self._reset_timeout:.0f} s")
+
+
+class HedgeBudget:
+    """
+    Tope de peticiones duplicadas (hedging), para cuidar la cuota de la API.
+
+    - Cada petición primaria habilita `ratio` duplicados, más `burst` al principio:
+      a la larga los duplicados no pasan de ese porcentaje de las peticiones.
+    - A lo sumo `max_in_flight` duplicados en vuelo a la vez.
+    """
+
+    def __init__(self, ratio: float, burst: int, max_in_flight: int):
+        self.ratio = ratio
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+
+        self._lock = threading.Lock()
+        self.requests = 0   # Peticiones primarias que podían duplicarse
+        self.hedged = 0     # Duplicados enviados
+        self._in_flight = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self) -> bool:
+        """Reserva un duplicado si el tope lo permite (liberarlo con release al terminar)"""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                return False
+            if self.hedged >= self.burst + self.ratio * self.requests:
+                return False
+            self.hedged += 1
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
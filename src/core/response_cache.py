@@ -0,0 +1,172 @@
+"""
+Cache persistente de respuestas HTTP en SQLite
+Guarda las respuestas JSON comprimidas con zlib, con TTL por endpoint,
+revalidación condicional (ETag / Last-Modified) y desalojo LRU por tamaño
+"""
+
+import json
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+
+class CachedResponse:
+    """Entrada del cache: payload decodificado y validadores para revalidar"""
+
+    def __init__(self, payload: Dict, etag: Optional[str], last_modified: Optional[str], expires_at: float):
+        self.payload = payload
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers para revalidar la entrada vencida con el servidor"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Cache de respuestas indexado por endpoint + parámetros normalizados.
+    Las entradas vencidas no se borran: se conservan para revalidarlas con
+    If-None-Match / If-Modified-Since y solo salen por desalojo LRU cuando
+    el total comprimido supera `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_by_endpoint: Dict[str, int],
+                 default_ttl: int, closed_range_ttl: int, closed_range_days: int):
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.ttl_by_endpoint = ttl_by_endpoint
+        self.default_ttl = default_ttl
+        self.closed_range_ttl = closed_range_ttl
+        self.closed_range_days = closed_range_days
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)')
+        self._conn.commit()
+
+    # -------------------- Claves y TTL --------------------
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict = None) -> str:
+        """Clave estable: el orden de los parámetros no cambia el resultado"""
+        normalized = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return hashlib.sha256(f"{endpoint}?{normalized}".encode('utf-8')).hexdigest()
+
+    def ttl_for(self, endpoint: str, params: Dict = None) -> int:
+        """
+        Segundos de validez de una respuesta.
+        Los rangos que terminaron hace más de closed_range_days ya no cambian
+        y usan closed_range_ttl; el resto usa el TTL del endpoint.
+        """
+        end_date = (params or {}).get('endDate')
+        if end_date:
+            try:
+                cutoff = datetime.now() - timedelta(days=self.closed_range_days)
+                if datetime.strptime(end_date, '%Y-%m-%d') < cutoff:
+                    return self.closed_range_ttl
+            except ValueError:
+                pass
+        return self.ttl_by_endpoint.get(endpoint, self.default_ttl)
+
+    # -------------------- Lectura / escritura --------------------
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+        body, etag, last_modified, expires_at = row
+        try:
+            payload = json.loads(zlib.decompress(body))
+        except (zlib.error, ValueError):
+            self.delete(key)
+            return None
+        return CachedResponse(payload, etag, last_modified, expires_at)
+
+    def put(self, key: str, endpoint: str, payload: Dict, ttl: int,
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        body = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, endpoint, body, size, etag, last_modified, expires_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, body, len(body), etag, last_modified, now + ttl, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str, ttl: int):
+        """Renueva la validez de una entrada tras un 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?', (now + ttl, now, key)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """Desaloja las entradas menos usadas hasta entrar en max_bytes (con el lock tomado)"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            'SELECT key, size FROM responses ORDER BY last_access ASC'
+        ).fetchall():
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,80 @@
+"""
+Unificación de llamadas idénticas en vuelo (single-flight)
+Si varios hilos piden lo mismo a la vez, solo uno sale a la red y el resto
+recibe el mismo resultado (o la misma excepción)
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+from core.cancellation import OperationCancelled
+
+
+class _Call:
+    """Llamada en curso: la completa el hilo líder y la esperan los demás"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes por clave.
+    El primer hilo en llegar ejecuta la función; los que llegan mientras está en
+    vuelo esperan y comparten su resultado. Apenas termina, la clave se libera:
+    no es un cache, la siguiente llamada vuelve a ejecutar.
+
+    El resultado compartido es el mismo objeto para todos los que esperaban,
+    así que no debe modificarse en el lugar.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], cancel_token=None) -> Any:
+        """
+        Ejecuta fn() o se suma a la llamada en vuelo con la misma clave.
+        Un cancel_token solo corta la espera de quien se sumó, no la llamada del líder.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self.shared += 1
+
+            if not leader:
+                while not call.done.wait(0.05):
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                if isinstance(call.error, OperationCancelled):
+                    continue  # Se canceló el líder, no esta llamada: volver a intentar
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    self.executed += 1
+                call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared, 'in_flight': len(self._calls)}
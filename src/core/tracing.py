@@ -0,0 +1,143 @@
+"""
+Trazas de ejecución (spans) exportables al formato de Chrome / Perfetto
+Cada petición HTTP, página, celda de la grilla, cálculo por empleado y hoja de
+Excel abre un span con sus atributos; con el trazado apagado no se registra nada
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class _NoopSpan:
+    """Span vacío que se devuelve con el trazado apagado (costo casi nulo)"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    Intervalo medido con atributos (bytes, reintentos, status, filas...).
+    Los spans `async_span` pueden solaparse en un mismo hilo (corutinas del loop
+    de asyncio) y se exportan como eventos asíncronos en lugar de anidados.
+    """
+
+    __slots__ = ('_tracer', 'name', 'category', 'args', 'async_span', '_start')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict, async_span: bool):
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.async_span = async_span
+        self._start = None
+
+    def set(self, **attrs):
+        self.args.update(attrs)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self._tracer._record(self, self._start, time.perf_counter())
+        return False
+
+
+class Tracer:
+    """
+    Recolector de spans de una ejecución.
+
+    - start() limpia lo anterior y empieza a registrar; stop() deja de registrar.
+    - export_chrome(path) escribe un trace.json que se abre en chrome://tracing
+      o en https://ui.perfetto.dev
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def span(self, name: str, category: str = 'app', async_span: bool = False, **attrs):
+        """Abre un span (usar con `with`); con el trazado apagado devuelve NOOP_SPAN"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, category, attrs, async_span)
+
+    def start(self):
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._origin = time.perf_counter()
+            self.enabled = True
+
+    def stop(self) -> int:
+        """Deja de registrar y devuelve la cantidad de eventos capturados"""
+        with self._lock:
+            self.enabled = False
+            return len(self._events)
+
+    def export_chrome(self, path: str) -> Optional[str]:
+        """Escribe los eventos capturados en formato Chrome Trace Event"""
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.items()
+        ]
+        path = os.path.expanduser(path)
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f,
+                          separators=(',', ':'), default=str)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la traza: {str(e)}")
+            return None
+        return path
+
+    def _record(self, span: Span, started: float, finished: float):
+        thread = threading.current_thread()
+        tid = thread.ident
+        ts = (started - self._origin) * 1e6
+        dur = (finished - started) * 1e6
+        with self._lock:
+            if not self.enabled:
+                return
+            self._threads.setdefault(tid, thread.name)
+            if span.async_span:
+                span_id = next(self._ids)
+                base = {'name': span.name, 'cat': span.category, 'pid': self._pid, 'tid': tid, 'id': span_id}
+                self._events.append(dict(base, ph='b', ts=ts, args=span.args))
+                self._events.append(dict(base, ph='e', ts=ts + dur))
+            else:
+                self._events.append({
+                    'name': span.name, 'cat': span.category, 'ph': 'X', 'ts': ts, 'dur': dur,
+                    'pid': self._pid, 'tid': tid, 'args': span.args,
+                })
+
+
+# Trazador del proceso: lo usan el cliente de la API, el cálculo de horas y el Excel
+tracer = Tracer()
@@ -0,0 +1,137 @@
+"""
+Capa de transporte HTTP para la API de Human.co
+Sesiones por hilo con pools dimensionados, compresión explícita,
+contabilidad de bytes y pre-conexión de los workers
+"""
+
+import threading
+from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpTransport:
+    """
+    Entrega una requests.Session por hilo.
+
+    requests.Session no es thread-safe, y una sesión compartida entre N workers con el
+    pool por defecto (10 conexiones) genera "Connection pool is full" y reconexiones.
+    Cada worker ejecuta una petición por vez, así que su sesión solo necesita
+    `connections_per_worker` conexiones por host; el total queda acotado por el tamaño
+    del pool de hilos del motor asíncrono.
+    """
+
+    def __init__(self, headers: Dict[str, str], connections_per_worker: int = 2):
+        self.headers = dict(headers)
+        # Pedimos compresión explícitamente: las páginas de day summaries son JSON muy repetitivo
+        self.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.connections_per_worker = connections_per_worker
+
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+        self.requests_count = 0
+        self.bytes_on_wire = 0    # Cuerpo tal como viajó (comprimido)
+        self.bytes_decoded = 0    # Cuerpo descomprimido
+
+    @property
+    def session(self) -> requests.Session:
+        """Sesión del hilo actual (se crea la primera vez)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.connections_per_worker,
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        response = self.session.get(url, **kwargs)
+        self._account(response)
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        response = self.session.post(url, **kwargs)
+        self._account(response)
+        return response
+
+    @staticmethod
+    def body_sizes(response: requests.Response):
+        """(bytes tal como viajaron, bytes descomprimidos) del cuerpo de la respuesta"""
+        decoded = len(response.content)
+        on_wire = None
+        raw = getattr(response, 'raw', None)
+        if raw is not None and hasattr(raw, 'tell'):
+            try:
+                on_wire = raw.tell()
+            except Exception:
+                on_wire = None
+        if not on_wire:
+            on_wire = int(response.headers.get('Content-Length') or decoded)
+        return on_wire, decoded
+
+    def _account(self, response: requests.Response):
+        on_wire, decoded = self.body_sizes(response)
+        with self._lock:
+            self.requests_count += 1
+            self.bytes_on_wire += on_wire
+            self.bytes_decoded += decoded
+
+    def preconnect(self, url: str, executor: ThreadPoolExecutor, workers: int, timeout: float = 5.0):
+        """
+        Abre una conexión keep-alive en la sesión de cada worker del pool, sin bloquear.
+        Una barrera obliga a que cada tarea corra en un hilo distinto; la petición es un
+        HEAD sin consumo de cuota relevante y su status se ignora.
+        """
+        barrier = threading.Barrier(workers)
+
+        def warm():
+            try:
+                barrier.wait(timeout=timeout)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                self.session.head(url, timeout=timeout)
+            except requests.exceptions.RequestException:
+                pass
+
+        for _ in range(workers):
+            executor.submit(warm)
+
+    def connections_opened(self) -> int:
+        """Conexiones TCP/TLS abiertas hasta ahora (para medir la reutilización)"""
+        total = 0
+        with self._lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                for pool in list(adapter.poolmanager.pools._container.values()):
+                    total += getattr(pool, 'num_connections', 0)
+        return total
+
+    def stats(self) -> Dict:
+        with self._lock:
+            saved = 1 - (self.bytes_on_wire / self.bytes_decoded) if self.bytes_decoded else 0.0
+            return {
+                'requests': self.requests_count,
+                'sessions': len(self._sessions),
+                'bytes_on_wire': self.bytes_on_wire,
+                'bytes_decoded': self.bytes_decoded,
+                'compression_savings': round(saved, 3),
+            }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
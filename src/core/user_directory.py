@@ -0,0 +1,178 @@
+"""
+Directorio de usuarios persistido
+Guarda la lista de usuarios en disco junto con la fecha en que se descargó,
+para arrancar con los filtros listos y revalidarla en segundo plano
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+class UserDirectory:
+    """
+    Lista de usuarios con stale-while-revalidate.
+
+    - get(): devuelve la copia en memoria o la guardada en disco aunque esté
+      vencida; si pasó `max_age_seconds` desde la descarga, lanza un refresco
+      en segundo plano. Solo bloquea si nunca se descargó.
+    - refresh(): descarga bloqueante; guarda el resultado (escritura atómica)
+      y avisa a los suscriptores si el directorio cambió.
+    - Un refresco que devuelve una lista vacía (la API falló) no pisa la copia
+      que ya había ni se guarda; se reintenta pasados RETRY_SECONDS (o en el
+      próximo get() si todavía no hay copia).
+    """
+
+    RETRY_SECONDS = 60  # Espera mínima entre refrescos fallidos en segundo plano
+
+    def __init__(self, path: Optional[str], loader: Callable[[], List[Dict]], max_age_seconds: float):
+        self.path = os.path.expanduser(path) if path else None
+        self.loader = loader
+        self.max_age_seconds = max_age_seconds
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._users: Optional[List[Dict]] = None
+        self._fetched_at: Optional[float] = None  # Epoch de la descarga
+        self._last_attempt = 0.0
+        self._refreshing: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+        self._load()
+
+    # -------------------- Lectura --------------------
+
+    @property
+    def users(self) -> Optional[List[Dict]]:
+        return self._users
+
+    @property
+    def fetched_at(self) -> Optional[float]:
+        return self._fetched_at
+
+    def age(self) -> Optional[float]:
+        """Segundos desde la descarga (None si nunca se descargó)"""
+        if self._fetched_at is None:
+            return None
+        return max(0.0, time.time() - self._fetched_at)
+
+    def is_stale(self) -> bool:
+        age = self.age()
+        return age is None or age >= self.max_age_seconds
+
+    def get(self, revalidate: bool = True) -> List[Dict]:
+        """
+        Devuelve el directorio sin esperar a la red si hay una copia.
+        Args:
+            revalidate: Si la copia está vencida, refrescarla en segundo plano
+        """
+        users = self._users
+        if users is None:
+            return self.refresh()
+        if revalidate and self.is_stale():
+            self.refresh_in_background()
+        return users
+
+    # -------------------- Refresco --------------------
+
+    def refresh(self) -> List[Dict]:
+        """Descarga el directorio (bloqueante) y lo guarda"""
+        with self._refresh_lock:
+            self._last_attempt = time.time()
+            users = self.loader()
+            with self._lock:
+                previous = self._users
+                if not users:
+                    if previous:
+                        print("⚠️ No se pudo refrescar el directorio de usuarios, se mantiene la copia guardada")
+                        return previous
+                    print("⚠️ No se pudo descargar el directorio de usuarios, se reintentará")
+                    return []
+                self._users = users
+                self._fetched_at = time.time()
+                listeners = list(self._listeners)
+            self._save()
+
+        if users != previous:
+            for callback in listeners:
+                try:
+                    callback(users)
+                except Exception as e:
+                    print(f"⚠️ Error notificando el directorio de usuarios: {str(e)}")
+        elif previous is not None:
+            print("✅ Directorio de usuarios sin cambios")
+        return users
+
+    def refresh_in_background(self, force: bool = False) -> bool:
+        """
+        Lanza un refresco en un hilo aparte, salvo que ya haya uno en curso
+        o el último intento haya sido hace menos de RETRY_SECONDS.
+        Returns:
+            True si se lanzó un refresco
+        """
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return False
+            if not force and time.time() - self._last_attempt < self.RETRY_SECONDS:
+                return False
+            self._last_attempt = time.time()
+            self._refreshing = threading.Thread(target=self._background_refresh,
+                                                name='user-directory-refresh', daemon=True)
+            self._refreshing.start()
+        return True
+
+    def _background_refresh(self):
+        try:
+            print("🔄 Revalidando directorio de usuarios en segundo plano...")
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Error refrescando el directorio de usuarios: {str(e)}")
+
+    def on_update(self, callback: Callable[[List[Dict]], None]) -> Callable[[], None]:
+        """
+        Registra callback(users), llamado desde el hilo del refresco cuando el
+        directorio cambia. Devuelve una función que lo desregistra.
+        """
+        with self._lock:
+            self._listeners.append(callback)
+
+        def unregister():
+            with self._lock:
+                if callback in self._listeners:
+                    self._listeners.remove(callback)
+        return unregister
+
+    # -------------------- Persistencia --------------------
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not state['users']:
+                # Lo dejó una descarga fallida: no cuenta como copia
+                return
+            self._users = state['users']
+            self._fetched_at = float(state['fetched_at'])
+            print(f"📋 Directorio de usuarios guardado: {len(self._users)} usuarios "
+                  f"(hace {int(self.age() // 60)} min)")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Directorio de usuarios guardado inválido, se descargará de nuevo: {str(e)}")
+            self._users = self._fetched_at = None
+
+    def _save(self):
+        """Guarda el directorio (escritura atómica)"""
+        if not self.path:
+            return
+        with self._lock:
+            state = {'fetched_at': self._fetched_at, 'users': self._users}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_path, self.path)
+            except (OSError, TypeError) as e:
+                print(f"⚠️ No se pudo guardar el directorio de usuarios: {str(e)}")
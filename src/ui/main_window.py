@@ -18,6 +18,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QDate, QThread, pyqtSignal, Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon, QPalette, QColor
 from core.data_processor import DataProcessor
+from core.cancellation import CancellationToken
 from config.default_config import DEFAULT_CONFIG
 
 
@@ -220,6 +221,7 @@ class InitializationThread(QThread):
     """Thread para la inicialización de la aplicación"""
     progress_updated = pyqtSignal(int, str)
     initialization_finished = pyqtSignal(bool, str, dict)
+    connection_checked = pyqtSignal(bool, str)
     
     def __init__(self, processor):
         super().__init__()
@@ -228,6 +230,19 @@ class InitializationThread(QThread):
     def run(self):
         """Ejecuta la inicialización en segundo plano"""
         try:
+            # Con un directorio de usuarios guardado, la UI arranca sin esperar a la API:
+            # los filtros salen de la copia y se revalidan en segundo plano
+            if self.processor.has_users_snapshot():
+                self.progress_updated.emit(50, "📋 Cargando usuarios guardados...")
+                filters = self.processor.get_available_filters()
+                self.processor.refresh_users_in_background()
+                self.progress_updated.emit(100, "✅ Inicialización completada")
+                self.initialization_finished.emit(True, "Inicialización desde el directorio guardado", filters)
+                
+                success, message = self.processor.test_connection()
+                self.connection_checked.emit(success, message)
+                return
+            
             # Paso 1: Probar conexión (30%)
             self.progress_updated.emit(10, "🔗 Conectando con la API...")
             success, message = self.processor.test_connection()
@@ -404,6 +419,14 @@ class ProcessingThread(QThread):
         self.start_date = start_date
         self.end_date = end_date
         self.user_ids = user_ids
+        # El tiempo límite no cancela: corta la descarga y deja un reporte parcial
+        deadline_ms = DEFAULT_CONFIG.get('report_deadline_ms', 0)
+        self.deadline_seconds = deadline_ms / 1000.0 if deadline_ms else None
+        self.cancel_token = CancellationToken()
+    
+    def cancel(self):
+        """Pide cancelar el procesamiento (el hilo termina en cuanto lo detecta)"""
+        self.cancel_token.cancel()
     
     def run(self):
         """Ejecuta el procesamiento en segundo plano"""
@@ -412,7 +435,9 @@ class ProcessingThread(QThread):
                 self.start_date, 
                 self.end_date, 
                 self.user_ids,
-                self.progress_callback
+                self.progress_callback,
+                cancel_token=self.cancel_token,
+                deadline_seconds=self.deadline_seconds
             )
             self.processing_finished.emit(result)
         except Exception as e:
@@ -430,10 +455,14 @@ class ProcessingThread(QThread):
 class MainWindow(QMainWindow):
     """Ventana principal moderna de la aplicación"""
     
+    # Filtros recalculados tras un refresco del directorio de usuarios (llega desde otro hilo)
+    users_updated = pyqtSignal(dict)
+    
     def __init__(self):
         super().__init__()
         # NO inicializar processor aquí para evitar carga prematura
         self.processor = None
+        self.init_thread = None
         self.processing_thread = None
         self.available_users = []
         self.available_filters = {}
@@ -445,7 +474,17 @@ class MainWindow(QMainWindow):
     def delayed_initialization(self):
         """Inicialización diferida para evitar carga prematura"""
         # Crear processor solo cuando sea necesario
-        self.processor = DataProcessor()
+        try:
+            self.processor = DataProcessor()
+        except ValueError as e:
+            # Configuración inválida (por ejemplo, el cassette a reproducir no existe)
+            self.initialization_completed(False, str(e), {})
+            return
+
+        # Los refrescos del directorio de usuarios actualizan los filtros en vivo
+        self.users_updated.connect(self.users_directory_updated)
+        self.processor.on_users_updated(self.users_updated.emit)
+        
         self.load_initial_data()
     
     def init_ui(self):
@@ -699,6 +738,8 @@ class MainWindow(QMainWindow):
         # Conectar eventos para actualizar el rango
         self.start_date.dateChanged.connect(self.update_date_range_info)
         self.end_date.dateChanged.connect(self.update_date_range_info)
+        self.start_date.dateChanged.connect(self.warm_up_connections)
+        self.end_date.dateChanged.connect(self.warm_up_connections)
         
         # Actualizar información inicial
         self.update_date_range_info()
@@ -810,6 +851,12 @@ class MainWindow(QMainWindow):
         self.open_folder_btn.clicked.connect(self.open_reports_folder)
         actions_layout.addWidget(self.open_folder_btn)
         
+        # Cancelar el reporte en curso
+        self.cancel_report_btn = ModernButton("⛔ Cancelar", "secondary")
+        self.cancel_report_btn.clicked.connect(self.cancel_processing)
+        self.cancel_report_btn.setEnabled(False)  # Solo mientras hay un reporte en curso
+        actions_layout.addWidget(self.cancel_report_btn)
+        
         actions_layout.addStretch()
         
         card.content_layout.addLayout(actions_layout)
@@ -861,6 +908,19 @@ class MainWindow(QMainWindow):
         """)
         card.add_content(self.last_report_label)
         
+        # Métricas de la última ejecución (red, limitador y cálculo)
+        self.metrics_label = QLabel("")
+        self.metrics_label.setWordWrap(True)
+        self.metrics_label.setVisible(False)
+        self.metrics_label.setStyleSheet("""
+            QLabel {
+                color: #64748b;
+                font-family: monospace;
+                font-size: 11px;
+            }
+        """)
+        card.add_content(self.metrics_label)
+        
         layout.addWidget(card, row, col, rowspan, colspan)
     
     def create_log_section(self, layout):
@@ -955,6 +1015,7 @@ class MainWindow(QMainWindow):
         self.init_thread = InitializationThread(self.processor)
         self.init_thread.progress_updated.connect(self.update_native_progress)
         self.init_thread.initialization_finished.connect(self.initialization_completed)
+        self.init_thread.connection_checked.connect(self.connection_checked)
         self.init_thread.start()
     
     def update_native_progress(self, progress, message):
@@ -971,15 +1032,8 @@ class MainWindow(QMainWindow):
         
         if success:
             # Inicialización exitosa
-            self.available_filters = filters
-            
-            # Actualizar interfaz con datos cargados
+            self.apply_filters(filters)
             total_users = filters.get('total_users', 0)
-            self.filter_all_users.setText(f"Todos los usuarios ({total_users} empleados)")
-            
-            # Cargar departamentos
-            self.department_combo.clear()
-            self.department_combo.addItems(filters.get('departments', []))
             
             # Actualizar estados
             self.header_status.update_status("success", "Conectado")
@@ -988,6 +1042,9 @@ class MainWindow(QMainWindow):
             # Habilitar controles
             self.generate_report_btn.setEnabled(True)
             
+            # Pre-conectar mientras el usuario elige las fechas
+            self.warm_up_connections()
+            
             # Log de éxito
             self.log_message("✅ Aplicación inicializada correctamente")
             self.log_message(f"📋 {total_users} usuarios disponibles")
@@ -1007,6 +1064,48 @@ class MainWindow(QMainWindow):
                 f"Por favor verifica tu conexión a internet y la configuración de la API."
             )
     
+    def apply_filters(self, filters):
+        """Carga los filtros disponibles en la interfaz, conservando el departamento elegido"""
+        self.available_filters = filters
+        
+        total_users = filters.get('total_users', 0)
+        self.filter_all_users.setText(f"Todos los usuarios ({total_users} empleados)")
+        
+        # Cargar departamentos
+        current_dept = self.department_combo.currentText()
+        self.department_combo.blockSignals(True)
+        self.department_combo.clear()
+        self.department_combo.addItems(filters.get('departments', []))
+        if current_dept:
+            index = self.department_combo.findText(current_dept)
+            if index >= 0:
+                self.department_combo.setCurrentIndex(index)
+        self.department_combo.blockSignals(False)
+        self.update_department_count()
+    
+    def users_directory_updated(self, filters):
+        """Aplica los filtros del directorio de usuarios revalidado en segundo plano"""
+        if not self.available_filters:
+            return  # Primera descarga: los aplica initialization_completed
+        self.apply_filters(filters)
+        self.log_message(f"🔄 Directorio de usuarios actualizado: {filters.get('total_users', 0)} usuarios")
+    
+    def connection_checked(self, success, message):
+        """Resultado de la prueba de conexión hecha después de arrancar con el directorio guardado"""
+        if success:
+            self.header_status.update_status("success", "Conectado")
+        else:
+            self.header_status.update_status("error", "Sin conexión")
+            self.log_message(f"⚠️ {message}")
+    
+    def warm_up_connections(self):
+        """Pre-conecta los workers HTTP en segundo plano (no bloquea la UI)"""
+        if not self.processor or (self.processing_thread and self.processing_thread.isRunning()):
+            return
+        try:
+            self.processor.warm_up_connections()
+        except Exception as e:
+            print(f"Error pre-conectando: {str(e)}")
     
     def update_department_count(self):
         """Actualiza el contador de empleados por departamento"""
@@ -1147,6 +1246,7 @@ class MainWindow(QMainWindow):
     def start_processing(self, start_date, end_date, user_ids=None):
         """Inicia el procesamiento en segundo plano"""
         self.generate_report_btn.setEnabled(False)
+        self.cancel_report_btn.setEnabled(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.status_label.setText("Estado: Procesando...")
@@ -1156,6 +1256,14 @@ class MainWindow(QMainWindow):
         self.processing_thread.processing_finished.connect(self.processing_completed)
         self.processing_thread.start()
     
+    def cancel_processing(self):
+        """Cancela el reporte en curso"""
+        if self.processing_thread and self.processing_thread.isRunning():
+            self.cancel_report_btn.setEnabled(False)
+            self.status_label.setText("Estado: Cancelando...")
+            self.log_message("⛔ Cancelando reporte...")
+            self.processing_thread.cancel()
+    
     def update_progress(self, progress, message):
         """Actualiza el progreso del procesamiento"""
         self.progress_bar.setValue(progress)
@@ -1165,9 +1273,18 @@ class MainWindow(QMainWindow):
     def processing_completed(self, result):
         """Maneja la finalización del procesamiento"""
         self.generate_report_btn.setEnabled(True)
+        self.cancel_report_btn.setEnabled(False)
         self.progress_bar.setVisible(False)
         
-        if result['success']:
+        if result.get('trace_path'):
+            self.log_message(f"🧭 Traza de la ejecución: {result['trace_path']}")
+        
+        if result.get('cancelled'):
+            self.status_label.setText(f"Estado: {result.get('error', 'Reporte cancelado')}")
+            self.log_message(f"⛔ Reporte cancelado: {result.get('error', '')}")
+            if DEFAULT_CONFIG.get('checkpoints_enabled'):
+                self.log_message("💾 Lo ya descargado quedó guardado para el próximo intento")
+        elif result['success']:
             self.status_label.setText("Estado: ¡Reporte completado!")
             excel_path = result['excel_path']
             
@@ -1175,11 +1292,42 @@ class MainWindow(QMainWindow):
             self.last_report_label.setText(f"Último reporte: {filename}")
             
             self.log_message(f"✅ Reporte generado exitosamente: {filename}")
+            self.show_api_stats(result.get('api_stats') or {})
+            
+            missing_note = ""
+            failed_cells = result.get('failed_cells') or []
+            if failed_cells:
+                failed_employees = {e for unit in failed_cells for e in unit['employee_ids']}
+                self.status_label.setText("Estado: Reporte completado con datos faltantes")
+                for unit in failed_cells[:20]:
+                    self.log_message(f"⚠️ Sin datos de {', '.join(unit['employee_ids'])} "
+                                     f"({unit['start_date']} a {unit['end_date']}): {unit['error']}")
+                if len(failed_cells) > 20:
+                    self.log_message(f"⚠️ ... y {len(failed_cells) - 20} unidades más sin datos")
+                missing_note = (f"⚠️ Faltan datos de {len(failed_employees)} empleado(s) que la API "
+                                f"no devolvió (ver el registro).\n\n")
+            
+            pending = result.get('pending_employees') or []
+            if pending:
+                self.status_label.setText("Estado: Reporte parcial (tiempo límite)")
+                self.log_message(f"⏱️ Se alcanzó el tiempo límite: {len(pending)} empleado(s) quedaron "
+                                 f"fuera del reporte (hoja 'Pendientes')")
+                for employee in pending[:20]:
+                    self.log_message(f"⏱️ Pendiente: {employee['name']} ({employee['employee_id']})")
+                if len(pending) > 20:
+                    self.log_message(f"⏱️ ... y {len(pending) - 20} empleados pendientes más")
+                if DEFAULT_CONFIG.get('checkpoints_enabled'):
+                    self.log_message("💾 Lo ya descargado quedó guardado: repetir el reporte descarga "
+                                     "solo los pendientes")
+                missing_note += (f"⏱️ Se alcanzó el tiempo límite: el reporte incluye "
+                                 f"{result.get('processed_employees', 0)} empleado(s) completos y "
+                                 f"{len(pending)} quedaron pendientes (ver la hoja 'Pendientes').\n\n")
             
             reply = QMessageBox.information(
                 self, "¡Reporte Completado!", 
                 f"El reporte se ha generado exitosamente.\n\n"
                 f"📁 Archivo: {filename}\n"
+                f"{missing_note}"
                 f"¿Deseas abrir el archivo?",
                 QMessageBox.Yes | QMessageBox.No
             )
@@ -1193,14 +1341,52 @@ class MainWindow(QMainWindow):
             
             self.log_message(f"❌ Error en {stage}: {error_msg}")
             
+            resume_note = ""
+            if result.get('resumable'):
+                resume_note = ("💾 Lo ya descargado quedó guardado: si vuelves a generar el mismo "
+                               "reporte, continuará desde donde se interrumpió.\n\n")
+                self.log_message(f"💾 Checkpoint {result.get('run_id')} guardado para reanudar")
+            
             QMessageBox.critical(
                 self, "Error en Procesamiento",
                 f"Ocurrió un error durante el procesamiento:\n\n"
                 f"Etapa: {stage}\n"
                 f"Error: {error_msg}\n\n"
+                f"{resume_note}"
                 f"Por favor revisa el log para más detalles."
             )
     
+    def show_api_stats(self, api_stats):
+        """Muestra en el card de estado los tiempos por etapa y las métricas por endpoint"""
+        stages = api_stats.get('stage_seconds') or {}
+        lines = []
+        if stages:
+            lines.append(
+                f"⏱️ Descarga {stages.get('fetch', 0):.1f} s · Cálculo {stages.get('compute', 0):.1f} s · "
+                f"Excel {stages.get('excel', 0):.1f} s"
+            )
+        for endpoint, m in (api_stats.get('endpoints') or {}).items():
+            line = f"🌐 {endpoint}: {m['requests']} req"
+            if m['cache_hits']:
+                line += f" (+{m['cache_hits']} cache)"
+            if m['pages_per_query']:
+                line += f" · {m['pages_per_query']} pág/consulta"
+            if m['latency_p50'] is not None:
+                line += f" · p50 {m['latency_p50']:.2f} s · p95 {m['latency_p95']:.2f} s · p99 {m['latency_p99']:.2f} s"
+            line += f" · {m['bytes_on_wire'] / 1048576:.1f} MB"
+            if m['retries']:
+                line += f" · {m['retries']} reintentos"
+            if m['hedged']:
+                line += f" · {m['hedged']} duplicadas por lentas ({m['hedge_wins']} respondieron antes)"
+            if m['throttle_seconds'] or m['backoff_seconds']:
+                line += f" · {m['throttle_seconds'] + m['backoff_seconds']:.1f} s en espera (limitador/backoff)"
+            lines.append(line)
+        
+        for line in lines:
+            self.log_message(line)
+        self.metrics_label.setText("\n".join(lines))
+        self.metrics_label.setVisible(bool(lines))
+    
     def open_reports_folder(self):
         """Abre la carpeta de reportes"""
         reports_dir = os.path.expanduser(DEFAULT_CONFIG['output_directory'])
@@ -1271,13 +1457,19 @@ class MainWindow(QMainWindow):
             )
             
             if reply == QMessageBox.Yes:
-                self.processing_thread.terminate()
+                # La cancelación es cooperativa: el hilo termina en el próximo punto de control
+                self.processing_thread.cancel()
                 self.processing_thread.wait()
-                event.accept()
             else:
                 event.ignore()
-        else:
-            event.accept()
+                return
+        if self.init_thread and self.init_thread.isRunning():
+            # La inicialización usa el cliente de la API (sus peticiones tienen timeout)
+            self.init_thread.wait()
+        # Al salir se liberan los pools de hilos y las conexiones de la API
+        if self.processor:
+            self.processor.api_client.close()
+        event.accept()
 
 def parse_args():
     parser = argparse.ArgumentParser()
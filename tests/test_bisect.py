@@ -0,0 +1,69 @@
+"""
+División de celdas de HumanApiClient: una celda que falla por un empleado-día
+roto se pide en mitades hasta aislarlo, y el resto de la celda se entrega igual
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from config.default_config import DEFAULT_CONFIG
+from core.api_client import HumanApiClient
+from mock_human_api import MockHumanApiServer
+
+START_DATE, END_DATE = '2025-01-01', '2025-01-30'
+EMPLOYEES = 10  # Una sola celda de 10 empleados × 30 días = 300 day summaries
+BROKEN = ('E00003', '2025-01-17')
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG, 'cache_directory', str(tmp_path))
+    with MockHumanApiServer(employees=EMPLOYEES, latency_ms=0, broken_days=[BROKEN]) as server:
+        yield server
+
+
+def make_client(base_url):
+    client = HumanApiClient(api_key='test', base_url=base_url)
+    client.max_retries = 1  # Cada sub-celda rota falla enseguida
+    client.page_limit_candidates = [50]
+    return client
+
+
+def test_failed_sub_cell_is_isolated(server):
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(EMPLOYEES)]
+    client = make_client(server.base_url)
+    try:
+        result = client.get_time_tracking_parallel_with_users(START_DATE, END_DATE, users)
+    finally:
+        client.close()
+
+    assert result['success']
+    assert [(unit['employee_ids'], unit['start_date'], unit['end_date']) for unit in result['failed_cells']] == [
+        ([BROKEN[0]], BROKEN[1], BROKEN[1])
+    ]
+    keys = {(item['employeeId'], item['referenceDate']) for item in result['entries']}
+    assert len(keys) == result['total_entries'] == EMPLOYEES * 30 - 1
+    assert BROKEN not in keys
+
+
+def test_rerun_requests_only_the_isolated_day(server):
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(EMPLOYEES)]
+    client = make_client(server.base_url)
+    try:
+        first = client.get_time_tracking_parallel_with_users(START_DATE, END_DATE, users)
+        # El resto quedó en el almacén local: repetir el reporte pide solo el día roto
+        requests_before = server.stats()['requests']
+        result = client.get_time_tracking_parallel_with_users(START_DATE, END_DATE, users)
+    finally:
+        client.close()
+
+    assert server.stats()['requests'] == requests_before + 1
+    assert result['success']
+    assert result['failed_cells'] == first['failed_cells']
+    assert result['total_entries'] == EMPLOYEES * 30 - 1
@@ -0,0 +1,53 @@
+"""
+Checkpoints de HumanApiClient: un reporte que falló a mitad de una celda se
+reanuda pidiendo solo lo que falta y devuelve todos los items
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from config.default_config import DEFAULT_CONFIG
+from core.api_client import HumanApiClient
+from mock_human_api import MockHumanApiServer
+
+START_DATE, END_DATE = '2025-01-01', '2025-01-30'
+EMPLOYEES = 10  # Una sola celda de 10 empleados × 30 días = 300 day summaries
+
+
+def make_client(base_url):
+    client = HumanApiClient(api_key='test', base_url=base_url)
+    client.max_retries = 1          # La página rota falla enseguida
+    client.bisect_max_attempts = 0  # Sin dividir la celda: queda pendiente en el checkpoint
+    client.page_limit_candidates = [50]
+    return client
+
+
+@pytest.mark.parametrize('totals', [True, False], ids=['con-totales', 'sin-totales'])
+def test_resumed_run_returns_every_item(tmp_path, monkeypatch, totals):
+    monkeypatch.setitem(DEFAULT_CONFIG, 'cache_directory', str(tmp_path))
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(EMPLOYEES)]
+
+    with MockHumanApiServer(employees=EMPLOYEES, latency_ms=0, broken_pages={3}, totals=totals) as server:
+        client = make_client(server.base_url)
+        try:
+            failed = client.get_time_tracking_parallel_with_users(START_DATE, END_DATE, users, run_id='resume')
+            assert not failed['success']
+            assert failed['resumable']
+
+            _, saved_pages = client.checkpoints.progress('resume')
+            assert saved_pages >= 1
+            server.broken_pages.clear()
+            result = client.get_time_tracking_parallel_with_users(START_DATE, END_DATE, users, run_id='resume')
+            assert client.checkpoints.load_grid('resume') is None  # Terminó: el checkpoint se borra
+        finally:
+            client.close()
+
+        assert result['success']
+        assert result['total_entries'] == EMPLOYEES * 30
+        assert len({(item['employeeId'], item['referenceDate']) for item in result['entries']}) == EMPLOYEES * 30
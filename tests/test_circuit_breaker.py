@@ -0,0 +1,51 @@
+"""
+Circuit breaker de HumanApiClient: un sondeo half-open cancelado antes de
+salir a la red no deja el endpoint bloqueado
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from config.default_config import DEFAULT_CONFIG, API_ENDPOINTS
+from core.api_client import HumanApiClient
+from core.cancellation import CancellationToken, OperationCancelled
+from core.resilience import CircuitBreaker
+from mock_human_api import MockHumanApiServer
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG, 'cache_directory', str(tmp_path))
+    with MockHumanApiServer(employees=5, latency_ms=0) as server:
+        client = HumanApiClient(api_key='test', base_url=server.base_url)
+        yield client
+        client.close()
+
+
+def test_cancelled_half_open_probe_is_released(client):
+    endpoint = API_ENDPOINTS['users']
+    params = {'page': 1, 'limit': 1}
+
+    # Circuito abierto con el plazo vencido: la próxima petición es el sondeo
+    breaker = client._get_breaker(endpoint)
+    breaker.state = CircuitBreaker.OPEN
+    breaker._opened_at = time.monotonic() - breaker._reset_timeout - 1
+
+    # El sondeo queda esperando turno en el limitador y se cancela ahí
+    client.rate_limiter._in_flight = int(client.rate_limiter.concurrency)
+    with pytest.raises(OperationCancelled):
+        client._make_request('GET', endpoint, params, use_cache=False,
+                             cancel_token=CancellationToken(timeout=0.2))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # La siguiente petición puede sondear y cierra el circuito
+    client.rate_limiter._in_flight = 0
+    assert client._make_request('GET', endpoint, params, use_cache=False)
+    assert breaker.state == CircuitBreaker.CLOSED
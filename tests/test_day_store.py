@@ -0,0 +1,65 @@
+"""
+Almacén de day summaries: un reporte que se superpone con uno anterior pide a
+la API solo los días que faltan y lee el resto de disco
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from config.default_config import DEFAULT_CONFIG
+from core.api_client import HumanApiClient
+from core.day_store import DaySummaryStore
+from mock_human_api import MockHumanApiServer
+
+EMPLOYEES = 10
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG, 'cache_directory', str(tmp_path))
+    with MockHumanApiServer(employees=EMPLOYEES, latency_ms=0) as server:
+        yield server
+
+
+def test_overlapping_report_fetches_only_the_gap(server):
+    users = [{'employeeInternalId': f"E{i:05d}"} for i in range(EMPLOYEES)]
+    employee_ids = [u['employeeInternalId'] for u in users]
+    client = HumanApiClient(api_key='test', base_url=server.base_url)
+    client.max_retries = 1
+    try:
+        client.get_time_tracking_parallel_with_users('2025-01-01', '2025-01-15', users)
+        assert client.day_store.plan_fetches(employee_ids, '2025-01-01', '2025-01-30') == [
+            {'start_date': '2025-01-16', 'end_date': '2025-01-30', 'user_ids': employee_ids, 'cells': 150}
+        ]
+
+        # Un día ya guardado se rompe en el servidor: si se volviera a pedir, el reporte fallaría
+        server.broken_days.add(('E00000', '2025-01-05'))
+        result = client.get_time_tracking_parallel_with_users('2025-01-01', '2025-01-30', users)
+    finally:
+        client.close()
+
+    assert result['success']
+    assert not result['failed_cells']
+    assert len({(item['employeeId'], item['referenceDate']) for item in result['entries']}) == EMPLOYEES * 30
+
+
+def test_plan_groups_employees_with_the_same_gaps(tmp_path):
+    store = DaySummaryStore(str(tmp_path / 'days.db'), mutable_days=35)
+    try:
+        store.save_batch(['E1', 'E2'], '2025-01-01', '2025-01-05', [])
+        store.save_batch(['E3'], '2025-01-05', '2025-01-06', [])
+        plan = store.plan_fetches(['E1', 'E2', 'E3'], '2025-01-01', '2025-01-10')
+    finally:
+        store.close()
+
+    assert sorted((unit['start_date'], unit['end_date'], unit['user_ids']) for unit in plan) == [
+        ('2025-01-01', '2025-01-04', ['E3']),
+        ('2025-01-06', '2025-01-10', ['E1', 'E2']),
+        ('2025-01-07', '2025-01-10', ['E3']),
+    ]
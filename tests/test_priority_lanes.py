@@ -0,0 +1,71 @@
+"""
+Carriles de prioridad de HumanApiClient: con el limitador lleno, una petición
+interactiva sale antes que una bulk que ya esperaba, salvo que el bulk lleve
+bulk_every turnos cedidos
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from config.default_config import DEFAULT_CONFIG, API_ENDPOINTS
+from core.api_client import HumanApiClient
+from core.lanes import BULK, INTERACTIVE, request_lane
+from mock_human_api import MockHumanApiServer
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setitem(DEFAULT_CONFIG, 'cache_directory', str(tmp_path))
+    with MockHumanApiServer(employees=5, latency_ms=100) as server:
+        client = HumanApiClient(api_key='test', base_url=server.base_url)
+        yield client
+        client.close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def request_in_lane(client, lane, finished):
+    # Páginas distintas por carril: iguales, single-flight las juntaría en una sola petición
+    page = 1 if lane == BULK else 2
+    with request_lane(lane):
+        client._make_request('GET', API_ENDPOINTS['users'], {'page': page, 'limit': 1}, use_cache=False)
+    finished.append(lane)
+
+
+@pytest.mark.parametrize('streak, first', [(0, INTERACTIVE), (4, BULK)],
+                         ids=['interactivo-primero', 'bulk-sin-hambre'])
+def test_lane_order_when_limiter_is_full(client, streak, first):
+    limiter = client.rate_limiter
+    limiter.bulk_every = 4
+    # Un solo lugar y ocupado: las dos peticiones quedan esperando turno
+    limiter.concurrency = 1
+    limiter._in_flight = 1
+
+    finished = []
+    threads = []
+    for lane in (BULK, INTERACTIVE):
+        thread = threading.Thread(target=request_in_lane, args=(client, lane, finished), daemon=True)
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: limiter._waiting[lane] == 1)
+    limiter._interactive_streak = streak
+
+    limiter.cancel()  # Se libera el lugar: pasa una y la otra espera su respuesta
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert finished[0] == first
+    assert sorted(finished) == sorted([BULK, INTERACTIVE])